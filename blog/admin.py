@@ -1,11 +1,12 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
+from core.models import update_content
 from .models import Post
 
 
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'status', 'is_featured', 'get_categories', 'get_tags', 'created_at', 'published_at')
+    list_display = ('title', 'author', 'status', 'is_featured', 'get_categories', 'get_tags', 'view_count', 'created_at', 'published_at')
     list_filter = ('status', 'is_featured', 'categories', 'tags', 'author')
     search_fields = ('title', 'content', 'excerpt', 'tags__name')
     prepopulated_fields = {'slug': ('title',)}
@@ -42,30 +43,27 @@ class PostAdmin(admin.ModelAdmin):
     get_tags.short_description = _("Tags")
     
     def publish_posts(self, request, queryset):
-        for post in queryset:
-            post.publish()
+        queryset.publish()
         self.message_user(request, _("Selected posts have been published."))
     publish_posts.short_description = _("Publish selected posts")
     
     def archive_posts(self, request, queryset):
-        for post in queryset:
-            post.archive()
+        queryset.archive()
         self.message_user(request, _("Selected posts have been archived."))
     archive_posts.short_description = _("Archive selected posts")
     
     def draft_posts(self, request, queryset):
-        for post in queryset:
-            post.draft()
+        queryset.draft()
         self.message_user(request, _("Selected posts have been set as draft."))
     draft_posts.short_description = _("Set selected posts as draft")
     
     def feature_posts(self, request, queryset):
-        queryset.update(is_featured=True)
+        update_content(queryset, is_featured=True)
         self.message_user(request, _("Selected posts have been featured."))
     feature_posts.short_description = _("Feature selected posts")
     
     def unfeature_posts(self, request, queryset):
-        queryset.update(is_featured=False)
+        update_content(queryset, is_featured=False)
         self.message_user(request, _("Selected posts have been unfeatured."))
     unfeature_posts.short_description = _("Unfeature selected posts")
 
@@ -0,0 +1,245 @@
+"""
+RSS and Atom feeds of published posts.
+
+Feeds carry each post's stored ``rendered_content``, are streamed out an
+entry at a time, and are cached until a post or category changes, so a
+feed reader polling every few minutes costs a cache lookup, or a 304 when
+it sends back the ETag.
+"""
+import hashlib
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import http_date, quote_etag
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views import View
+from taggit.models import Tag
+
+from categories.models import Category
+from core.cache import get_versions
+from core.page_cache import TAG_VERSION, model_tag
+from core.user_models import User
+from .models import Post
+
+
+FEED_CACHE_KEY = 'feed:{digest}'
+
+
+def get_feed_length():
+    """Number of posts in a feed."""
+    return getattr(settings, 'BLOG_FEED_ITEMS', 20)
+
+
+class StreamingFeedMixin:
+    """Write a ``SyndicationFeed`` out in pieces rather than in one string."""
+    _head_only = False
+
+    def write_items(self, handler):
+        if not self._head_only:
+            super().write_items(handler)
+
+    def stream(self, encoding):
+        """Yield the document: everything before the entries, each entry, the end."""
+        self._head_only = True
+        try:
+            document = self.writeString(encoding)
+        finally:
+            self._head_only = False
+        end = document.rindex(self.end_tag)
+        yield document[:end]
+        for item in self.items:
+            out = StringIO()
+            handler = SimplerXMLGenerator(out, encoding, short_empty_elements=True)
+            handler.startElement(self.item_tag, self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_tag)
+            yield out.getvalue()
+        yield document[end:]
+
+
+class RssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    item_tag = 'item'
+    end_tag = '</channel>'
+
+    def rss_attributes(self):
+        attrs = super().rss_attributes()
+        attrs['xmlns:content'] = 'http://purl.org/rss/1.0/modules/content/'
+        return attrs
+
+    def add_item_elements(self, handler, item):
+        super().add_item_elements(handler, item)
+        if item.get('content'):
+            handler.addQuickElement('content:encoded', item['content'])
+
+
+class AtomFeed(StreamingFeedMixin, Atom1Feed):
+    item_tag = 'entry'
+    end_tag = '</feed>'
+
+    def add_item_elements(self, handler, item):
+        super().add_item_elements(handler, item)
+        if item.get('content'):
+            handler.addQuickElement('content', item['content'], {'type': 'html'})
+
+
+class PostFeedView(View):
+    """
+    The latest published posts as RSS or, with ``feed_format = 'atom'``, Atom.
+
+    Subclasses narrow it down to the posts of one object.
+    """
+    feed_format = 'rss'
+    feed_classes = {'rss': RssFeed, 'atom': AtomFeed}
+    title = "djCMS Blog"
+    description = "The latest posts"
+
+    def get_object(self):
+        return None
+
+    def get_queryset(self, obj):
+        return Post.objects.published()
+
+    def get_title(self, obj):
+        return self.title
+
+    def get_description(self, obj):
+        return self.description
+
+    def get_link(self, obj):
+        return reverse('blog:post_list')
+
+    def get_version_names(self, obj):
+        """Versions whose bump makes the cached feed stale."""
+        # Any post saved, deleted, published or unpublished, and any
+        # category renamed
+        return [TAG_VERSION.format(tag=model_tag(Post)), TAG_VERSION.format(tag=model_tag(Category))]
+
+    def get_cache_key(self, obj):
+        versions = get_versions(*self.get_version_names(obj))
+        parts = [self.request.build_absolute_uri(self.request.path), *sorted(versions.items())]
+        digest = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+        return FEED_CACHE_KEY.format(digest=digest), quote_etag(digest)
+
+    def build_feed(self, obj, posts):
+        request = self.request
+        feed = self.feed_classes[self.feed_format](
+            title=self.get_title(obj),
+            link=request.build_absolute_uri(self.get_link(obj)),
+            description=self.get_description(obj),
+            feed_url=request.build_absolute_uri(),
+            language=settings.LANGUAGE_CODE,
+        )
+        for post in posts:
+            link = request.build_absolute_uri(post.get_absolute_url())
+            feed.add_item(
+                title=post.title,
+                link=link,
+                unique_id=link,
+                description=post.excerpt or None,
+                content=post.rendered_content,
+                pubdate=post.published_at,
+                updateddate=post.updated_at,
+                author_name=post.author.display_name,
+                categories=[category.name for category in post.categories.all()],
+            )
+        return feed
+
+    def stream_and_cache(self, feed, key, last_modified):
+        chunks = []
+        for chunk in feed.stream('utf-8'):
+            chunks.append(chunk)
+            yield chunk
+        cache.set(key, {
+            'content': ''.join(chunks),
+            'content_type': feed.content_type,
+            'last_modified': last_modified,
+        }, getattr(settings, 'PAGE_CACHE_TIMEOUT', 600))
+
+    def get(self, request, *args, **kwargs):
+        obj = self.get_object()
+        key, etag = self.get_cache_key(obj)
+        entry = cache.get(key)
+        if entry is not None:
+            last_modified = entry['last_modified']
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = HttpResponse(entry['content'], content_type=entry['content_type'])
+        else:
+            posts = list(
+                self.get_queryset(obj).for_feeds().order_by('-published_at')[:get_feed_length()]
+            )
+            last_modified = int(max((post.updated_at.timestamp() for post in posts), default=time.time()))
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                feed = self.build_feed(obj, posts)
+                response = StreamingHttpResponse(
+                    self.stream_and_cache(feed, key, last_modified),
+                    content_type=feed.content_type,
+                )
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class CategoryPostFeedView(PostFeedView):
+    """Published posts in a category."""
+
+    def get_object(self):
+        return get_object_or_404(Category, slug=self.kwargs['slug'])
+
+    def get_queryset(self, obj):
+        return Post.objects.published().filter(categories=obj)
+
+    def get_title(self, obj):
+        return f"{self.title}: {obj.name}"
+
+    def get_description(self, obj):
+        return obj.description or f"The latest posts in {obj.name}"
+
+    def get_link(self, obj):
+        return reverse('blog:category_post_list', kwargs={'slug': obj.slug})
+
+
+class TagPostFeedView(PostFeedView):
+    """Published posts with a tag."""
+
+    def get_object(self):
+        return get_object_or_404(Tag, slug=self.kwargs['slug'])
+
+    def get_queryset(self, obj):
+        return Post.objects.published().filter(tags__slug=obj.slug)
+
+    def get_title(self, obj):
+        return f"{self.title}: #{obj.name}"
+
+    def get_description(self, obj):
+        return f"The latest posts tagged {obj.name}"
+
+    def get_link(self, obj):
+        return reverse('blog:tag_post_list', kwargs={'slug': obj.slug})
+
+
+class AuthorPostFeedView(PostFeedView):
+    """Published posts by an author."""
+
+    def get_object(self):
+        return get_object_or_404(User, username=self.kwargs['username'])
+
+    def get_queryset(self, obj):
+        return Post.objects.published().filter(author=obj)
+
+    def get_title(self, obj):
+        return f"{self.title}: {obj.display_name}"
+
+    def get_description(self, obj):
+        return f"The latest posts by {obj.display_name}"
+
+    def get_link(self, obj):
+        return reverse('blog:author_post_list', kwargs={'username': obj.username})
\ No newline at end of file
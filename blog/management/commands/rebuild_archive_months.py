@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import ArchiveMonth
+
+
+class Command(BaseCommand):
+    help = "Recount the published posts of every month in the date archive."
+
+    def handle(self, *args, **options):
+        ArchiveMonth.rebuild()
+        count = ArchiveMonth.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the archive: {count} month(s) with posts."))
\ No newline at end of file
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.related import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the related posts of every published post."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=None,
+            help="Worker processes to score posts with (default: one per CPU).",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=200,
+            help="Posts handed to a worker at a time.",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild(processes=options['processes'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt related posts for {count} post(s)."))
\ No newline at end of file
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 12:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_approved_comment_count(apps, schema_editor):
+    Model = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('comments', 'Comment')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    content_type = ContentType.objects.filter(app_label='blog', model='post').first()
+    if content_type is None:
+        return
+    approved = Comment.objects.filter(
+        content_type=content_type,
+        object_id=OuterRef('pk'),
+        status='approved',
+    ).order_by().values('object_id').annotate(count=Count('pk')).values('count')
+    Model.objects.update(approved_comment_count=Coalesce(Subquery(approved), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+        ('comments', '0001_initial'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='approved_comment_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Approved comments'),
+        ),
+        migrations.RunPython(backfill_approved_comment_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 12:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_relatedpost'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='blog_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Author')),
+                ('draft_count', models.PositiveIntegerField(default=0, verbose_name='Draft posts')),
+                ('published_count', models.PositiveIntegerField(default=0, verbose_name='Published posts')),
+                ('archived_count', models.PositiveIntegerField(default=0, verbose_name='Archived posts')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Approved comments received')),
+                ('last_published_at', models.DateTimeField(blank=True, null=True, verbose_name='Last published at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+            ],
+            options={
+                'verbose_name': 'Author stats',
+                'verbose_name_plural': 'Author stats',
+            },
+        ),
+    ]
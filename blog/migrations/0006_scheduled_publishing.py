@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-18 12:19
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Now
+
+
+def normalize_publication_dates(apps, schema_editor):
+    # Published rows now need a date, and a future one means scheduled
+    Model = apps.get_model('blog', 'Post')
+    Model.objects.filter(status='published', published_at__isnull=True).update(published_at=F('created_at'))
+    Model.objects.filter(status='published', published_at__gt=Now()).update(status='scheduled')
+
+
+def backfill_scheduled_count(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    AuthorStats = apps.get_model('blog', 'AuthorStats')
+    for stats in AuthorStats.objects.all():
+        stats.scheduled_count = Post.objects.filter(author_id=stats.author_id, status='scheduled').count()
+        stats.published_count = Post.objects.filter(author_id=stats.author_id, status='published').count()
+        stats.save(update_fields=['scheduled_count', 'published_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_rendered_content'),
+        ('categories', '0001_initial'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorstats',
+            name='scheduled_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Scheduled posts'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('scheduled', 'Scheduled'), ('published', 'Published'), ('archived', 'Archived')], default='draft', max_length=20, verbose_name='Status'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'published_at'], name='blog_post_status_pub_idx'),
+        ),
+        migrations.RunPython(normalize_publication_dates, migrations.RunPython.noop),
+        migrations.RunPython(backfill_scheduled_count, migrations.RunPython.noop),
+    ]
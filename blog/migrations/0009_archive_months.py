@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 12:27
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Now, TruncMonth
+from django.utils import timezone
+
+
+def build_archive_months(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ArchiveMonth = apps.get_model('blog', 'ArchiveMonth')
+    counts = Post.objects.filter(status='published', published_at__lte=Now()).annotate(
+        month_start=TruncMonth('published_at', tzinfo=timezone.get_default_timezone())
+    ).values('month_start').annotate(post_count=Count('pk')).order_by()
+    ArchiveMonth.objects.bulk_create(
+        ArchiveMonth(year=row['month_start'].year, month=row['month_start'].month, post_count=row['post_count'])
+        for row in counts
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_view_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Year')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Month')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Published posts')),
+            ],
+            options={
+                'verbose_name': 'Archive month',
+                'verbose_name_plural': 'Archive months',
+                'ordering': ['-year', '-month'],
+                'constraints': [models.UniqueConstraint(fields=('year', 'month'), name='blog_archivemonth_year_month')],
+            },
+        ),
+        migrations.RunPython(build_archive_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 12:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import Now
+
+
+def store_terms(apps, schema_editor):
+    """Store the terms of the published posts, as ``blog.related`` would."""
+    from blog.related import extract_terms, term_rows, use_terms
+
+    if not use_terms():
+        return
+    Post = apps.get_model('blog', 'Post')
+    PostTerm = apps.get_model('blog', 'PostTerm')
+    posts = Post.objects.filter(status='published', published_at__lte=Now()).values_list('pk', 'title', 'excerpt')
+    for pk, title, excerpt in posts.iterator(chunk_size=1000):
+        PostTerm.objects.bulk_create(
+            [PostTerm(post_id=post_id, term=term) for post_id, term in term_rows(pk, extract_terms(title, excerpt))],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_archive_months'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100, verbose_name='Term')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_terms', to='blog.post', verbose_name='Post')),
+            ],
+            options={
+                'verbose_name': 'Post term',
+                'verbose_name_plural': 'Post terms',
+                'indexes': [models.Index(fields=['term', 'post'], name='blog_postterm_term_post')],
+                'constraints': [models.UniqueConstraint(fields=('post', 'term'), name='blog_postterm_post_term')],
+            },
+        ),
+        migrations.RunPython(store_terms, migrations.RunPython.noop),
+    ]
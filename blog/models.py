@@ -1,4 +1,9 @@
-from django.db import models
+from datetime import date, datetime
+
+from django.db import models, transaction
+from django.db.models import Count, Max, Prefetch, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 from django.utils.text import slugify
@@ -6,13 +11,45 @@ from taggit.managers import TaggableManager
 from ckeditor.fields import RichTextField
 from django.contrib.contenttypes.fields import GenericRelation
 
-from core.models import PublishableModel, SEOModel
+from core.models import PublishableModel, PublishableQuerySet, SEOModel, CommentCountModel, ViewCountModel, RenderedContentModel
 from core.user_models import User
 from categories.models import Category
 from comments.models import Comment
 
 
-class Post(PublishableModel, SEOModel):
+class PostQuerySet(PublishableQuerySet):
+    """
+    QuerySet for posts, with the loading plans the templates need.
+    """
+    # Everything a post card shows; lists never need the content
+    CARD_FIELDS = (
+        'title', 'slug', 'excerpt', 'featured_image', 'status', 'published_at',
+        'created_at', 'updated_at', 'is_featured', 'approved_comment_count', 'author',
+    )
+    
+    def _with_relations(self):
+        return self.select_related('author').prefetch_related(
+            # Posts only ever show their categories as name/slug links
+            Prefetch('categories', queryset=Category.objects.only('id', 'name', 'slug')),
+            'tags',
+        )
+    
+    def for_cards(self):
+        """Author, categories and tags in three queries, without the content."""
+        return self._with_relations().only(*self.CARD_FIELDS)
+    
+    def for_detail(self):
+        """Everything the post page shows, in three queries."""
+        return self._with_relations()
+    
+    def for_feeds(self):
+        """What a feed entry shows: the rendered content, author and categories."""
+        return self.select_related('author').prefetch_related(
+            Prefetch('categories', queryset=Category.objects.only('id', 'name', 'slug')),
+        ).defer('content')
+
+
+class Post(PublishableModel, SEOModel, CommentCountModel, ViewCountModel, RenderedContentModel):
     """Model for blog posts."""
     title = models.CharField(_("Title"), max_length=200)
     slug = models.SlugField(_("Slug"), max_length=200, unique=True)
@@ -36,6 +73,8 @@ class Post(PublishableModel, SEOModel):
     tags = TaggableManager(blank=True)
     comments = GenericRelation(Comment)
     
+    objects = PostQuerySet.as_manager()
+    
     # Additional fields
     is_featured = models.BooleanField(_("Featured"), default=False)
     allow_comments = models.BooleanField(_("Allow comments"), default=True)
@@ -44,6 +83,16 @@ class Post(PublishableModel, SEOModel):
         verbose_name = _("Post")
         verbose_name_plural = _("Posts")
         ordering = ['-published_at']
+        indexes = [
+            models.Index(fields=['status', 'published_at'], name='blog_post_status_pub_idx'),
+            models.Index(fields=['status', 'is_featured', 'published_at'], name='blog_post_featured_idx'),
+            # Lists only ever show published posts, so leave the others out
+            models.Index(
+                fields=['-published_at'],
+                name='blog_post_published_idx',
+                condition=Q(status=PublishableModel.STATUS_PUBLISHED),
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -61,31 +110,231 @@ class Post(PublishableModel, SEOModel):
     @property
     def comment_count(self):
         """Get the number of approved comments."""
-        return self.comments.filter(status=Comment.STATUS_APPROVED).count()
+        return self.approved_comment_count
         
     # Add a method to get comments count for annotated querysets
     def get_comments_count(self):
         """Get the number of approved comments (for annotated querysets)."""
         if hasattr(self, 'comments_count'):
             return self.comments_count
-        return self.comment_count
+        return self.approved_comment_count
     
     @property
     def related_posts(self):
-        """Get related posts based on categories and tags."""
-        # Get posts with the same categories
-        category_posts = Post.objects.filter(
-            categories__in=self.categories.all(),
-            status=self.STATUS_PUBLISHED
-        ).exclude(pk=self.pk).distinct()
-        
-        # Get posts with the same tags
-        tag_posts = Post.objects.filter(
-            tags__name__in=self.tags.names(),
-            status=self.STATUS_PUBLISHED
-        ).exclude(pk=self.pk).distinct()
-        
-        # Combine and remove duplicates
-        related = (category_posts | tag_posts).distinct()
-        
-        return related[:3]  # Return up to 3 related posts
\ No newline at end of file
+        """Get related posts, best match first, from the related posts index."""
+        return Post.objects.published().for_cards().filter(
+            related_from__post=self
+        ).order_by('related_from__rank')[:3]
+
+
+class RelatedPost(models.Model):
+    """
+    A precomputed related post, maintained by ``blog.related``.
+    
+    Each published post keeps its best-scoring neighbours, ranked from 0.
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_entries',
+        verbose_name=_("Post")
+    )
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_from',
+        verbose_name=_("Related post")
+    )
+    score = models.FloatField(_("Score"))
+    rank = models.PositiveSmallIntegerField(_("Rank"))
+    
+    class Meta:
+        verbose_name = _("Related post")
+        verbose_name_plural = _("Related posts")
+        ordering = ['post', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'rank'], name='blog_relatedpost_post_rank'),
+        ]
+    
+    def __str__(self):
+        return f"{self.post} -> {self.related}"
+
+
+class PostTerm(models.Model):
+    """
+    A significant word of a published post's title or excerpt.
+    
+    Maintained by ``blog.related``, so the posts sharing a word with a
+    changed post are found through an index rather than by reading them all.
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_terms',
+        verbose_name=_("Post")
+    )
+    term = models.CharField(_("Term"), max_length=100)
+    
+    class Meta:
+        verbose_name = _("Post term")
+        verbose_name_plural = _("Post terms")
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'term'], name='blog_postterm_post_term'),
+        ]
+        indexes = [
+            models.Index(fields=['term', 'post'], name='blog_postterm_term_post'),
+        ]
+    
+    def __str__(self):
+        return f"{self.post}: {self.term}"
+
+
+class AuthorStats(models.Model):
+    """
+    Per-author post totals for the author dashboard.
+    
+    Kept current by ``blog.signals`` whenever an author's posts or their
+    comment counts change, so the dashboard reads one row however many
+    posts the author has.
+    """
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='blog_stats',
+        verbose_name=_("Author")
+    )
+    draft_count = models.PositiveIntegerField(_("Draft posts"), default=0)
+    scheduled_count = models.PositiveIntegerField(_("Scheduled posts"), default=0)
+    published_count = models.PositiveIntegerField(_("Published posts"), default=0)
+    archived_count = models.PositiveIntegerField(_("Archived posts"), default=0)
+    comment_count = models.PositiveIntegerField(_("Approved comments received"), default=0)
+    last_published_at = models.DateTimeField(_("Last published at"), null=True, blank=True)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+    
+    class Meta:
+        verbose_name = _("Author stats")
+        verbose_name_plural = _("Author stats")
+    
+    def __str__(self):
+        return f"Stats for {self.author}"
+    
+    @property
+    def total_count(self):
+        return self.draft_count + self.scheduled_count + self.published_count + self.archived_count
+    
+    @staticmethod
+    def aggregate(author_id):
+        """Compute an author's totals in one conditional-aggregate query."""
+        totals = Post.objects.filter(author_id=author_id).aggregate(
+            draft_count=Count('pk', filter=Q(status=Post.STATUS_DRAFT)),
+            scheduled_count=Count('pk', filter=Q(status=Post.STATUS_SCHEDULED)),
+            published_count=Count('pk', filter=Q(status=Post.STATUS_PUBLISHED)),
+            archived_count=Count('pk', filter=Q(status=Post.STATUS_ARCHIVED)),
+            comment_count=Sum('approved_comment_count'),
+            last_published_at=Max('published_at', filter=Q(status=Post.STATUS_PUBLISHED)),
+        )
+        totals['comment_count'] = totals['comment_count'] or 0
+        return totals
+    
+    @classmethod
+    def refresh(cls, author_id, create=True):
+        """
+        Recompute and store the totals for one author. With ``create=False``
+        only an existing row is updated.
+        """
+        totals = cls.aggregate(author_id)
+        if not create:
+            cls.objects.filter(author_id=author_id).update(**totals)
+            return None
+        stats, created = cls.objects.update_or_create(author_id=author_id, defaults=totals)
+        return stats
+    
+    @classmethod
+    def for_author(cls, author):
+        """Return the stored totals for ``author``, computing them on first use."""
+        try:
+            return cls.objects.get(author=author)
+        except cls.DoesNotExist:
+            return cls.refresh(author.pk)
+
+
+def month_bounds(year, month):
+    """Return the aware datetimes a month starts and ends at, in the site's time zone."""
+    tz = timezone.get_default_timezone()
+    start = datetime(year, month, 1, tzinfo=tz)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=tz)
+    return start, end
+
+
+class ArchiveMonth(models.Model):
+    """
+    The number of published posts in a month, for the date archive.
+    
+    Kept current by ``blog.signals``, which recounts only the months a
+    post was or is published in whenever it changes, so the archive widget
+    reads a row per month instead of grouping every post by date.
+    """
+    year = models.PositiveSmallIntegerField(_("Year"))
+    month = models.PositiveSmallIntegerField(_("Month"))
+    post_count = models.PositiveIntegerField(_("Published posts"), default=0)
+    
+    class Meta:
+        verbose_name = _("Archive month")
+        verbose_name_plural = _("Archive months")
+        ordering = ['-year', '-month']
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'month'], name='blog_archivemonth_year_month'),
+        ]
+    
+    def __str__(self):
+        return f"{self.year}-{self.month:02d}: {self.post_count}"
+    
+    @property
+    def date(self):
+        return date(self.year, self.month, 1)
+    
+    def get_absolute_url(self):
+        return reverse('blog:post_month_archive', kwargs={'year': self.year, 'month': self.month})
+    
+    @staticmethod
+    def months_of(*datetimes):
+        """The ``(year, month)`` pairs of ``datetimes``, in the site's time zone."""
+        tz = timezone.get_default_timezone()
+        months = set()
+        for value in datetimes:
+            if value is not None:
+                value = timezone.localtime(value, tz)
+                months.add((value.year, value.month))
+        return months
+    
+    @classmethod
+    def refresh(cls, *months):
+        """Recount the published posts of each ``(year, month)`` given."""
+        for year, month in months:
+            start, end = month_bounds(year, month)
+            count = Post.objects.published().filter(published_at__gte=start, published_at__lt=end).count()
+            if count:
+                cls.objects.update_or_create(year=year, month=month, defaults={'post_count': count})
+            else:
+                cls.objects.filter(year=year, month=month).delete()
+    
+    @classmethod
+    def refresh_posts(cls, pks):
+        """Recount the months the posts ``pks`` are dated in."""
+        dates = Post.objects.filter(pk__in=pks).values_list('published_at', flat=True)
+        cls.refresh(*cls.months_of(*dates))
+    
+    @classmethod
+    def rebuild(cls):
+        """Recount every month from scratch."""
+        tz = timezone.get_default_timezone()
+        counts = Post.objects.published().annotate(
+            month_start=TruncMonth('published_at', tzinfo=tz)
+        ).values('month_start').annotate(post_count=Count('pk')).order_by()
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                cls(year=row['month_start'].year, month=row['month_start'].month, post_count=row['post_count'])
+                for row in counts
+            )
\ No newline at end of file
@@ -0,0 +1,374 @@
+"""
+Related posts index.
+
+For every published post, ``RelatedPost`` rows hold its best-scoring
+neighbours. Posts score by shared categories and tags, weighted, plus an
+optional similarity of the words in their titles and excerpts. Scoring
+only looks at posts sharing something with the post, found through
+inverted indexes, and doesn't touch the database, so a full rebuild can
+be spread over several processes.
+
+Updating after a change loads only the changed posts and the posts sharing
+a category, tag or word (``PostTerm``) with them, found through the
+indexes on those tables.
+"""
+import multiprocessing
+import re
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.html import strip_tags
+
+
+CATEGORY_WEIGHT = 3.0
+TAG_WEIGHT = 2.0
+TERM_WEIGHT = 4.0
+
+STOP_WORDS = frozenset("""
+    about after also and are been but can for from had has have how into its
+    more not now our out over she that the their them then there these they
+    this was were what when which who will with would you your
+""".split())
+
+_WORD_RE = re.compile(r'[^\W\d_]{3,}')
+
+# Longest term stored in PostTerm; longer ones are matched on their prefix
+TERM_MAX_LENGTH = 100
+
+Features = namedtuple('Features', ('categories', 'tags', 'terms'))
+
+
+def get_limit():
+    """Number of related posts stored per post."""
+    return getattr(settings, 'RELATED_POSTS_LIMIT', 5)
+
+
+def use_terms():
+    """Whether title and excerpt words count towards the score."""
+    return getattr(settings, 'RELATED_POSTS_USE_TERMS', True)
+
+
+def extract_terms(*texts):
+    """Return the set of significant lowercase words in ``texts``."""
+    words = _WORD_RE.findall(strip_tags(' '.join(texts)).lower())
+    return frozenset(word for word in words if word not in STOP_WORDS)
+
+
+def term_rows(pk, terms):
+    """Return the ``(post_id, term)`` pairs storing ``terms`` for post ``pk``."""
+    return [(pk, term) for term in sorted({term[:TERM_MAX_LENGTH] for term in terms})]
+
+
+def _rank(entry):
+    """Sort key ranking ``(other_pk, score)`` pairs best first."""
+    other, score = entry
+    return (-score, -other)
+
+
+class RelatedIndex:
+    """Scores posts against each other from their ``Features``."""
+
+    def __init__(self, features, with_terms=True):
+        self.features = features
+        self.with_terms = with_terms
+        self.by_category = {}
+        self.by_tag = {}
+        self.by_term = {}
+        for pk, post in features.items():
+            for category in post.categories:
+                self.by_category.setdefault(category, set()).add(pk)
+            for tag in post.tags:
+                self.by_tag.setdefault(tag, set()).add(pk)
+            if with_terms:
+                for term in post.terms:
+                    self.by_term.setdefault(term, set()).add(pk)
+
+    def score(self, a, b):
+        a, b = self.features[a], self.features[b]
+        score = (
+            CATEGORY_WEIGHT * len(a.categories & b.categories)
+            + TAG_WEIGHT * len(a.tags & b.tags)
+        )
+        if self.with_terms and a.terms and b.terms:
+            # Jaccard similarity, so long excerpts don't win by length alone
+            shared = len(a.terms & b.terms)
+            if shared:
+                score += TERM_WEIGHT * shared / len(a.terms | b.terms)
+        return score
+
+    def candidates(self, pk):
+        """Return the posts sharing at least a category, tag or term with ``pk``."""
+        post = self.features[pk]
+        found = set()
+        for category in post.categories:
+            found |= self.by_category[category]
+        for tag in post.tags:
+            found |= self.by_tag[tag]
+        if self.with_terms:
+            for term in post.terms:
+                found |= self.by_term[term]
+        found.discard(pk)
+        return found
+
+    def scores(self, pk):
+        """Return ``{other_pk: score}`` for every post related to ``pk``."""
+        scores = {}
+        for other in self.candidates(pk):
+            score = self.score(pk, other)
+            if score > 0:
+                scores[other] = score
+        return scores
+
+    def neighbours(self, pk, limit):
+        """Return the ``limit`` best ``(other_pk, score)`` pairs for ``pk``."""
+        ranked = sorted(self.scores(pk).items(), key=_rank)
+        return ranked[:limit]
+
+
+def load_features(pks=None):
+    """
+    Load the categories, tags and terms of the published posts among
+    ``pks``, or of every published post.
+    """
+    from django.contrib.contenttypes.models import ContentType
+    from taggit.models import TaggedItem
+    from .models import Post
+
+    posts = Post.objects.published()
+    if pks is not None:
+        posts = posts.filter(pk__in=pks)
+    posts = posts.values_list('pk', 'title', 'excerpt')
+    categories = {}
+    tags = {}
+    terms = {}
+    for pk, title, excerpt in posts:
+        categories[pk] = set()
+        tags[pk] = set()
+        terms[pk] = extract_terms(title, excerpt) if use_terms() else frozenset()
+
+    through = Post.categories.through.objects.all()
+    tagged = TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Post))
+    if pks is not None:
+        through = through.filter(post_id__in=list(categories))
+        tagged = tagged.filter(object_id__in=list(categories))
+
+    for post_id, category_id in through.values_list('post_id', 'category_id'):
+        if post_id in categories:
+            categories[post_id].add(category_id)
+
+    for object_id, tag_id in tagged.values_list('object_id', 'tag_id'):
+        if object_id in tags:
+            tags[object_id].add(tag_id)
+
+    return {
+        pk: Features(frozenset(categories[pk]), frozenset(tags[pk]), terms[pk])
+        for pk in categories
+    }
+
+
+def find_candidates(pks):
+    """
+    Return the pks of the posts sharing a category, tag or stored term with
+    one of the posts ``pks``, those included.
+    """
+    from django.contrib.contenttypes.models import ContentType
+    from taggit.models import TaggedItem
+    from .models import Post, PostTerm
+
+    pks = list(pks)
+    through = Post.categories.through.objects
+    tagged = TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Post))
+
+    found = set(pks)
+    found.update(through.filter(
+        category_id__in=through.filter(post_id__in=pks).values('category_id')
+    ).values_list('post_id', flat=True))
+    found.update(tagged.filter(
+        tag_id__in=tagged.filter(object_id__in=pks).values('tag_id')
+    ).values_list('object_id', flat=True))
+    if use_terms():
+        found.update(PostTerm.objects.filter(
+            term__in=PostTerm.objects.filter(post_id__in=pks).values('term')
+        ).values_list('post_id', flat=True))
+    return found
+
+
+def store_terms(pks, features):
+    """Replace the stored terms of the posts ``pks`` with those in ``features``."""
+    from .models import PostTerm
+
+    rows = [
+        PostTerm(post_id=post_id, term=term)
+        for pk in pks if pk in features
+        for post_id, term in term_rows(pk, features[pk].terms)
+    ]
+    with transaction.atomic():
+        PostTerm.objects.filter(post_id__in=list(pks)).delete()
+        PostTerm.objects.bulk_create(rows, batch_size=1000)
+
+
+def store(neighbourhoods):
+    """
+    Replace the stored related posts of each post in ``neighbourhoods``, a
+    dict mapping post pks to ranked ``(other_pk, score)`` lists.
+    """
+    from .models import RelatedPost
+
+    rows = [
+        RelatedPost(post_id=pk, related_id=other, score=score, rank=rank)
+        for pk, neighbours in neighbourhoods.items()
+        for rank, (other, score) in enumerate(neighbours)
+    ]
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=list(neighbourhoods)).delete()
+        RelatedPost.objects.bulk_create(rows, batch_size=1000)
+
+
+def update_related(pks):
+    """
+    Refresh the related posts affected by changes to the posts in ``pks``.
+
+    Those posts get their own lists recomputed. So does every post that
+    lists one of them or now shares something with one of them: their
+    stored lists are merged with the changed posts' new scores, and only
+    recomputed from their own candidates when that leaves a list short of
+    posts that might have been ranked below its old weakest entry. Nothing
+    else is touched.
+    """
+    from core.page_cache import purge_tags, model_tag
+    from .models import Post, RelatedPost
+
+    pks = set(pks)
+    limit = get_limit()
+    with_terms = use_terms()
+
+    store_terms(pks, load_features(pks) if with_terms else {})
+    features = load_features(find_candidates(pks))
+    index = RelatedIndex(features, with_terms)
+
+    scores = {pk: index.scores(pk) for pk in pks if pk in features}
+    affected = set().union(*(s.keys() for s in scores.values()))
+    # Posts currently listing a changed post may need to drop or reorder it
+    affected.update(RelatedPost.objects.filter(related_id__in=pks).values_list('post_id', flat=True))
+    affected -= pks
+
+    stored = {}
+    rows = RelatedPost.objects.filter(
+        post_id__in=pks | affected
+    ).order_by('post_id', 'rank').values_list('post_id', 'related_id', 'score')
+    for post_id, related_id, score in rows:
+        stored.setdefault(post_id, []).append((related_id, score))
+
+    neighbourhoods = {}
+    for pk in pks:
+        # Unpublished or deleted posts list nothing
+        neighbourhoods[pk] = index.neighbours(pk, limit) if pk in features else []
+
+    recompute = set()
+    for pk in affected:
+        entries = stored.get(pk, [])
+        merged = [(other, score) for other, score in entries if other not in pks]
+        merged.extend(
+            (other, post_scores[pk]) for other, post_scores in scores.items() if pk in post_scores
+        )
+        merged.sort(key=_rank)
+        # Posts left out of a full list ranked below its weakest entry
+        if len(entries) == limit and (len(merged) < limit or _rank(merged[limit - 1]) > _rank(entries[-1])):
+            recompute.add(pk)
+        else:
+            neighbourhoods[pk] = merged[:limit]
+
+    if recompute:
+        features.update(load_features(find_candidates(recompute) - set(features)))
+        index = RelatedIndex(features, with_terms)
+        for pk in recompute:
+            neighbourhoods[pk] = index.neighbours(pk, limit) if pk in features else []
+
+    changed = [
+        pk for pk, neighbours in neighbourhoods.items()
+        if stored.get(pk, []) != neighbours
+    ]
+    store({pk: neighbourhoods[pk] for pk in changed})
+    if changed:
+        tag = model_tag(Post)
+        purge_tags(*(f"{tag}:{pk}" for pk in changed))
+    return changed
+
+
+_pending = threading.local()
+
+
+def _flush_pending():
+    pks = getattr(_pending, 'pks', None)
+    if pks:
+        _pending.pks = set()
+        update_related(pks)
+
+
+def schedule_update(*pks):
+    """
+    Update the related posts for ``pks`` once the current transaction commits.
+
+    An admin save touches the post, its categories and its tags separately;
+    the updates they schedule are merged into one.
+    """
+    if not hasattr(_pending, 'pks'):
+        _pending.pks = set()
+    _pending.pks.update(pks)
+    transaction.on_commit(_flush_pending)
+
+
+# Set in each worker process of a rebuild
+_worker_index = None
+
+
+def _init_worker(features, with_terms):
+    global _worker_index
+    _worker_index = RelatedIndex(features, with_terms)
+
+
+def _neighbours_chunk(args):
+    pks, limit = args
+    return [(pk, _worker_index.neighbours(pk, limit)) for pk in pks]
+
+
+def rebuild(processes=None, chunk_size=200):
+    """
+    Recompute the related posts, and the stored terms, of every published post.
+
+    Scoring runs in a pool of ``processes`` worker processes (one per CPU by
+    default, none when 1); the results are written in one transaction.
+    Returns the number of posts processed.
+    """
+    from core.page_cache import purge_tags, model_tag
+    from .models import Post, PostTerm, RelatedPost
+
+    features = load_features()
+    limit = get_limit()
+    with_terms = use_terms()
+    pks = sorted(features)
+    chunks = [(pks[i:i + chunk_size], limit) for i in range(0, len(pks), chunk_size)]
+
+    if processes == 1 or len(chunks) <= 1:
+        _init_worker(features, with_terms)
+        results = [_neighbours_chunk(chunk) for chunk in chunks]
+    else:
+        with multiprocessing.Pool(processes, _init_worker, (features, with_terms)) as pool:
+            results = pool.map(_neighbours_chunk, chunks)
+
+    neighbourhoods = {pk: neighbours for chunk in results for pk, neighbours in chunk}
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        store(neighbourhoods)
+        PostTerm.objects.all().delete()
+        if with_terms:
+            PostTerm.objects.bulk_create((
+                PostTerm(post_id=post_id, term=term)
+                for pk in pks
+                for post_id, term in term_rows(pk, features[pk].terms)
+            ), batch_size=1000)
+    # Every post detail page lists its related posts
+    purge_tags(model_tag(Post))
+    return len(neighbourhoods)
\ No newline at end of file
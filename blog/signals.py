@@ -0,0 +1,111 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from taggit.models import TaggedItem
+
+from comments.counts import counts_changed
+from core.signals import content_changed
+from .models import Post, RelatedPost, AuthorStats, ArchiveMonth
+from .related import schedule_update
+
+
+# Saving only other fields can't change what a post is related to
+RELATED_FIELDS = {'title', 'excerpt', 'status'}
+
+# ... nor which month of the archive it's counted in
+ARCHIVE_FIELDS = {'status', 'published_at'}
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or RELATED_FIELDS & set(update_fields):
+        schedule_update(instance.pk)
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    # Its rows go with it, so remember who listed it
+    instance._related_listed_by = list(
+        RelatedPost.objects.filter(related=instance).values_list('post_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    schedule_update(*getattr(instance, '_related_listed_by', ()))
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def post_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        schedule_update(instance.pk)
+    elif pk_set:
+        schedule_update(*pk_set)
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def post_tags_changed(sender, instance, action, **kwargs):
+    if action.startswith('post_') and isinstance(instance, Post):
+        schedule_update(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, **kwargs):
+    # A post moved to another author changes both authors' stats, and one
+    # redated or unpublished the count of the month it was published in
+    instance._previous_author_id = None
+    instance._previous_published_at = None
+    if instance.pk is not None:
+        previous = Post.objects.filter(pk=instance.pk).values('author_id', 'status', 'published_at').first()
+        if previous is not None:
+            instance._previous_author_id = previous['author_id']
+            if previous['status'] == Post.STATUS_PUBLISHED:
+                instance._previous_published_at = previous['published_at']
+
+
+@receiver(post_save, sender=Post)
+def refresh_author_stats(sender, instance, **kwargs):
+    AuthorStats.refresh(instance.author_id)
+    previous = getattr(instance, '_previous_author_id', None)
+    if previous is not None and previous != instance.author_id:
+        AuthorStats.refresh(previous, create=False)
+
+
+@receiver(post_delete, sender=Post)
+def refresh_author_stats_on_delete(sender, instance, **kwargs):
+    # The author may be being deleted too, so never create a row here
+    AuthorStats.refresh(instance.author_id, create=False)
+
+
+@receiver(counts_changed, sender=Post)
+def post_comment_counts_changed(sender, pks, **kwargs):
+    author_ids = Post.objects.filter(pk__in=pks).values_list('author_id', flat=True).distinct()
+    for author_id in author_ids:
+        AuthorStats.refresh(author_id)
+
+
+@receiver(content_changed, sender=Post)
+def posts_changed(sender, pks, **kwargs):
+    # A queryset update, e.g. scheduled posts being published
+    schedule_update(*pks)
+    author_ids = Post.objects.filter(pk__in=pks).values_list('author_id', flat=True).distinct()
+    for author_id in author_ids:
+        AuthorStats.refresh(author_id)
+    ArchiveMonth.refresh_posts(pks)
+
+
+@receiver(post_save, sender=Post)
+def refresh_archive_months(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not ARCHIVE_FIELDS & set(update_fields):
+        return
+    months = ArchiveMonth.months_of(getattr(instance, '_previous_published_at', None))
+    if instance.status == Post.STATUS_PUBLISHED:
+        months |= ArchiveMonth.months_of(instance.published_at)
+    ArchiveMonth.refresh(*months)
+
+
+@receiver(post_delete, sender=Post)
+def refresh_archive_months_on_delete(sender, instance, **kwargs):
+    if instance.status == Post.STATUS_PUBLISHED:
+        ArchiveMonth.refresh(*ArchiveMonth.months_of(instance.published_at))
\ No newline at end of file
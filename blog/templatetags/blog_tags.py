@@ -1,9 +1,9 @@
 from django import template
-from django.db.models import Count, Q
 
-from blog.models import Post
+from blog.models import Post, ArchiveMonth
 from categories.models import Category
-from comments.models import Comment
+from categories.tree import get_category_tree
+from core.page_cache import record_dependency
 
 register = template.Library()
 
@@ -11,36 +11,44 @@ register = template.Library()
 @register.simple_tag
 def get_recent_posts(count=5):
     """Return recent published posts."""
-    return Post.objects.filter(
-        status=Post.STATUS_PUBLISHED
-    ).order_by('-published_at')[:count]
+    record_dependency(Post)
+    return Post.objects.published().for_cards().order_by('-published_at')[:count]
 
 
 @register.simple_tag
 def get_featured_posts(count=3):
     """Return featured published posts."""
-    return Post.objects.filter(
-        status=Post.STATUS_PUBLISHED,
+    record_dependency(Post)
+    return Post.objects.published().for_cards().filter(
         is_featured=True
     ).order_by('-published_at')[:count]
 
 
 @register.simple_tag
-def get_popular_posts(count=5):
-    """Return popular published posts based on comment count."""
-    return Post.objects.filter(
-        status=Post.STATUS_PUBLISHED
-    ).annotate(
-        comments_count=Count('comments', filter=Q(comments__status=Comment.STATUS_APPROVED))
-    ).order_by('-comments_count')[:count]
+def get_popular_posts(count=5, order='comments'):
+    """
+    Return popular published posts: those with the most comments or, with
+    ``order='trending'``, the most views lately.
+    """
+    record_dependency(Post)
+    posts = Post.objects.published().for_cards()
+    if order == 'trending':
+        return posts.trending()[:count]
+    return posts.order_by('-approved_comment_count', '-published_at')[:count]
+
+
+@register.simple_tag
+def get_archive_months(count=12):
+    """Return the latest months with published posts, and their counts."""
+    record_dependency(Post)
+    return ArchiveMonth.objects.all()[:count]
 
 
 @register.simple_tag
 def get_popular_categories(count=5):
     """Return popular categories based on post count."""
-    return Category.objects.annotate(
-        post_count=Count('blog_posts')
-    ).filter(post_count__gt=0).order_by('-post_count')[:count]
+    record_dependency(Category, Post)
+    return get_category_tree().popular(count)
 
 
 @register.inclusion_tag('blog/tags/recent_posts.html')
@@ -58,7 +66,14 @@ def show_featured_posts(count=3):
 
 
 @register.inclusion_tag('blog/tags/popular_posts.html')
-def show_popular_posts(count=5):
+def show_popular_posts(count=5, order='comments'):
     """Render popular posts."""
-    posts = get_popular_posts(count)
-    return {'posts': posts}
\ No newline at end of file
+    posts = get_popular_posts(count, order)
+    return {'posts': posts}
+
+
+@register.inclusion_tag('blog/tags/archive.html')
+def show_archive(count=12):
+    """Render links to the latest monthly archives."""
+    months = get_archive_months(count)
+    return {'months': months}
\ No newline at end of file
@@ -1,13 +1,23 @@
 from django.urls import path
-from . import views
+from . import feeds, views
 
 app_name = 'blog'
 
 urlpatterns = [
     path('', views.PostListView.as_view(), name='post_list'),
+    path('feed/', feeds.PostFeedView.as_view(), name='feed'),
+    path('feed/atom/', feeds.PostFeedView.as_view(feed_format='atom'), name='feed_atom'),
+    path('<int:year>/', views.PostYearArchiveView.as_view(), name='post_year_archive'),
+    path('<int:year>/<int:month>/', views.PostMonthArchiveView.as_view(), name='post_month_archive'),
     path('post/<slug:slug>/', views.PostDetailView.as_view(), name='post_detail'),
     path('category/<slug:slug>/', views.CategoryPostListView.as_view(), name='category_post_list'),
+    path('category/<slug:slug>/feed/', feeds.CategoryPostFeedView.as_view(), name='category_feed'),
+    path('category/<slug:slug>/feed/atom/', feeds.CategoryPostFeedView.as_view(feed_format='atom'), name='category_feed_atom'),
     path('tag/<slug:slug>/', views.TagPostListView.as_view(), name='tag_post_list'),
+    path('tag/<slug:slug>/feed/', feeds.TagPostFeedView.as_view(), name='tag_feed'),
+    path('tag/<slug:slug>/feed/atom/', feeds.TagPostFeedView.as_view(feed_format='atom'), name='tag_feed_atom'),
     path('author/<str:username>/', views.AuthorPostListView.as_view(), name='author_post_list'),
+    path('author/<str:username>/feed/', feeds.AuthorPostFeedView.as_view(), name='author_feed'),
+    path('author/<str:username>/feed/atom/', feeds.AuthorPostFeedView.as_view(feed_format='atom'), name='author_feed_atom'),
     path('dashboard/', views.AuthorDashboardView.as_view(), name='author_dashboard'),
 ]
\ No newline at end of file
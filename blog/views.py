@@ -1,51 +1,54 @@
 from django.shortcuts import render, get_object_or_404
+from django.http import Http404
 from django.views.generic import ListView, DetailView
-from django.db.models import Count, Q
 from django.contrib.auth.mixins import LoginRequiredMixin
 from taggit.models import Tag
 
-from .models import Post
+from .models import Post, AuthorStats, ArchiveMonth, month_bounds
+from core.conditional import ConditionalGetMixin
+from core.page_cache import PageCacheMixin
+from core.pagination import CursorPaginationMixin
+from core.view_counts import ViewCountMixin
 from categories.models import Category
+from categories.tree import get_category_tree
 from core.user_models import User
-from comments.models import Comment
 
 
-class PostListView(ListView):
+class PostListView(ConditionalGetMixin, PageCacheMixin, CursorPaginationMixin, ListView):
     """View for listing blog posts."""
     model = Post
+    page_cache_models = (Category,)
     context_object_name = 'posts'
     template_name = 'blog/post_list.html'
     paginate_by = 10
     
     def get_queryset(self):
         """Return only published posts."""
-        return Post.objects.filter(status=Post.STATUS_PUBLISHED).order_by('-published_at')
+        return Post.objects.published().for_cards().order_by('-published_at')
     
     def get_context_data(self, **kwargs):
         """Add extra context."""
         context = super().get_context_data(**kwargs)
-        context['featured_posts'] = Post.objects.filter(
-            status=Post.STATUS_PUBLISHED,
+        context['featured_posts'] = Post.objects.published().for_cards().filter(
             is_featured=True
         ).order_by('-published_at')[:3]
         
         # Get popular categories
-        context['popular_categories'] = Category.objects.annotate(
-            post_count=Count('blog_posts')
-        ).filter(post_count__gt=0).order_by('-post_count')[:5]
+        context['popular_categories'] = get_category_tree().popular(5)
         
         return context
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ViewCountMixin, ConditionalGetMixin, PageCacheMixin, DetailView):
     """View for blog post detail."""
     model = Post
+    page_cache_models = (Post,)
     context_object_name = 'post'
     template_name = 'blog/post_detail.html'
     
     def get_queryset(self):
         """Return only published posts."""
-        return Post.objects.filter(status=Post.STATUS_PUBLISHED)
+        return Post.objects.published().for_detail()
     
     def get_context_data(self, **kwargs):
         """Add extra context."""
@@ -55,18 +58,17 @@ class PostDetailView(DetailView):
         context['related_posts'] = self.object.related_posts
         
         # Get popular posts
-        context['popular_posts'] = Post.objects.filter(
-            status=Post.STATUS_PUBLISHED
-        ).annotate(
-            comments_count=Count('comments', filter=Q(comments__status=Comment.STATUS_APPROVED))
-        ).order_by('-comments_count')[:3]
+        context['popular_posts'] = Post.objects.published().for_cards().order_by(
+            '-approved_comment_count', '-published_at'
+        )[:3]
         
         return context
 
 
-class CategoryPostListView(ListView):
+class CategoryPostListView(ConditionalGetMixin, PageCacheMixin, CursorPaginationMixin, ListView):
     """View for listing posts by category."""
     model = Post
+    page_cache_models = (Category,)
     context_object_name = 'posts'
     template_name = 'blog/category_post_list.html'
     paginate_by = 10
@@ -74,8 +76,7 @@ class CategoryPostListView(ListView):
     def get_queryset(self):
         """Return published posts for the given category."""
         self.category = get_object_or_404(Category, slug=self.kwargs['slug'])
-        return Post.objects.filter(
-            status=Post.STATUS_PUBLISHED,
+        return Post.objects.published().for_cards().filter(
             categories=self.category
         ).order_by('-published_at')
     
@@ -83,12 +84,14 @@ class CategoryPostListView(ListView):
         """Add category to context."""
         context = super().get_context_data(**kwargs)
         context['category'] = self.category
+        context['category_node'] = get_category_tree().get(self.category.pk)
         return context
 
 
-class TagPostListView(ListView):
+class TagPostListView(ConditionalGetMixin, PageCacheMixin, CursorPaginationMixin, ListView):
     """View for listing posts by tag."""
     model = Post
+    page_cache_models = (Category,)
     context_object_name = 'posts'
     template_name = 'blog/tag_post_list.html'
     paginate_by = 10
@@ -96,8 +99,7 @@ class TagPostListView(ListView):
     def get_queryset(self):
         """Return published posts for the given tag."""
         self.tag = get_object_or_404(Tag, slug=self.kwargs['slug'])
-        return Post.objects.filter(
-            status=Post.STATUS_PUBLISHED,
+        return Post.objects.published().for_cards().filter(
             tags__slug=self.tag.slug
         ).order_by('-published_at')
     
@@ -105,12 +107,14 @@ class TagPostListView(ListView):
         """Add tag to context."""
         context = super().get_context_data(**kwargs)
         context['tag'] = self.tag
+        context['category_list'] = get_category_tree().roots
         return context
 
 
-class AuthorPostListView(ListView):
+class AuthorPostListView(ConditionalGetMixin, PageCacheMixin, CursorPaginationMixin, ListView):
     """View for listing posts by author."""
     model = Post
+    page_cache_models = (Category,)
     context_object_name = 'posts'
     template_name = 'blog/author_post_list.html'
     paginate_by = 10
@@ -118,8 +122,7 @@ class AuthorPostListView(ListView):
     def get_queryset(self):
         """Return published posts for the given author."""
         self.author = get_object_or_404(User, username=self.kwargs['username'])
-        return Post.objects.filter(
-            status=Post.STATUS_PUBLISHED,
+        return Post.objects.published().for_cards().filter(
             author=self.author
         ).order_by('-published_at')
     
@@ -127,6 +130,62 @@ class AuthorPostListView(ListView):
         """Add author to context."""
         context = super().get_context_data(**kwargs)
         context['author'] = self.author
+        context['category_list'] = get_category_tree().roots
+        return context
+
+
+class PostYearArchiveView(ConditionalGetMixin, PageCacheMixin, CursorPaginationMixin, ListView):
+    """View for listing the posts published in a year."""
+    model = Post
+    page_cache_models = (Category,)
+    context_object_name = 'posts'
+    template_name = 'blog/post_archive.html'
+    paginate_by = 10
+    
+    def get_archive_months(self):
+        """The year's months that have posts, from the archive rollup."""
+        return ArchiveMonth.objects.filter(year=self.kwargs['year'])
+    
+    def get_date_range(self):
+        year = self.kwargs['year']
+        if not 1 <= year < 9999:
+            raise Http404("Invalid year")
+        return month_bounds(year, 1)[0], month_bounds(year, 12)[1]
+    
+    def get_queryset(self):
+        """Return the posts published in the period, or 404 if there are none."""
+        start, end = self.get_date_range()
+        self.archive_months = list(self.get_archive_months())
+        if not self.archive_months:
+            raise Http404("No posts were published then")
+        return Post.objects.published().for_cards().filter(
+            published_at__gte=start, published_at__lt=end
+        ).order_by('-published_at')
+    
+    def get_context_data(self, **kwargs):
+        """Add the period and its months to context."""
+        context = super().get_context_data(**kwargs)
+        context['archive_months'] = self.archive_months
+        context['archive_year'] = self.kwargs['year']
+        context['archive_month'] = None
+        return context
+
+
+class PostMonthArchiveView(PostYearArchiveView):
+    """View for listing the posts published in a month."""
+    
+    def get_archive_months(self):
+        return ArchiveMonth.objects.filter(year=self.kwargs['year'], month=self.kwargs['month'])
+    
+    def get_date_range(self):
+        year, month = self.kwargs['year'], self.kwargs['month']
+        if not (1 <= year < 9999 and 1 <= month <= 12):
+            raise Http404("Invalid month")
+        return month_bounds(year, month)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['archive_month'] = self.archive_months[0]
         return context
 
 
@@ -139,26 +198,21 @@ class AuthorDashboardView(LoginRequiredMixin, ListView):
     
     def get_queryset(self):
         """Return posts for the current user."""
-        return Post.objects.filter(author=self.request.user).order_by('-created_at')
+        # The table shows neither categories nor tags, so skip the prefetches
+        return Post.objects.filter(author=self.request.user).defer('content').order_by('-created_at')
     
     def get_context_data(self, **kwargs):
         """Add extra context."""
         context = super().get_context_data(**kwargs)
         
-        # Get post counts by status
-        context['draft_count'] = Post.objects.filter(
-            author=self.request.user,
-            status=Post.STATUS_DRAFT
-        ).count()
-        
-        context['published_count'] = Post.objects.filter(
-            author=self.request.user,
-            status=Post.STATUS_PUBLISHED
-        ).count()
-        
-        context['archived_count'] = Post.objects.filter(
-            author=self.request.user,
-            status=Post.STATUS_ARCHIVED
-        ).count()
+        # Post counts by status, from the stats rollup. Comment counts are
+        # stored on each post, so the rows need no extra queries.
+        stats = AuthorStats.for_author(self.request.user)
+        context['stats'] = stats
+        context['total_count'] = stats.total_count
+        context['draft_count'] = stats.draft_count
+        context['scheduled_count'] = stats.scheduled_count
+        context['published_count'] = stats.published_count
+        context['archived_count'] = stats.archived_count
         
         return context
\ No newline at end of file
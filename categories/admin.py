@@ -1,16 +1,16 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
+from mptt.admin import MPTTModelAdmin
 
 from .models import Category
 
 
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(MPTTModelAdmin):
     list_display = ('name', 'slug', 'parent', 'order', 'created_at')
     list_filter = ('parent',)
     search_fields = ('name', 'description')
     prepopulated_fields = {'slug': ('name',)}
     date_hierarchy = 'created_at'
-    ordering = ('order', 'name')
     
     fieldsets = (
         (None, {
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from categories.tree import recount_all
+
+
+class Command(BaseCommand):
+    help = "Recount the published posts and pages of every category."
+
+    def handle(self, *args, **options):
+        count = recount_all()
+        self.stdout.write(self.style.SUCCESS(f"Recounted {count} categor{'y' if count == 1 else 'ies'}."))
\ No newline at end of file
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 12:34
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Now
+
+
+def count_published(apps, schema_editor):
+    Category = apps.get_model('categories', 'Category')
+    for app_label, model_name, field in (('blog', 'Post', 'post_count'), ('pages', 'Page', 'page_count')):
+        through = apps.get_model(app_label, model_name).categories.through
+        name = model_name.lower()
+        rows = through.objects.filter(**{
+            f'{name}__status': 'published',
+            f'{name}__published_at__lte': Now(),
+        }).values('category_id').annotate(count=Count('pk')).order_by()
+        for row in rows:
+            Category.objects.filter(pk=row['category_id']).update(**{field: row['count']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0002_category_tree'),
+        ('blog', '0009_archive_months'),
+        ('pages', '0007_page_tree'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='page_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Published pages'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Published posts'),
+        ),
+        migrations.RunPython(count_published, migrations.RunPython.noop),
+    ]
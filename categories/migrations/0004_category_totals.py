@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-18 13:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+
+
+def count_totals(apps, schema_editor):
+    Category = apps.get_model('categories', 'Category')
+    totals = {}
+    for app_label, model_name, field in (('blog', 'Post', 'total_post_count'), ('pages', 'Page', 'total_page_count')):
+        name = model_name.lower()
+        rows = apps.get_model(app_label, model_name).categories.through.objects.filter(**{
+            f'{name}__status': 'published',
+            f'{name}__published_at__lte': Now(),
+            'category__tree_id': OuterRef('tree_id'),
+            'category__lft__gte': OuterRef('lft'),
+            'category__lft__lte': OuterRef('rght'),
+        }).order_by().values('category__tree_id').annotate(count=Count(name, distinct=True)).values('count')
+        totals[f'new_{field}'] = Coalesce(Subquery(rows), 0)
+    for row in Category.objects.annotate(**totals).values('pk', *totals):
+        Category.objects.filter(pk=row.pop('pk')).update(**{
+            field[len('new_'):]: count for field, count in row.items()
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0003_category_counts'),
+        ('blog', '0009_archive_months'),
+        ('pages', '0007_page_tree'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='total_page_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Published pages, subcategories included'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='total_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Published posts, subcategories included'),
+        ),
+        migrations.RunPython(count_totals, migrations.RunPython.noop),
+    ]
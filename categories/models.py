@@ -2,17 +2,24 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 from django.utils.text import slugify
+from mptt.models import MPTTModel, TreeForeignKey
 
-from core.models import TimeStampedModel, SEOModel
+from core.models import TimeStampedModel, SEOModel, exclude_counter_fields
 
 
-class Category(TimeStampedModel, SEOModel):
-    """Model for categories."""
+class Category(MPTTModel, TimeStampedModel, SEOModel):
+    """
+    Model for categories.
+    
+    Categories form a tree stored as nested sets (django-mptt), so a
+    category's ancestors, descendants or subtree are each one range query
+    on ``tree_id``/``lft``/``rght`` whatever the depth.
+    """
     name = models.CharField(_("Name"), max_length=100)
     slug = models.SlugField(_("Slug"), max_length=100, unique=True)
     description = models.TextField(_("Description"), blank=True)
     featured_image = models.ImageField(_("Featured Image"), upload_to='categories/', blank=True, null=True)
-    parent = models.ForeignKey(
+    parent = TreeForeignKey(
         'self',
         on_delete=models.SET_NULL,
         null=True,
@@ -22,10 +29,26 @@ class Category(TimeStampedModel, SEOModel):
     )
     order = models.IntegerField(_("Order"), default=0)
     
+    # Published posts and pages filed directly under the category, kept
+    # current by ``categories.tree``
+    post_count = models.PositiveIntegerField(_("Published posts"), default=0, editable=False)
+    page_count = models.PositiveIntegerField(_("Published pages"), default=0, editable=False)
+    # ... and filed under it or any category below it, each counted once
+    total_post_count = models.PositiveIntegerField(_("Published posts, subcategories included"), default=0, editable=False)
+    total_page_count = models.PositiveIntegerField(_("Published pages, subcategories included"), default=0, editable=False)
+    
+    counter_fields = ('post_count', 'page_count', 'total_post_count', 'total_page_count')
+    
+    class MPTTMeta:
+        order_insertion_by = ['order', 'name']
+    
     class Meta:
         verbose_name = _("Category")
         verbose_name_plural = _("Categories")
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['tree_id', 'lft'], name='categories_tree_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -33,26 +56,17 @@ class Category(TimeStampedModel, SEOModel):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        exclude_counter_fields(self, kwargs)
         super().save(*args, **kwargs)
     
     def get_absolute_url(self):
         return reverse('categories:category_detail', kwargs={'slug': self.slug})
     
-    @property
-    def get_ancestors(self):
-        """Return list of ancestors."""
-        ancestors = []
-        current = self.parent
-        while current:
-            ancestors.append(current)
-            current = current.parent
-        return ancestors[::-1]  # Return reversed to have root first
-    
-    @property
-    def get_descendants(self):
-        """Return all descendants."""
-        descendants = []
-        for child in self.children.all():
-            descendants.append(child)
-            descendants.extend(child.get_descendants)
-        return descendants
\ No newline at end of file
+    def get_subtree_post_count(self):
+        """Number of published posts in this category or any below it."""
+        from blog.models import Post
+        return Post.objects.published().filter(
+            categories__tree_id=self.tree_id,
+            categories__lft__gte=self.lft,
+            categories__rght__lte=self.rght,
+        ).distinct().count()
\ No newline at end of file
@@ -0,0 +1,84 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from blog.models import Post
+from core.signals import content_changed
+from pages.models import Page
+from .models import Category
+from .tree import invalidate_tree, recount
+
+
+# Saving only other fields can't change whether the content is counted
+COUNTED_FIELDS = {'status', 'published_at'}
+
+
+def category_ids_of(model, pks):
+    through = model.categories.through
+    return through.objects.filter(
+        **{f'{model._meta.model_name}_id__in': pks}
+    ).values_list('category_id', flat=True).distinct()
+
+
+@receiver(pre_save, sender=Category)
+def category_saving(sender, instance, **kwargs):
+    # Moving a category changes the totals above its old and new places
+    if instance.pk:
+        instance._old_parent_id = Category.objects.filter(pk=instance.pk).values_list('parent_id', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, **kwargs):
+    old_parent_id = getattr(instance, '_old_parent_id', None)
+    if not created and old_parent_id != instance.parent_id:
+        recount({pk for pk in (old_parent_id, instance.parent_id) if pk is not None})
+    invalidate_tree()
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    # Its content no longer counts towards the categories above it
+    if instance.parent_id is not None:
+        recount([instance.parent_id])
+    invalidate_tree()
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(m2m_changed, sender=Page.categories.through)
+def content_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # Content added to or removed from the category ``instance``
+        if action.startswith('post_'):
+            recount([instance.pk])
+        return
+    if action == 'pre_clear':
+        instance._cleared_category_ids = list(instance.categories.values_list('pk', flat=True))
+    elif action.startswith('post_') and instance.status == instance.STATUS_PUBLISHED:
+        recount(pk_set or getattr(instance, '_cleared_category_ids', ()))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Page)
+def content_saved(sender, instance, created, update_fields=None, **kwargs):
+    # A new object has no categories yet; they're counted when added
+    if created or (update_fields is not None and not COUNTED_FIELDS & set(update_fields)):
+        return
+    recount(category_ids_of(sender, [instance.pk]))
+
+
+@receiver(pre_delete, sender=Post)
+@receiver(pre_delete, sender=Page)
+def content_deleting(sender, instance, **kwargs):
+    # The category links go with it
+    instance._category_ids = list(category_ids_of(sender, [instance.pk]))
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Page)
+def content_deleted(sender, instance, **kwargs):
+    recount(getattr(instance, '_category_ids', ()))
+
+
+@receiver(content_changed, sender=Post)
+@receiver(content_changed, sender=Page)
+def content_changed_in_bulk(sender, pks, **kwargs):
+    recount(category_ids_of(sender, pks))
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""
+The category tree with its post and page counts, cached.
+
+Every category sidebar, widget and list reads the same ``CategoryTree``,
+built from the categories table alone in one query and cached until a
+category or a count changes. The counts come from ``Category.post_count``
+and ``page_count``, and their ``total_*`` counterparts taking in every
+category below, which ``recount`` keeps current for just the categories
+a post or page change touched and those above them, rather than from
+counting the whole join table on every render.
+"""
+from collections import namedtuple
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+
+from core.cache import CACHE_TIMEOUT, get_version, bump_version
+from core.models import PublishableModel
+from navigation.tree import ItemList, _Frozen
+from .models import Category
+
+
+CATEGORY_TREE_VERSION = 'categories.tree'
+CATEGORY_TREE_CACHE_KEY = 'categories:tree:{version}'
+
+# Counted models, with the Category field each one's count is stored in
+COUNTED_MODELS = {'blog.Post': 'post_count', 'pages.Page': 'page_count'}
+
+# ... and the field its count including every category below is stored in
+TOTAL_FIELDS = {'post_count': 'total_post_count', 'page_count': 'total_page_count'}
+
+# Stands in for the ``featured_image`` file, so templates' ``.url`` works
+Image = namedtuple('Image', ('url',))
+
+
+class CategoryNode(_Frozen):
+    """
+    A category with its parent and children linked and its counts: those of
+    the category itself, and ``total_*`` ones including every category
+    below it.
+    """
+    __slots__ = (
+        'pk', 'name', 'slug', 'description', 'featured_image', 'url', 'level',
+        'parent', 'children', 'post_count', 'page_count', 'total_post_count', 'total_page_count',
+    )
+
+    def __init__(self, category):
+        object.__setattr__(self, 'pk', category.pk)
+        object.__setattr__(self, 'name', category.name)
+        object.__setattr__(self, 'slug', category.slug)
+        object.__setattr__(self, 'description', category.description)
+        object.__setattr__(self, 'featured_image', Image(category.featured_image.url) if category.featured_image else None)
+        object.__setattr__(self, 'url', category.get_absolute_url())
+        object.__setattr__(self, 'level', category.level)
+        object.__setattr__(self, 'parent', None)
+        object.__setattr__(self, 'children', ItemList())
+        object.__setattr__(self, 'post_count', category.post_count)
+        object.__setattr__(self, 'page_count', category.page_count)
+        object.__setattr__(self, 'total_post_count', category.total_post_count)
+        object.__setattr__(self, 'total_page_count', category.total_page_count)
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def get_absolute_url(self):
+        return self.url
+
+    @property
+    def ancestors(self):
+        """The nodes above this one, root first."""
+        ancestors = []
+        node = self.parent
+        while node is not None:
+            ancestors.append(node)
+            node = node.parent
+        return ItemList(reversed(ancestors))
+
+
+class CategoryTree(_Frozen):
+    """Every category as a ``CategoryNode``, in tree order."""
+    __slots__ = ('nodes', 'roots', '_by_pk', '_by_slug')
+
+    def __init__(self, nodes):
+        object.__setattr__(self, 'nodes', ItemList(nodes))
+        object.__setattr__(self, 'roots', ItemList(node for node in nodes if node.parent is None))
+        object.__setattr__(self, '_by_pk', {node.pk: node for node in nodes})
+        object.__setattr__(self, '_by_slug', {node.slug: node for node in nodes})
+
+    def get(self, pk):
+        return self._by_pk.get(pk)
+
+    def get_by_slug(self, slug):
+        return self._by_slug.get(slug)
+
+    def popular(self, count=5):
+        """The categories with the most published posts of their own."""
+        nodes = sorted((node for node in self.nodes if node.post_count), key=lambda node: -node.post_count)
+        return ItemList(nodes[:count])
+
+
+def build_tree():
+    """Build a ``CategoryTree`` from the database in one query."""
+    # Tree order: siblings by order and name, every parent before its children
+    categories = Category.objects.order_by('tree_id', 'lft')
+    nodes = [CategoryNode(category) for category in categories]
+    by_pk = {node.pk: node for node in nodes}
+
+    children = {}
+    for category, node in zip(categories, nodes):
+        if category.parent_id in by_pk:
+            object.__setattr__(node, 'parent', by_pk[category.parent_id])
+            children.setdefault(category.parent_id, []).append(node)
+    for pk, child_nodes in children.items():
+        object.__setattr__(by_pk[pk], 'children', ItemList(child_nodes))
+
+    return CategoryTree(nodes)
+
+
+def get_category_tree():
+    """Return the ``CategoryTree``, building and caching it if needed."""
+    key = CATEGORY_TREE_CACHE_KEY.format(version=get_version(CATEGORY_TREE_VERSION))
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_tree()
+        cache.set(key, tree, CACHE_TIMEOUT)
+    return tree
+
+
+def invalidate_tree():
+    """Force the next request to rebuild the category tree."""
+    bump_version(CATEGORY_TREE_VERSION)
+
+
+def count_published(category_ids=None):
+    """
+    Count the published posts and pages filed under each category; returns
+    ``{category pk: {count field: count}}``, for ``category_ids`` or every
+    category that has any.
+    """
+    counts = {}
+    for label, field in COUNTED_MODELS.items():
+        model = apps.get_model(label)
+        through = model.categories.through
+        name = model._meta.model_name
+        rows = through.objects.filter(**{
+            f'{name}__status': PublishableModel.STATUS_PUBLISHED,
+            f'{name}__published_at__lte': Now(),
+        })
+        if category_ids is not None:
+            rows = rows.filter(category_id__in=category_ids)
+        for row in rows.values('category_id').annotate(count=Count('pk')).order_by():
+            counts.setdefault(row['category_id'], {})[field] = row['count']
+    return counts
+
+
+def count_published_totals():
+    """
+    Return annotations counting, for each category, the distinct published
+    posts and pages filed under it or any category below it, keyed by the
+    ``total_*`` fields they're stored in.
+
+    Content filed under a category and one of its descendants is counted
+    once, so these can't be added up from the children's totals.
+    """
+    annotations = {}
+    for label, field in COUNTED_MODELS.items():
+        model = apps.get_model(label)
+        name = model._meta.model_name
+        rows = model.categories.through.objects.filter(**{
+            f'{name}__status': PublishableModel.STATUS_PUBLISHED,
+            f'{name}__published_at__lte': Now(),
+            'category__tree_id': OuterRef('tree_id'),
+            'category__lft__gte': OuterRef('lft'),
+            'category__lft__lte': OuterRef('rght'),
+        }).order_by().values('category__tree_id').annotate(count=Count(name, distinct=True)).values('count')
+        annotations[TOTAL_FIELDS[field]] = Coalesce(Subquery(rows), 0)
+    return annotations
+
+
+def recount(category_ids, ancestors=True):
+    """
+    Recount the categories ``category_ids``, and unless ``ancestors`` is
+    false the totals of the categories above them, writing only the counts
+    that changed; returns whether any did.
+    """
+    category_ids = set(category_ids)
+    if not category_ids:
+        return False
+    categories = Category.objects.filter(pk__in=category_ids)
+    if ancestors:
+        categories = Category.objects.get_queryset_ancestors(categories, include_self=True)
+    totals = count_published_totals()
+    rows = categories.annotate(**{f'new_{field}': total for field, total in totals.items()}).values(
+        'pk', *COUNTED_MODELS.values(), *totals, *(f'new_{field}' for field in totals)
+    )
+    counts = count_published(category_ids)
+    changed = False
+    for row in rows:
+        pk = row['pk']
+        new = {field: row[f'new_{field}'] for field in totals}
+        # The categories above the recounted ones only have new totals
+        if pk in category_ids:
+            new.update({field: counts.get(pk, {}).get(field, 0) for field in COUNTED_MODELS.values()})
+        if any(row[field] != value for field, value in new.items()):
+            Category.objects.filter(pk=pk).update(**new)
+            changed = True
+    if changed:
+        invalidate_tree()
+    return changed
+
+
+def recount_all():
+    """Recount every category; returns the number of categories."""
+    category_ids = list(Category.objects.values_list('pk', flat=True))
+    recount(category_ids, ancestors=False)
+    invalidate_tree()
+    return len(category_ids)
\ No newline at end of file
@@ -2,36 +2,50 @@ from django.shortcuts import render, get_object_or_404
 from django.views.generic import DetailView, ListView
 
 from .models import Category
+from .tree import get_category_tree
+from blog.models import Post
 from pages.models import Page
+from core.cache import MemoizedObjectMixin
+from core.conditional import ConditionalGetMixin
+from core.page_cache import PageCacheMixin
 
 
-class CategoryListView(ListView):
+class CategoryListView(ConditionalGetMixin, PageCacheMixin, ListView):
     """View for listing categories."""
     model = Category
+    page_cache_models = (Post, Page)
     context_object_name = 'categories'
     template_name = 'categories/category_list.html'
     
     def get_queryset(self):
         """Return only top-level categories."""
+        # Only the validators query it; the list shown is the cached tree's
         return Category.objects.filter(parent=None).order_by('order', 'name')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['categories'] = get_category_tree().roots
+        return context
 
 
-class CategoryDetailView(DetailView):
+class CategoryDetailView(MemoizedObjectMixin, ConditionalGetMixin, PageCacheMixin, DetailView):
     """View for category detail."""
     model = Category
+    page_cache_models = (Category, Page)
     context_object_name = 'category'
     template_name = 'categories/category_detail.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Get pages associated with this category
-        category = self.get_object()
-        context['pages'] = Page.objects.filter(
-            status=Page.STATUS_PUBLISHED,
+        category = self.object
+        context['pages'] = Page.objects.published().for_cards().filter(
             categories=category
         ).order_by('-published_at')
         
         # Get subcategories
-        context['subcategories'] = Category.objects.filter(parent=category).order_by('order', 'name')
+        node = get_category_tree().get(category.pk)
+        context['subcategories'] = node.children if node else []
+        context['ancestors'] = node.ancestors if node else []
         
         return context
\ No newline at end of file
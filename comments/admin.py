@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
+from .counts import get_comment_targets, update_comment_counts
 from .models import Comment
 
 
@@ -34,12 +35,16 @@ class CommentAdmin(admin.ModelAdmin):
     actions = ['approve_comments', 'reject_comments']
     
     def approve_comments(self, request, queryset):
+        targets = get_comment_targets(queryset)
         queryset.update(status=Comment.STATUS_APPROVED)
+        update_comment_counts(targets)
         self.message_user(request, _("Selected comments have been approved."))
     approve_comments.short_description = _("Approve selected comments")
     
     def reject_comments(self, request, queryset):
+        targets = get_comment_targets(queryset)
         queryset.update(status=Comment.STATUS_REJECTED)
+        update_comment_counts(targets)
         self.message_user(request, _("Selected comments have been rejected."))
     reject_comments.short_description = _("Reject selected comments")
 
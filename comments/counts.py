@@ -0,0 +1,81 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+
+from core.page_cache import purge_tags, model_tag
+from .models import Comment
+
+
+COUNT_FIELD = 'approved_comment_count'
+
+# Sent with ``model`` and ``pks`` once stored counts have changed. The
+# counts are written with queryset updates, so there's no post_save.
+counts_changed = Signal()
+
+
+def is_counted(model):
+    """Return whether ``model`` stores its approved comment count."""
+    try:
+        model._meta.get_field(COUNT_FIELD)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def approved_count_expression(model):
+    """Expression counting the approved comments of each ``model`` row."""
+    approved = Comment.objects.filter(
+        content_type=ContentType.objects.get_for_model(model),
+        object_id=OuterRef('pk'),
+        status=Comment.STATUS_APPROVED,
+    ).order_by().values('object_id').annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(approved), Value(0))
+
+
+def recount(model, queryset=None):
+    """
+    Store the current approved comment count on every row of ``queryset``
+    (all of ``model`` by default) whose count is out of date, and purge the
+    cached pages showing them.
+
+    Returns the primary keys of the rows that changed.
+    """
+    if queryset is None:
+        queryset = model._default_manager.all()
+    expression = approved_count_expression(model)
+    stale = queryset.exclude(**{COUNT_FIELD: expression})
+    pks = list(stale.values_list('pk', flat=True))
+    if pks:
+        model._default_manager.filter(pk__in=pks).update(**{COUNT_FIELD: expression})
+        # Queryset updates skip post_save, so purge here: the lists showing
+        # or ordering by the count as well as the objects themselves
+        tag = model_tag(model)
+        purge_tags(tag, *(f"{tag}:{pk}" for pk in pks))
+        counts_changed.send(sender=model, model=model, pks=pks)
+    return pks
+
+
+def get_comment_targets(comments):
+    """Return the ``(content_type_id, object_id)`` pairs ``comments`` belong to."""
+    return set(comments.order_by().values_list('content_type_id', 'object_id').distinct())
+
+
+def update_comment_counts(targets):
+    """
+    Recount the approved comments of the objects in ``targets``, a set of
+    ``(content_type_id, object_id)`` pairs.
+
+    Counts are recomputed rather than incremented, so concurrent updates
+    and bulk status changes can't make them drift.
+    """
+    by_type = {}
+    for content_type_id, object_id in targets:
+        by_type.setdefault(content_type_id, set()).add(object_id)
+
+    for content_type_id, object_ids in by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None or not is_counted(model):
+            continue
+        recount(model, model._default_manager.filter(pk__in=object_ids))
\ No newline at end of file
@@ -0,0 +1,15 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from comments.counts import is_counted, recount
+
+
+class Command(BaseCommand):
+    help = "Recount the stored approved comment counts and fix any that drifted."
+
+    def handle(self, *args, **options):
+        for model in apps.get_models():
+            if not is_counted(model):
+                continue
+            changed = recount(model)
+            self.stdout.write(f"{model._meta.label}: fixed {len(changed)} count(s)")
\ No newline at end of file
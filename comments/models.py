@@ -63,6 +63,10 @@ class Comment(TimeStampedModel):
         verbose_name = _("Comment")
         verbose_name_plural = _("Comments")
         ordering = ['-created_at']
+        indexes = [
+            # The approved comments (and replies) of one object
+            models.Index(fields=['content_type', 'object_id', 'status', 'parent'], name='comments_target_idx'),
+        ]
     
     def __str__(self):
         if self.author:
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .counts import update_comment_counts
+from .models import Comment
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    """Keep the approved comment count of the commented object current."""
+    update_comment_counts({(instance.content_type_id, instance.object_id)})
\ No newline at end of file
@@ -11,6 +11,8 @@ register = template.Library()
 @register.simple_tag
 def get_comments_count(obj):
     """Return the number of approved comments for an object."""
+    if hasattr(obj, 'approved_comment_count'):
+        return obj.approved_comment_count
     content_type = ContentType.objects.get_for_model(obj)
     return Comment.objects.filter(
         content_type=content_type,
@@ -3,4 +3,9 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'core'
\ No newline at end of file
+    name = 'core'
+
+    def ready(self):
+        from . import signals, trees
+        signals.connect_m2m_signals()
+        trees.connect_tree_signals()
\ No newline at end of file
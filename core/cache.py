@@ -0,0 +1,127 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+
+
+VERSION_KEY_PREFIX = 'version'
+
+# Seconds a process goes on using the version stamps it has read before
+# reading them from the shared cache again; its own bumps count at once
+VERSION_CHECK_INTERVAL = 1
+
+# Seconds anything stored under a versioned key is kept. Bumping the version
+# retires it sooner; the timeout only bounds how stale it can get should a
+# bump be lost.
+CACHE_TIMEOUT = 300
+
+
+# {name: (version, when it was read)} for this process
+_seen = {}
+
+
+def _version_key(name):
+    return f'{VERSION_KEY_PREFIX}:{name}'
+
+
+def _shared_cache():
+    """The cache version stamps are kept in, shared by every process."""
+    return caches['versions'] if 'versions' in settings.CACHES else cache
+
+
+def _remember(name, version):
+    _seen[name] = (version, time.monotonic())
+    return version
+
+
+def _recall(name):
+    seen = _seen.get(name)
+    if seen is not None and time.monotonic() - seen[1] < VERSION_CHECK_INTERVAL:
+        return seen[0]
+    return None
+
+
+def get_version(name):
+    """
+    Return the current version stamp for ``name``.
+
+    Version stamps are tiny integers kept in the shared cache. Anything cached
+    under a versioned key is invalidated by bumping the version instead of
+    tracking and deleting the individual entries. Each process reads a stamp
+    at most once every ``VERSION_CHECK_INTERVAL`` seconds, so a cache hit
+    usually costs no round-trip for its versions.
+    """
+    version = _recall(name)
+    if version is not None:
+        return version
+    shared = _shared_cache()
+    key = _version_key(name)
+    version = shared.get(key)
+    if version is None:
+        # Seed from the clock so a stamp evicted from the cache never
+        # comes back with a value that older entries were stored under.
+        shared.add(key, time.time_ns() // 1000, None)
+        version = shared.get(key)
+    return _remember(name, version)
+
+
+def get_versions(*names):
+    """Return a dict of version stamps for several names in one round-trip."""
+    versions = {}
+    keys = {}
+    for name in names:
+        version = _recall(name)
+        if version is None:
+            keys[_version_key(name)] = name
+        else:
+            versions[name] = version
+    if keys:
+        found = _shared_cache().get_many(keys.keys())
+        for key, name in keys.items():
+            versions[name] = _remember(name, found[key]) if key in found else get_version(name)
+    return versions
+
+
+def bump_version(name):
+    """Increment the version stamp for ``name``."""
+    shared = _shared_cache()
+    key = _version_key(name)
+    try:
+        version = shared.incr(key)
+    except ValueError:
+        get_version(name)
+        version = shared.incr(key)
+    return _remember(name, version)
+
+
+def memoize_on_request(request, key, factory):
+    """
+    Return ``factory()``, computed at most once per request.
+
+    Context processors run again for every ``RequestContext`` rendered while
+    handling a request, nested ``render_to_string`` calls included. Storing
+    their values on the request keeps those re-runs free.
+    """
+    if request is None:
+        return factory()
+    memo = request.__dict__.setdefault('_djcms_memo', {})
+    if key not in memo:
+        memo[key] = factory()
+    return memo[key]
+
+
+class MemoizedObjectMixin:
+    """
+    Load the object of a ``SingleObjectMixin`` view once per request.
+
+    ``get_object()`` is memoized on the request, so the template name,
+    the context and anything else asking for the object again share one
+    query. Calls with a narrowed ``queryset``, such as the conditional GET
+    validators', are passed through.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        key = ('object', type(self).__qualname__, tuple(sorted(self.kwargs.items())))
+        return memoize_on_request(self.request, key, lambda: self.get_object(self.get_queryset()))
\ No newline at end of file
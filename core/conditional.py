@@ -0,0 +1,71 @@
+"""
+Conditional GET (``ETag``/``Last-Modified``) for public views.
+
+The validators come from the page cache entry of the URL: the dependency
+tags recorded when the page was rendered, with their versions, stand for
+the object shown and everything else the page lists. A revalidating
+client gets its 304 from a few cache reads, without a query, the object
+being loaded or a template being rendered, and a save only changes the
+ETags of the pages that showed what was saved.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .page_cache import get_cached_entry, is_cacheable_request
+
+
+def get_entry_validators(entry):
+    """
+    Return ``(etag, last_modified)`` for a page cache ``entry``.
+
+    Its key goes into the ETag along with its tags' versions: the key names
+    the URL, so pages built from the same content still differ, and the
+    theme version, so a new stylesheet isn't validated by the old ETag.
+    """
+    parts = [entry['key'], *sorted(f"{tag}:{version}" for tag, version in entry['tags'].items())]
+    digest = hashlib.md5(' '.join(parts).encode('utf-8')).hexdigest()
+    return quote_etag(digest), int(entry['rendered_at'])
+
+
+class ConditionalGetMixin:
+    """
+    Answer ``If-None-Match``/``If-Modified-Since`` with 304 for anonymous visitors.
+
+    Pages are validated by the versions of the dependency tags their page
+    cache entry recorded, so only pages rendered since their tags were
+    last purged can be validated. Place it before ``PageCacheMixin``,
+    which keeps those entries, so a 304 doesn't fetch the cached response.
+    """
+
+    def get_validators(self):
+        """Return ``(etag, last_modified)`` for the request, or ``None`` to skip."""
+        entry = get_cached_entry(self.request)
+        if entry is None:
+            return None
+        return get_entry_validators(entry)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        validators = self.get_validators()
+        if validators is not None:
+            etag, last_modified = validators
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                response.headers['ETag'] = etag
+                response.headers['Last-Modified'] = http_date(last_modified)
+                return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200 or response.has_header('ETag'):
+            return response
+        # Rendering just recorded the page's tags
+        validators = validators or self.get_validators()
+        if validators is not None:
+            etag, last_modified = validators
+            response.headers['ETag'] = etag
+            response.headers['Last-Modified'] = http_date(last_modified)
+        return response
\ No newline at end of file
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.query_plans import check_plans
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot queries and fail if any of them scans its whole table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default='default',
+            help="Database to check (default: default).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            plans = check_plans(using=options['database'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        failed = []
+        for plan in plans:
+            if plan.full_scan:
+                failed.append(plan.name)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {plan.name}"))
+            else:
+                self.stdout.write(f"ok         {plan.name}")
+            if plan.full_scan or options['verbosity'] > 1:
+                for line in plan.plan.splitlines():
+                    self.stdout.write(f"           {line}")
+
+        if failed:
+            raise CommandError(f"{len(failed)} hot query(s) fall back to a full scan: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS(f"All {len(plans)} hot queries use an index."))
\ No newline at end of file
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.trees import TREE_MODELS, rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the category and page trees from their parent links."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', metavar='app_label.Model',
+            help=f"Trees to rebuild (default: {', '.join(TREE_MODELS)}).",
+        )
+
+    def handle(self, *args, **options):
+        totals = rebuild(models=options['models'] or TREE_MODELS)
+        for label, count in totals.items():
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt the {label} tree of {count} node(s)."))
\ No newline at end of file
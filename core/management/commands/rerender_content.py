@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from core.rendering import RENDERED_MODELS, rerender
+
+
+class Command(BaseCommand):
+    help = (
+        "Render stored content that was never rendered, e.g. saved before rendering on save "
+        "was added, or that was rendered by an older version of the rendering pipeline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', metavar='app_label.Model',
+            help=f"Models to re-render (default: {', '.join(RENDERED_MODELS)}).",
+        )
+        parser.add_argument(
+            '--all', action='store_true', dest='force',
+            help="Re-render everything, even content that is up to date.",
+        )
+        parser.add_argument(
+            '--processes', type=int, default=None,
+            help="Worker processes to render with (default: one per CPU).",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=100,
+            help="Objects handed to a worker at a time.",
+        )
+
+    def handle(self, *args, **options):
+        totals = rerender(
+            models=options['models'] or RENDERED_MODELS,
+            processes=options['processes'],
+            chunk_size=options['chunk_size'],
+            force=options['force'],
+        )
+        for label, count in totals.items():
+            self.stdout.write(self.style.SUCCESS(f"Re-rendered {count} {label} object(s)."))
\ No newline at end of file
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.scheduling import run
+
+
+class Command(BaseCommand):
+    help = (
+        "Publish scheduled posts and pages, and send scheduled newsletters, that have come due, "
+        "and update the queued search documents."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Keep running, checking every --interval seconds.",
+        )
+        parser.add_argument(
+            '--interval', type=int, default=60,
+            help="Seconds between checks with --loop.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help="Rows published per UPDATE, and search documents updated per batch.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            totals = run(batch_size=options['batch_size'])
+            for label, count in totals.items():
+                if count or options['verbosity'] > 1:
+                    self.stdout.write(self.style.SUCCESS(f"Processed {count} due {label} object(s)."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
\ No newline at end of file
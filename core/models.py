@@ -1,7 +1,10 @@
 from django.db import models
+from django.db.models.functions import Now
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
+from .rendering import RENDER_VERSION, render
+from .signals import content_changed
 from .user_models import User
 
 
@@ -17,16 +20,72 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
+def update_content(queryset, **fields):
+    """
+    Set ``fields`` on every row of ``queryset`` with one ``UPDATE``, then
+    send ``content_changed`` once for all of them; returns their pks.
+    
+    Nothing is saved row by row, so caches and the tables derived from the
+    content are brought up to date in one batch by the signal's receivers.
+    """
+    model = queryset.model
+    # The selection may span joins (e.g. admin filters), which UPDATE can't
+    pks = list(queryset.order_by().values_list('pk', flat=True).distinct())
+    if pks:
+        fields.setdefault('updated_at', timezone.now())
+        model._default_manager.filter(pk__in=pks).update(**fields)
+        content_changed.send(sender=model, model=model, pks=pks)
+    return pks
+
+
+class PublishableQuerySet(models.QuerySet):
+    """
+    QuerySet for ``PublishableModel`` subclasses.
+    """
+    
+    def published(self):
+        """Only content that is visible on the site."""
+        # Now() rather than timezone.now(), so the SQL (and anything cached
+        # by it) doesn't change from one request to the next
+        return self.filter(status=PublishableModel.STATUS_PUBLISHED, published_at__lte=Now())
+    
+    def due(self):
+        """Scheduled content whose publication time has come."""
+        return self.filter(status=PublishableModel.STATUS_SCHEDULED, published_at__lte=Now())
+    
+    def trending(self):
+        """Most viewed recently first; see ``core.view_counts``."""
+        return self.order_by('-trending_score', '-published_at')
+    
+    def publish(self):
+        """Publish the content that isn't yet, dated now; returns the pks."""
+        return update_content(
+            self.exclude(status=PublishableModel.STATUS_PUBLISHED),
+            status=PublishableModel.STATUS_PUBLISHED,
+            published_at=timezone.now(),
+        )
+    
+    def archive(self):
+        """Archive the content; returns the pks."""
+        return update_content(self, status=PublishableModel.STATUS_ARCHIVED)
+    
+    def draft(self):
+        """Set the content as draft; returns the pks."""
+        return update_content(self, status=PublishableModel.STATUS_DRAFT)
+
+
 class PublishableModel(TimeStampedModel):
     """
     An abstract base class model that provides publishing functionality.
     """
     STATUS_DRAFT = 'draft'
+    STATUS_SCHEDULED = 'scheduled'
     STATUS_PUBLISHED = 'published'
     STATUS_ARCHIVED = 'archived'
     
     STATUS_CHOICES = (
         (STATUS_DRAFT, _('Draft')),
+        (STATUS_SCHEDULED, _('Scheduled')),
         (STATUS_PUBLISHED, _('Published')),
         (STATUS_ARCHIVED, _('Archived')),
     )
@@ -39,15 +98,37 @@ class PublishableModel(TimeStampedModel):
     )
     published_at = models.DateTimeField(_("Published at"), null=True, blank=True)
     
+    objects = PublishableQuerySet.as_manager()
+    
     class Meta:
         abstract = True
     
+    def save(self, *args, **kwargs):
+        # Content published with a future date waits as scheduled until
+        # core.scheduling publishes it; scheduled content already due is
+        # simply published
+        if self.status in (self.STATUS_SCHEDULED, self.STATUS_PUBLISHED):
+            now = timezone.now()
+            if self.published_at is None:
+                self.published_at = now
+            self.status = self.STATUS_SCHEDULED if self.published_at > now else self.STATUS_PUBLISHED
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'status' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'published_at'}
+        super().save(*args, **kwargs)
+    
     def publish(self):
         """Publish the content."""
         self.status = self.STATUS_PUBLISHED
         self.published_at = timezone.now()
         self.save()
     
+    def schedule(self, scheduled_time):
+        """Schedule the content to be published at ``scheduled_time``."""
+        self.status = self.STATUS_SCHEDULED
+        self.published_at = scheduled_time
+        self.save()
+    
     def archive(self):
         """Archive the content."""
         self.status = self.STATUS_ARCHIVED
@@ -72,4 +153,116 @@ class SEOModel(models.Model):
     og_image = models.ImageField(_("Open Graph image"), upload_to='og_images/', blank=True, null=True)
     
     class Meta:
-        abstract = True
\ No newline at end of file
+        abstract = True
+
+
+def exclude_counter_fields(instance, kwargs):
+    """
+    Leave the ``counter_fields`` declared by ``instance``'s bases out of a
+    plain update of ``instance``.
+    
+    Counters are kept up to date with queryset updates, so a copy loaded
+    before the last one mustn't write its stale values back.
+    """
+    if (instance.pk is None or instance._state.adding or kwargs.get('force_insert')
+            or kwargs.get('update_fields') is not None):
+        return
+    counters = {name for klass in type(instance).__mro__ for name in vars(klass).get('counter_fields', ())}
+    deferred = instance.get_deferred_fields()
+    kwargs['update_fields'] = [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key
+        and field.attname not in deferred
+        and field.name not in counters
+    ]
+
+
+class CommentCountModel(models.Model):
+    """
+    An abstract base class model that stores the number of approved comments.
+    
+    The count is kept up to date by ``comments.counts`` with queryset
+    updates. Saving an instance never writes it back, so a copy loaded
+    before a comment was approved can't undo the new count.
+    """
+    approved_comment_count = models.PositiveIntegerField(
+        _("Approved comments"),
+        default=0,
+        db_index=True,
+        editable=False
+    )
+    
+    counter_fields = ('approved_comment_count',)
+    
+    class Meta:
+        abstract = True
+    
+    def save(self, *args, **kwargs):
+        exclude_counter_fields(self, kwargs)
+        super().save(*args, **kwargs)
+
+
+class ViewCountModel(models.Model):
+    """
+    An abstract base class model that stores page views and a trending score.
+    
+    Views are buffered in memory and added in bulk by ``core.view_counts``,
+    which also maintains the score; like the comment count, saving an
+    instance never writes them back.
+    """
+    view_count = models.PositiveIntegerField(_("Views"), default=0, editable=False)
+    trending_score = models.FloatField(_("Trending score"), default=0, db_index=True, editable=False)
+    
+    counter_fields = ('view_count', 'trending_score')
+    
+    class Meta:
+        abstract = True
+    
+    def save(self, *args, **kwargs):
+        exclude_counter_fields(self, kwargs)
+        super().save(*args, **kwargs)
+    
+    @property
+    def trending(self):
+        """The trending score as of now: views, each decayed by its age."""
+        from .view_counts import decayed_score
+        return decayed_score(self.trending_score)
+
+
+class RenderedContentModel(models.Model):
+    """
+    An abstract base class model that stores its ``content`` rendered for display.
+    
+    ``core.rendering`` sanitizes the content and prepares its images and
+    headings whenever it's saved, so templates show ``rendered_content``
+    and ``toc`` instead of doing that work, or none of it, on every view.
+    """
+    rendered_content = models.TextField(_("Rendered content"), blank=True, editable=False)
+    toc = models.JSONField(_("Table of contents"), default=list, blank=True, editable=False)
+    render_version = models.PositiveSmallIntegerField(
+        _("Render version"),
+        default=0,
+        db_index=True,
+        editable=False
+    )
+    
+    RENDERED_FIELDS = ('rendered_content', 'toc', 'render_version')
+    
+    class Meta:
+        abstract = True
+    
+    def render_content(self):
+        """Render ``content`` into the stored fields."""
+        rendered = render(self.content)
+        self.rendered_content = rendered.html
+        self.toc = rendered.toc
+        self.render_version = RENDER_VERSION
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if 'content' not in self.get_deferred_fields() and (
+                update_fields is None or 'content' in update_fields):
+            self.render_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.RENDERED_FIELDS}
+        super().save(*args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Full-page cache for anonymous visitors.
+
+Each cached response records the content it was built from as dependency
+tags: ``app_label.model:pk`` for every tracked object loaded while the page
+was rendered, and ``app_label.model`` for the collections it listed. Tags
+are versioned (see ``core.cache``), so purging a tag is a single version
+bump and only the entries that recorded it stop matching.
+"""
+import contextvars
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+
+from .cache import get_version, get_versions, bump_version
+
+
+PAGE_CACHE_KEY = 'pagecache:{theme_version}:{digest}'
+TAG_VERSION = 'pagecache.{tag}'
+# Bumped along with any tag, so a purge landing mid-render is noticed
+PURGE_EPOCH = 'pagecache'
+
+# Objects loaded from these models are recorded as dependencies. The theme
+# isn't among them: its version is part of every cache key instead.
+TRACKED_MODELS = (
+    'blog.Post',
+    'pages.Page',
+    'categories.Category',
+    'navigation.Menu',
+    'navigation.MenuItem',
+    'widgets.Widget',
+    'widgets.WidgetArea',
+)
+
+_collector = contextvars.ContextVar('page_cache_collector', default=None)
+
+
+def model_tag(model):
+    """Tag for everything listing objects of ``model`` (a model or a label)."""
+    if isinstance(model, str):
+        return model.lower()
+    return model._meta.label_lower
+
+
+def instance_tag(instance):
+    """Tag for everything showing ``instance``."""
+    return f"{model_tag(instance)}:{instance.pk}"
+
+
+def record_dependency(*models):
+    """Record that the page being cached lists objects of ``models``."""
+    tags = _collector.get()
+    if tags is not None:
+        tags.update(model_tag(model) for model in models)
+
+
+def record_instance(instance):
+    """Record that the page being cached shows ``instance``."""
+    tags = _collector.get()
+    if tags is not None and instance.pk is not None:
+        tags.add(instance_tag(instance))
+
+
+def purge_tags(*tags):
+    """Invalidate every cached page that recorded any of ``tags``."""
+    for tag in set(tags):
+        bump_version(TAG_VERSION.format(tag=tag))
+    bump_version(PURGE_EPOCH)
+
+
+def purge_instance(instance, collection=True):
+    """Invalidate pages showing ``instance`` and, by default, pages listing its model."""
+    tags = [instance_tag(instance)]
+    if collection:
+        tags.append(model_tag(instance))
+    purge_tags(*tags)
+
+
+def is_cacheable_request(request):
+    """
+    Return whether ``request`` may be answered from, or stored in, the cache.
+
+    Only anonymous GET/HEAD requests without pending flash messages qualify.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return False
+    # Counting doesn't consume the messages; they're still shown
+    if len(messages.get_messages(request)):
+        return False
+    return True
+
+
+def is_cacheable_response(request, response):
+    """Return whether a rendered ``response`` can be shared with other visitors."""
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    if response.has_header('Cache-Control') and 'private' in response['Cache-Control']:
+        return False
+    # The page embeds a CSRF token (or sets the cookie); it's specific to
+    # this visitor
+    if request.META.get('CSRF_COOKIE_USED') or request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+        return False
+    return True
+
+
+def get_cache_key(request):
+    from theming.models import THEME_VERSION
+
+    url = f"{request.get_host()}{request.get_full_path()}"
+    return PAGE_CACHE_KEY.format(
+        theme_version=get_version(THEME_VERSION),
+        digest=hashlib.md5(url.encode('utf-8')).hexdigest(),
+    )
+
+
+def get_cached_entry(request):
+    """
+    Return the cache entry for ``request`` if none of its tags were purged.
+
+    An entry holds the key it's stored under, the page's dependency tags
+    with their versions, when it was rendered and the response, or ``None`` for a page that can't be
+    shared, e.g. one with a CSRF token; its tags still validate it for
+    conditional GETs.
+    """
+    entry = cache.get(get_cache_key(request))
+    if entry is None:
+        return None
+    tags = entry['tags']
+    versions = get_versions(*(TAG_VERSION.format(tag=tag) for tag in tags))
+    for tag, version in tags.items():
+        if versions[TAG_VERSION.format(tag=tag)] != version:
+            return None
+    return entry
+
+
+def get_cached_response(request):
+    """Return the cached response for ``request`` if none of its tags were purged."""
+    entry = get_cached_entry(request)
+    return entry and entry['response']
+
+
+def cache_response(request, get_response, models=(), timeout=None):
+    """
+    Serve ``request`` from the page cache, or call ``get_response`` and cache
+    the rendered result along with the dependency tags collected meanwhile;
+    just the tags if the result can't be shared.
+    """
+    if not is_cacheable_request(request):
+        return get_response()
+
+    response = get_cached_response(request)
+    if response is not None:
+        return response
+
+    epoch = get_version(PURGE_EPOCH)
+    tags = {model_tag(model) for model in models}
+    token = _collector.set(tags)
+    try:
+        response = get_response()
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+    finally:
+        _collector.reset(token)
+
+    if response.status_code == 200 and not response.streaming:
+        if timeout is None:
+            timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+        versions = get_versions(PURGE_EPOCH, *(TAG_VERSION.format(tag=tag) for tag in tags))
+        if versions[PURGE_EPOCH] != epoch:
+            # Something was purged while rendering; the page may mix old
+            # and new content, so don't keep it
+            return response
+        key = get_cache_key(request)
+        cache.set(key, {
+            'key': key,
+            'tags': {tag: versions[TAG_VERSION.format(tag=tag)] for tag in tags},
+            'rendered_at': time.time(),
+            'response': response if is_cacheable_response(request, response) else None,
+        }, timeout)
+    return response
+
+
+class PageCacheMixin:
+    """
+    Cache the rendered view for anonymous visitors.
+
+    ``page_cache_models`` lists the models whose collections the view shows;
+    list views add their own ``model`` automatically.
+    """
+    page_cache_models = ()
+    page_cache_timeout = None
+
+    def get_page_cache_models(self):
+        models = list(self.page_cache_models)
+        if hasattr(self, 'get_paginate_by') and getattr(self, 'model', None) is not None:
+            models.append(self.model)
+        return models
+
+    def dispatch(self, request, *args, **kwargs):
+        return cache_response(
+            request,
+            lambda: super(PageCacheMixin, self).dispatch(request, *args, **kwargs),
+            models=self.get_page_cache_models(),
+            timeout=self.page_cache_timeout,
+        )
\ No newline at end of file
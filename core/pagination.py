@@ -0,0 +1,255 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are selected with ``WHERE (published_at, id) < (cursor)`` rather than
+``OFFSET``, so the thousandth page costs the same as the first, and links
+keep pointing at the same posts when new ones are published. Items with no
+value for the ordering field sort last.
+"""
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db.models import F, Q
+from django.http import Http404
+from django.shortcuts import redirect
+from django.utils.translation import gettext as _
+
+from .cache import get_version
+from .page_cache import TAG_VERSION, model_tag
+
+
+COUNT_CACHE_KEY = 'pagination:count:{version}:{digest}'
+COUNT_CACHE_TIMEOUT = 600
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    """One page of a ``CursorPaginator``; stands in for Django's ``Page``."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self.object_list)} items>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        """Cursor for the page after this one, for ``?after=``."""
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        """Cursor for the page before this one, for ``?before=``."""
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0])
+
+
+class CursorPaginator:
+    """
+    Paginate ``queryset`` newest first on ``(field, pk)``.
+
+    ``count`` is only computed when asked for, and then cached until the
+    model's content changes (see ``core.page_cache``).
+    """
+
+    def __init__(self, queryset, per_page, field='published_at'):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.field = field
+        self.model_field = queryset.model._meta.get_field(field)
+
+    def encode_cursor(self, obj):
+        value = getattr(obj, self.field)
+        if value is not None:
+            value = self.model_field.value_to_string(obj)
+        data = json.dumps([value, obj.pk], separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            value, pk = json.loads(data)
+            if value is not None:
+                value = self.model_field.to_python(value)
+            pk = self.queryset.model._meta.pk.to_python(pk)
+        except (ValueError, TypeError, ValidationError):
+            raise InvalidCursor(_("That page cursor is invalid"))
+        return value, pk
+
+    def _ordering(self, reverse=False):
+        if reverse:
+            return [F(self.field).asc(nulls_first=True), F('pk').asc()]
+        return [F(self.field).desc(nulls_last=True), F('pk').desc()]
+
+    def _after(self, value, pk):
+        """Items following ``(value, pk)`` in page order."""
+        if value is None:
+            return Q(**{f'{self.field}__isnull': True, 'pk__lt': pk})
+        return (
+            Q(**{f'{self.field}__lt': value})
+            | Q(**{self.field: value, 'pk__lt': pk})
+            | Q(**{f'{self.field}__isnull': True})
+        )
+
+    def _before(self, value, pk):
+        """Items preceding ``(value, pk)`` in page order."""
+        if value is None:
+            return Q(**{f'{self.field}__isnull': False}) | Q(**{f'{self.field}__isnull': True, 'pk__gt': pk})
+        return Q(**{f'{self.field}__gt': value}) | Q(**{self.field: value, 'pk__gt': pk})
+
+    def get_page_queryset(self, after=None, before=None):
+        """
+        Return the unevaluated queryset for a page: ``per_page + 1`` rows, the
+        extra one telling whether there's more. With ``before`` the rows come
+        in reverse page order.
+        """
+        if before:
+            queryset = self.queryset.filter(self._before(*self.decode_cursor(before)))
+            queryset = queryset.order_by(*self._ordering(reverse=True))
+        else:
+            queryset = self.queryset
+            if after:
+                queryset = queryset.filter(self._after(*self.decode_cursor(after)))
+            queryset = queryset.order_by(*self._ordering())
+        return queryset[:self.per_page + 1]
+
+    def page(self, after=None, before=None):
+        rows = list(self.get_page_queryset(after, before))
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if before:
+            rows.reverse()
+            return CursorPage(rows, self, has_next=True, has_previous=more)
+        return CursorPage(rows, self, has_next=more, has_previous=bool(after))
+
+    def offset_cursor(self, offset):
+        """Return the ``after`` cursor that starts a page at ``offset``, or ``None``."""
+        rows = list(self.queryset.order_by(*self._ordering())[offset - 1:offset])
+        return self.encode_cursor(rows[0]) if rows else None
+
+    @property
+    def count(self):
+        try:
+            sql, params = self.queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        digest = hashlib.md5(f"{sql}{params!r}".encode('utf-8')).hexdigest()
+        version = get_version(TAG_VERSION.format(tag=model_tag(self.queryset.model)))
+        key = COUNT_CACHE_KEY.format(version=version, digest=digest)
+        count = cache.get(key)
+        if count is None:
+            count = self.queryset.count()
+            cache.set(key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+
+class CursorPaginationMixin:
+    """
+    Keyset pagination for ``ListView``, driven by ``?after=``/``?before=``.
+
+    Legacy ``?page=N`` links are redirected to the equivalent cursor.
+    ``page_obj`` is a ``CursorPage``: templates link to
+    ``?after={{ page_obj.next_cursor }}`` and
+    ``?before={{ page_obj.previous_cursor }}``.
+    """
+    paginate_field = 'published_at'
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return CursorPaginator(queryset, per_page, field=self.paginate_field)
+
+    def get_cursor(self):
+        return {
+            'after': self.request.GET.get('after') or None,
+            'before': self.request.GET.get('before') or None,
+        }
+
+    def get_page_queryset(self, queryset, page_size):
+        """Return the unevaluated queryset of the requested page, or ``None`` for legacy links."""
+        if self.page_kwarg in self.request.GET:
+            return None
+        paginator = self.get_paginator(queryset, page_size)
+        try:
+            return paginator.get_page_queryset(**self.get_cursor())
+        except InvalidCursor as e:
+            raise Http404(str(e))
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_paginator(queryset, page_size)
+        try:
+            page = paginator.page(**self.get_cursor())
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get(self, request, *args, **kwargs):
+        legacy_page = request.GET.get(self.page_kwarg)
+        if legacy_page is not None:
+            return self.redirect_legacy_page(legacy_page)
+        return super().get(request, *args, **kwargs)
+
+    def redirect_legacy_page(self, page):
+        """Redirect ``?page=N`` to the cursor URL showing the same items."""
+        try:
+            number = int(page)
+        except ValueError:
+            if page != 'last':
+                raise Http404(_("Page is not “last”, nor can it be converted to an int."))
+            number = None
+
+        query = self.request.GET.copy()
+        del query[self.page_kwarg]
+        query.pop('after', None)
+        query.pop('before', None)
+
+        queryset = self.get_queryset()
+        page_size = self.get_paginate_by(queryset)
+        paginator = self.get_paginator(queryset, page_size)
+        if number is None:
+            number = -(-paginator.count // page_size) or 1
+        if number > 1:
+            cursor = paginator.offset_cursor((number - 1) * page_size)
+            if cursor is None:
+                raise Http404(_("Invalid page (%(page_number)s): %(message)s") % {
+                    'page_number': page,
+                    'message': _("That page contains no results"),
+                })
+            query['after'] = cursor
+        elif number < 1:
+            raise Http404(_("Invalid page (%(page_number)s): %(message)s") % {
+                'page_number': page,
+                'message': _("That page number is less than 1"),
+            })
+        url = self.request.path
+        if query:
+            url = f"{url}?{query.urlencode()}"
+        return redirect(url)
\ No newline at end of file
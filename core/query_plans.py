@@ -0,0 +1,86 @@
+"""
+Query plan checks for the hot queries.
+
+Every query the public pages run on each request should be answered from
+an index. ``check_plans`` asks the database to ``EXPLAIN`` each of them and
+reports those that fall back to a full scan of their table; run it with
+``manage.py check_query_plans`` after changing models or indexes.
+"""
+import re
+from collections import namedtuple
+
+from django.db import connections, transaction
+
+
+# SQLite: "SCAN blog_post" is a full scan, "SCAN blog_post USING INDEX ..."
+# walks an index; PostgreSQL: "Seq Scan on blog_post"
+FULL_SCAN_PATTERNS = {
+    'sqlite': r'\bSCAN {table}\b(?! USING (?:COVERING )?INDEX)',
+    'postgresql': r'\bSeq Scan on {table}\b',
+}
+
+Plan = namedtuple('Plan', ('name', 'plan', 'full_scan'))
+
+
+def get_hot_queries():
+    """Return ``(name, queryset)`` for each query the public pages rely on."""
+    from django.contrib.contenttypes.models import ContentType
+    from blog.models import ArchiveMonth, Post
+    from categories.models import Category
+    from comments.models import Comment
+    from navigation.models import Menu
+    from newsletter.models import Newsletter, Subscriber
+    from pages.models import Page
+    from widgets.models import Widget
+
+    post_type = ContentType.objects.get_for_model(Post)
+    return [
+        ('published posts', Post.objects.published().order_by('-published_at', '-pk')[:11]),
+        ('featured posts', Post.objects.published().filter(is_featured=True).order_by('-published_at')[:3]),
+        ('popular posts', Post.objects.published().order_by('-approved_comment_count', '-published_at')[:5]),
+        ('trending posts', Post.objects.published().trending()[:5]),
+        ('post by slug', Post.objects.published().filter(slug='hot-query')),
+        ('due posts', Post.objects.due()),
+        ('archive months', ArchiveMonth.objects.all()[:12]),
+        ('published pages', Page.objects.published().order_by('-published_at')[:10]),
+        ('homepage', Page.objects.published().filter(is_homepage=True)),
+        ('category subtree', Category.objects.filter(tree_id=1, lft__gt=1, rght__lt=10)),
+        ('page ancestors', Page.objects.published().filter(tree_id=1, lft__lt=2, rght__gt=3)),
+        ('approved comments', Comment.objects.filter(
+            content_type=post_type, object_id=1, status=Comment.STATUS_APPROVED, parent=None,
+        ).order_by('-created_at')),
+        ('menu by location', Menu.objects.filter(location=Menu.LOCATION_HEADER)),
+        ('widget area', Widget.objects.filter(area_id=1, is_active=True).order_by('order')),
+        ('subscriber by token', Subscriber.objects.filter(confirmation_token='hot-query')),
+        ('due newsletters', Newsletter.objects.due()),
+    ]
+
+
+def has_full_scan(plan, table, vendor):
+    pattern = FULL_SCAN_PATTERNS[vendor].format(table=re.escape(table))
+    return re.search(pattern, plan) is not None
+
+
+def check_plans(using='default'):
+    """
+    ``EXPLAIN`` every hot query; returns a ``Plan`` for each. Raises
+    ``ValueError`` for a database whose plans can't be read.
+
+    On PostgreSQL sequential scans are discouraged first, as they're what
+    the planner picks for small tables whatever the indexes.
+    """
+    connection = connections[using]
+    vendor = connection.vendor
+    if vendor not in FULL_SCAN_PATTERNS:
+        raise ValueError(f"Unsupported database: query plans can't be checked on {vendor}.")
+
+    plans = []
+    with transaction.atomic(using=using):
+        if vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for name, queryset in get_hot_queries():
+            plan = queryset.using(using).explain()
+            table = queryset.model._meta.db_table
+            plans.append(Plan(name, plan, has_full_scan(plan, table, vendor)))
+    return plans
\ No newline at end of file
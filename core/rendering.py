@@ -0,0 +1,392 @@
+"""
+Save-time rendering of rich text content.
+
+CKEditor content is turned into the HTML the templates show once, when it's
+saved, instead of being emitted raw on every view. ``render`` sanitizes it
+against an allowlist, gives images lazy loading, their intrinsic size and
+responsive renditions, and gives headings anchors, collected into a table
+of contents. ``RenderedContentModel`` (``core.models``) stores the result.
+
+Bump ``RENDER_VERSION`` whenever the output changes, then run
+``manage.py rerender_content`` to bring stored content up to date.
+"""
+import multiprocessing
+import re
+from collections import namedtuple
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.utils.text import slugify
+
+
+RENDER_VERSION = 1
+
+RENDERED_MODELS = ('blog.Post', 'pages.Page')
+
+ALLOWED_TAGS = frozenset({
+    'a', 'abbr', 'b', 'blockquote', 'br', 'caption', 'cite', 'code', 'col',
+    'colgroup', 'dd', 'del', 'div', 'dl', 'dt', 'em', 'figcaption', 'figure',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'iframe', 'img', 'ins',
+    'kbd', 'li', 'mark', 'ol', 'p', 'pre', 'q', 's', 'small', 'span',
+    'strike', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot', 'th',
+    'thead', 'tr', 'u', 'ul',
+})
+
+VOID_TAGS = frozenset({'br', 'col', 'hr', 'img'})
+
+# Removed along with everything inside them; other unknown tags are
+# removed but keep their text
+DROPPED_TAGS = frozenset({
+    'applet', 'head', 'iframe', 'math', 'noscript', 'object', 'script',
+    'select', 'style', 'svg', 'template', 'textarea', 'title',
+})
+
+GLOBAL_ATTRIBUTES = frozenset({'class', 'dir', 'lang', 'style', 'title'})
+
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'name', 'rel', 'target'},
+    'blockquote': {'cite'},
+    'col': {'span', 'width'},
+    'colgroup': {'span', 'width'},
+    'div': {'align'},
+    'iframe': {'allow', 'allowfullscreen', 'frameborder', 'height', 'src', 'width'},
+    'img': {'alt', 'height', 'src', 'width'},
+    'li': {'value'},
+    'ol': {'reversed', 'start', 'type'},
+    'p': {'align'},
+    'q': {'cite'},
+    'table': {'align', 'border', 'cellpadding', 'cellspacing', 'summary', 'width'},
+    'td': {'align', 'colspan', 'height', 'rowspan', 'valign', 'width'},
+    'th': {'align', 'colspan', 'height', 'rowspan', 'scope', 'valign', 'width'},
+    'ul': {'type'},
+}
+for _tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
+    ALLOWED_ATTRIBUTES[_tag] = {'id'}
+
+URL_ATTRIBUTES = frozenset({'cite', 'href', 'src'})
+
+ALLOWED_SCHEMES = frozenset({'', 'http', 'https', 'mailto', 'tel'})
+
+# Hosts whose players may be embedded with an <iframe>
+EMBED_HOSTS = frozenset({
+    'www.youtube.com', 'www.youtube-nocookie.com', 'player.vimeo.com',
+})
+
+# Headings that get an anchor and an entry in the table of contents
+TOC_TAGS = ('h2', 'h3', 'h4')
+
+# Browsers ignore these inside URLs, so "java\tscript:" is "javascript:"
+_URL_IGNORED_RE = re.compile(r'[\x00-\x20\x7f]')
+_UNSAFE_STYLE_RE = re.compile(r'expression|url\s*\(|script:|behaviou?r|binding|@import|\\', re.IGNORECASE)
+
+Rendered = namedtuple('Rendered', ('html', 'toc'))
+
+
+def clean_url(value):
+    """Return ``value`` if it's a safe link or image URL, else ``None``."""
+    value = value.strip()
+    try:
+        scheme = urlsplit(_URL_IGNORED_RE.sub('', value)).scheme.lower()
+    except ValueError:
+        return None
+    return value if scheme in ALLOWED_SCHEMES else None
+
+
+def is_allowed_embed(attrs):
+    src = dict(attrs).get('src') or ''
+    try:
+        url = urlsplit(src.strip())
+    except ValueError:
+        return False
+    return url.scheme == 'https' and url.hostname in EMBED_HOSTS
+
+
+def get_media_name(src):
+    """Return the storage name of a ``MEDIA_URL`` image ``src``, or ``None``."""
+    if not src.startswith(settings.MEDIA_URL):
+        return None
+    path = urlsplit(src[len(settings.MEDIA_URL):]).path
+    return unquote(path) or None
+
+
+class _Image:
+    """An ``<img>`` waiting for its size and renditions; see ``_prepare_images``."""
+
+    def __init__(self, attrs):
+        self.attrs = attrs
+
+    def __str__(self):
+        return _start_tag('img', self.attrs)
+
+
+def _start_tag(tag, attrs):
+    parts = [tag]
+    for name, value in attrs.items():
+        parts.append(name if value is None else f'{name}="{escape(value)}"')
+    return f"<{' '.join(parts)}>"
+
+
+class ContentRenderer(HTMLParser):
+    """
+    Sanitize one piece of content, collecting its images and headings.
+
+    Feed it the content, ``close()`` it, then read ``output`` (strings and
+    ``_Image`` placeholders) and ``toc``.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.output = []
+        self.images = []
+        self.toc = []
+        self.ids = set()
+        self.open_tags = []
+        # (tag, nesting) of the dropped element being skipped
+        self.skipping = None
+        # (depth, attrs, output index, text) of the heading being read
+        self.heading = None
+
+    def clean_attrs(self, tag, attrs):
+        allowed = GLOBAL_ATTRIBUTES | ALLOWED_ATTRIBUTES.get(tag, set())
+        cleaned = {}
+        for name, value in attrs:
+            if name not in allowed or name in cleaned:
+                continue
+            if value is not None:
+                if name in URL_ATTRIBUTES:
+                    value = clean_url(value)
+                elif name == 'style' and _UNSAFE_STYLE_RE.search(value):
+                    value = None
+                if value is None:
+                    continue
+            cleaned[name] = value
+        if cleaned.get('target') == '_blank':
+            cleaned['rel'] = 'noopener noreferrer'
+        return cleaned
+
+    def handle_starttag(self, tag, attrs):
+        if self.skipping:
+            if tag == self.skipping[0]:
+                self.skipping[1] += 1
+            return
+        if tag in DROPPED_TAGS and not (tag == 'iframe' and is_allowed_embed(attrs)):
+            self.skipping = [tag, 1]
+            return
+        if tag not in ALLOWED_TAGS:
+            return
+
+        attrs = self.clean_attrs(tag, attrs)
+        if tag == 'img':
+            if 'src' in attrs:
+                image = _Image(attrs)
+                self.images.append(image)
+                self.output.append(image)
+            return
+        if tag in TOC_TAGS and self.heading is None:
+            # The start tag is written once the heading's text gives it an id
+            self.open_tags.append(tag)
+            self.heading = (len(self.open_tags), attrs, len(self.output), [])
+            return
+        if 'id' in attrs:
+            self.ids.add(attrs['id'])
+        self.output.append(_start_tag(tag, attrs))
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.skipping:
+            if tag == self.skipping[0]:
+                self.skipping[1] -= 1
+                if not self.skipping[1]:
+                    self.skipping = None
+            return
+        if tag in VOID_TAGS or tag not in self.open_tags:
+            return
+        # Close anything left open inside it, as browsers do
+        while True:
+            open_tag = self.open_tags.pop()
+            self.close_tag(open_tag)
+            if open_tag == tag:
+                break
+
+    def close_tag(self, tag):
+        if self.heading is not None and self.heading[0] == len(self.open_tags) + 1:
+            self.close_heading(tag)
+        else:
+            self.output.append(f'</{tag}>')
+
+    def close_heading(self, tag):
+        depth, attrs, index, text = self.heading
+        self.heading = None
+        title = ' '.join(''.join(text).split())
+        anchor = attrs.get('id') or self.unique_id(slugify(title) or 'section')
+        attrs['id'] = anchor
+        self.ids.add(anchor)
+        self.output.insert(index, _start_tag(tag, attrs))
+        self.output.append(
+            f'<a class="heading-anchor" href="#{escape(anchor)}" aria-hidden="true">#</a></{tag}>'
+        )
+        if title:
+            self.toc.append({'level': int(tag[1]), 'id': anchor, 'title': title})
+
+    def unique_id(self, base):
+        anchor, number = base, 1
+        while anchor in self.ids:
+            number += 1
+            anchor = f'{base}-{number}'
+        return anchor
+
+    def handle_data(self, data):
+        if self.skipping:
+            return
+        self.output.append(escape(data, quote=False))
+        if self.heading is not None:
+            self.heading[3].append(data)
+
+    def close(self):
+        super().close()
+        self.skipping = None
+        while self.open_tags:
+            self.close_tag(self.open_tags.pop())
+
+    # Comments, doctypes and processing instructions are dropped: the
+    # parser's default handlers do nothing with them.
+
+
+def get_image_size(file):
+    """Return the ``(width, height)`` of an image file, or ``(None, None)``."""
+    from django.core.files.images import get_image_dimensions
+
+    try:
+        return get_image_dimensions(file)
+    except (OSError, ValueError):
+        return None, None
+
+
+def _prepare_images(images):
+    """
+    Give ``images`` lazy loading and, for those in the media library or
+    uploaded through the editor, their intrinsic size and renditions.
+    """
+    from django.core.files.storage import default_storage
+    from media_library.models import MediaItem
+    from media_library.renditions import get_renditions
+
+    by_name = {}
+    for image in images:
+        image.attrs.setdefault('alt', '')
+        image.attrs['loading'] = 'lazy'
+        image.attrs['decoding'] = 'async'
+        name = get_media_name(image.attrs['src'])
+        if name:
+            by_name.setdefault(name, []).append(image)
+    if not by_name:
+        return
+
+    items = {item.file.name: item for item in MediaItem.objects.filter(file__in=list(by_name))}
+    for name, named_images in by_name.items():
+        item = items.get(name)
+        if item is not None and item.width and item.height:
+            width, height = item.width, item.height
+        elif default_storage.exists(name):
+            with default_storage.open(name) as file:
+                width, height = get_image_size(file)
+        else:
+            width = height = None
+        renditions = get_renditions(item.file, width) if item is not None and width else []
+
+        for image in named_images:
+            attrs = image.attrs
+            if item is not None and item.alt_text and not attrs['alt']:
+                attrs['alt'] = item.alt_text
+            if width and height and 'width' not in attrs and 'height' not in attrs:
+                attrs['width'] = str(width)
+                attrs['height'] = str(height)
+            if renditions:
+                srcset = [f'{url} {rendition_width}w' for url, rendition_width in renditions]
+                srcset.append(f"{attrs['src']} {width}w")
+                attrs['srcset'] = ', '.join(srcset)
+                attrs['sizes'] = getattr(settings, 'IMAGE_RENDITION_SIZES', '(max-width: 768px) 100vw, 768px')
+
+
+def render(content):
+    """Return the ``Rendered`` HTML and table of contents of ``content``."""
+    renderer = ContentRenderer()
+    renderer.feed(content or '')
+    renderer.close()
+    _prepare_images(renderer.images)
+    return Rendered(''.join(str(part) for part in renderer.output), renderer.toc)
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _render_chunk(rows):
+    return [(pk, render(content)) for pk, content in rows]
+
+
+def rerender(models=RENDERED_MODELS, processes=None, chunk_size=100, force=False):
+    """
+    Re-render the stored content of every object rendered by an older
+    ``RENDER_VERSION`` (every object with ``force``). Objects saved before
+    the rendered fields were added have version 0, so they're rendered too;
+    the migrations adding the fields leave that to this.
+
+    Rendering runs in a pool of ``processes`` worker processes (one per CPU
+    by default, none when 1); the results are written back as they come.
+    Returns ``{model label: number of objects re-rendered}``.
+    """
+    from django.apps import apps
+    from django.db import connections
+    from .page_cache import model_tag, purge_tags
+
+    totals = {}
+    for label in models:
+        model = apps.get_model(label)
+        queryset = model._default_manager.order_by('pk')
+        if not force:
+            queryset = queryset.exclude(render_version=RENDER_VERSION)
+        rows = list(queryset.values_list('pk', 'content'))
+        chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+
+        if processes == 1 or len(chunks) <= 1:
+            results = map(_render_chunk, chunks)
+            pool = None
+        else:
+            # Forked workers must open their own database connections
+            connections.close_all()
+            pool = multiprocessing.Pool(processes, _init_worker)
+            results = pool.imap_unordered(_render_chunk, chunks)
+
+        pks = []
+        try:
+            for chunk in results:
+                model._default_manager.bulk_update([
+                    model(pk=pk, rendered_content=rendered.html, toc=rendered.toc,
+                          render_version=RENDER_VERSION)
+                    for pk, rendered in chunk
+                ], model.RENDERED_FIELDS)
+                pks.extend(pk for pk, _ in chunk)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        if pks:
+            # Queryset updates skip post_save, so purge here
+            tag = model_tag(model)
+            purge_tags(tag, *(f"{tag}:{pk}" for pk in pks))
+        totals[label] = len(pks)
+    return totals
\ No newline at end of file
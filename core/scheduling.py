@@ -0,0 +1,74 @@
+"""
+Scheduled publishing.
+
+Posts and pages saved as published with a future ``published_at`` are
+stored as scheduled (see ``PublishableModel.save``) and stay off the site
+until ``publish_due`` publishes them, which ``manage.py run_scheduler``
+does every minute or so. Scheduled newsletters go out from the same run,
+and the queued search document updates are made.
+"""
+from django.apps import apps
+
+from .models import PublishableModel
+from .signals import content_changed
+
+
+SCHEDULED_MODELS = ('blog.Post', 'pages.Page')
+
+
+def publish_due(batch_size=100):
+    """
+    Publish the scheduled content whose time has come, one ``UPDATE`` per
+    ``batch_size`` rows, and send ``content_changed`` for each batch so
+    only the pages showing it are purged.
+
+    Returns ``{model label: [published pks]}``.
+    """
+    published = {}
+    for label in SCHEDULED_MODELS:
+        model = apps.get_model(label)
+        manager = model._default_manager
+        published[label] = []
+        while True:
+            pks = list(
+                manager.due().order_by('published_at', 'pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            # due() again, in case one was unscheduled in the meantime
+            manager.filter(pk__in=pks).due().update(status=PublishableModel.STATUS_PUBLISHED)
+            content_changed.send(sender=model, model=model, pks=pks)
+            published[label].extend(pks)
+    return published
+
+
+def send_due_newsletters(batch_size=100):
+    """Send the scheduled newsletters whose time has come; returns their pks."""
+    Newsletter = apps.get_model('newsletter.Newsletter')
+
+    sent = []
+    while True:
+        pks = list(
+            Newsletter.objects.due().order_by('scheduled_at', 'pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            break
+        # due() again, in case one was unscheduled in the meantime
+        sent.extend(Newsletter.objects.filter(pk__in=pks).due().send())
+    return sent
+
+
+def update_search_index(batch_size=100):
+    """Update the queued search documents; returns their number."""
+    from search.queue import drain
+    return drain(batch_size)
+
+
+def run(batch_size=100):
+    """Do everything that has come due; returns the counts by model label."""
+    totals = {label: len(pks) for label, pks in publish_due(batch_size).items()}
+    totals['newsletter.Newsletter'] = len(send_due_newsletters(batch_size))
+    # After publishing, so the documents of what was just published are
+    # updated in the same run
+    totals['search.SearchDocument'] = update_search_index(batch_size)
+    return totals
\ No newline at end of file
@@ -0,0 +1,71 @@
+from django.apps import apps
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+from django.dispatch import Signal, receiver
+
+from .page_cache import TRACKED_MODELS, record_instance, purge_instance, purge_tags, model_tag, instance_tag
+
+
+# Sent with ``model`` and ``pks`` after content rows were changed with a
+# queryset update, which post_save doesn't see.
+content_changed = Signal()
+
+
+def _record_loaded(sender, instance, **kwargs):
+    record_instance(instance)
+
+
+def _purge_saved(sender, instance, **kwargs):
+    purge_instance(instance)
+
+
+for label in TRACKED_MODELS:
+    post_init.connect(_record_loaded, sender=label, dispatch_uid=f'page_cache_record_{label}')
+    post_save.connect(_purge_saved, sender=label, dispatch_uid=f'page_cache_save_{label}')
+    post_delete.connect(_purge_saved, sender=label, dispatch_uid=f'page_cache_delete_{label}')
+
+
+@receiver(content_changed)
+def purge_changed_content(sender, model, pks, **kwargs):
+    """Purge the lists of ``model`` and the pages of the changed rows."""
+    tag = model_tag(model)
+    purge_tags(tag, *(f"{tag}:{pk}" for pk in pks))
+
+
+@receiver(post_save, sender='comments.Comment')
+@receiver(post_delete, sender='comments.Comment')
+def comment_changed(sender, instance, **kwargs):
+    """Purge the pages showing the commented object."""
+    model = instance.content_type.model_class()
+    if model is not None:
+        purge_tags(f"{model_tag(model)}:{instance.object_id}")
+
+
+def categories_changed(sender, instance, action, model, pk_set, **kwargs):
+    """Purge both sides of a post/page <-> category change."""
+    if not action.startswith('post_'):
+        return
+    tags = [model_tag(instance), model_tag(model), instance_tag(instance)]
+    tags.extend(f"{model_tag(model)}:{pk}" for pk in pk_set or ())
+    purge_tags(*tags)
+
+
+def tags_changed(sender, instance, action, **kwargs):
+    """Purge pages showing an object whose taggit tags changed."""
+    if action.startswith('post_') and instance.pk is not None:
+        if f"{instance._meta.app_label}.{instance._meta.object_name}" in TRACKED_MODELS:
+            purge_instance(instance)
+
+
+def connect_m2m_signals():
+    for label in ('blog.Post', 'pages.Page'):
+        model = apps.get_model(label)
+        m2m_changed.connect(
+            categories_changed,
+            sender=model.categories.through,
+            dispatch_uid=f'page_cache_categories_{label}',
+        )
+    m2m_changed.connect(
+        tags_changed,
+        sender=apps.get_model('taggit.TaggedItem'),
+        dispatch_uid='page_cache_tags',
+    )
\ No newline at end of file
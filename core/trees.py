@@ -0,0 +1,45 @@
+"""
+Category and page hierarchies.
+
+Both are django-mptt trees: each row stores its ``tree_id``, ``lft``,
+``rght`` and ``level``, so its ancestors, descendants and subtree are one
+range query each instead of a walk over ``parent`` one query per level.
+``rebuild`` recomputes those columns from ``parent``, for existing data
+(``manage.py rebuild_trees``) or after rows were changed behind mptt's
+back.
+"""
+from django.apps import apps
+from django.db.models.signals import pre_delete, post_delete
+
+from .page_cache import model_tag, purge_tags
+
+
+TREE_MODELS = ('categories.Category', 'pages.Page')
+
+
+def rebuild(models=TREE_MODELS):
+    """Rebuild the trees of ``models`` (labels); returns the node counts by label."""
+    totals = {}
+    for label in models:
+        model = apps.get_model(label)
+        model._tree_manager.rebuild()
+        purge_tags(model_tag(model))
+        totals[label] = model._default_manager.count()
+    return totals
+
+
+def _deleting(sender, instance, **kwargs):
+    instance._had_children = instance.rght - instance.lft > 1
+
+
+def _deleted(sender, instance, **kwargs):
+    # ``parent`` is SET_NULL: the children became roots, which mptt doesn't
+    # know about
+    if getattr(instance, '_had_children', False):
+        sender._tree_manager.rebuild()
+
+
+def connect_tree_signals():
+    for label in TREE_MODELS:
+        pre_delete.connect(_deleting, sender=label, dispatch_uid=f'trees_deleting_{label}')
+        post_delete.connect(_deleted, sender=label, dispatch_uid=f'trees_deleted_{label}')
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Buffered page view counts and trending scores.
+
+A view is only counted in memory while the request is served. Every
+``VIEW_COUNT_FLUSH_INTERVAL`` seconds a background thread in each process
+adds the buffered counts to the database, one ``UPDATE`` per distinct
+count, and brings the trending scores up to date in the same statement.
+
+The trending score is the sum of a post's views, each decayed
+exponentially by its age with a half-life of ``TRENDING_HALF_LIFE``
+seconds. Every score decays at the same rate, so instead of the score
+itself ``trending_score`` stores ``ln(score) + rate * time``: ordering by
+it orders by the current score, and rows nobody views never need to be
+written to stay correct.
+"""
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Value
+from django.db.models.functions import Exp, Greatest, Ln
+
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_buffer = Counter()
+_flusher_pid = None
+
+
+def get_flush_interval():
+    """Seconds between flushes of the buffered counts."""
+    return getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 30)
+
+
+def get_decay_rate():
+    """Decay rate of the trending score, per second."""
+    return math.log(2) / getattr(settings, 'TRENDING_HALF_LIFE', 24 * 60 * 60)
+
+
+def decayed_score(trending_score, now=None):
+    """Turn a stored ``trending_score`` into the score as of ``now``."""
+    if not trending_score:
+        return 0.0
+    now = time.time() if now is None else now
+    return math.exp(trending_score - get_decay_rate() * now)
+
+
+def record_view(model, **lookup):
+    """
+    Count a view of the ``model`` object found by ``lookup``, a single
+    field, e.g. ``record_view(Post, slug=slug)``. Nothing is written until
+    the next flush.
+    """
+    (field, value), = lookup.items()
+    _start_flusher()
+    with _lock:
+        _buffer[(model._meta.label, field, value)] += 1
+
+
+def _take_buffer():
+    global _buffer
+    with _lock:
+        counts, _buffer = _buffer, Counter()
+    return counts
+
+
+def flush():
+    """Write the buffered counts to the database; returns the number of views written."""
+    counts = _take_buffer()
+    if not counts:
+        return 0
+
+    # One UPDATE for each model, lookup field and count
+    groups = {}
+    for (label, field, value), count in counts.items():
+        groups.setdefault((label, field, count), []).append(value)
+
+    # The stored score's value as of now, plus the new views, back in log
+    # space. exp() is floored so scores gone to nothing don't underflow.
+    offset = Value(get_decay_rate() * time.time())
+    written = 0
+    try:
+        for (label, field, count), values in groups.items():
+            model = apps.get_model(label)
+            model._default_manager.filter(**{f'{field}__in': values}).update(
+                view_count=F('view_count') + count,
+                trending_score=Ln(
+                    Exp(Greatest(F('trending_score') - offset, Value(-700.0))) + Value(float(count))
+                ) + offset,
+            )
+            written += count * len(values)
+    except Exception:
+        # Keep what wasn't written for the next flush
+        logger.exception("Could not write view counts")
+        with _lock:
+            for (label, field, count), values in groups.items():
+                for value in values:
+                    _buffer[(label, field, value)] += count
+        written = 0
+    return written
+
+
+def _flush_periodically(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        finally:
+            # This thread's connection would otherwise stay open, idle
+            connections.close_all()
+
+
+def _start_flusher():
+    """Start the flushing thread of this process if it isn't running yet."""
+    global _flusher_pid, _buffer
+    pid = os.getpid()
+    if _flusher_pid == pid:
+        return
+    with _lock:
+        if _flusher_pid == pid:
+            return
+        if _flusher_pid is not None:
+            # A forked child: the counts belong to the parent
+            _buffer = Counter()
+        _flusher_pid = pid
+        thread = threading.Thread(
+            target=_flush_periodically,
+            args=(get_flush_interval(),),
+            name='view-count-flusher',
+            daemon=True,
+        )
+        thread.start()
+        atexit.register(flush)
+
+
+class ViewCountMixin:
+    """
+    Count a view of the object of a ``DetailView`` whenever it's shown.
+
+    Place it before ``ConditionalGetMixin`` and ``PageCacheMixin``: views
+    answered from the cache, or with a 304, count too. The object is
+    identified by its URL's slug, so counting needs no query.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if request.method == 'GET' and response.status_code in (200, 304):
+            slug = self.kwargs.get(self.slug_url_kwarg)
+            if slug is not None:
+                record_view(self.model, **{self.slug_field: slug})
+        return response
\ No newline at end of file
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'crispy_tailwind',
     'ckeditor',
     'imagekit',
+    'mptt',
     
     # Custom apps
     'core',
@@ -55,7 +56,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Whitenoise for static files
+    'theming.middleware.ThemeAssetsMiddleware',  # Whitenoise for static files and compiled theme assets
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -112,6 +113,30 @@ if 'DATABASE_URL' in os.environ:
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
         }
 
+# Each process keeps rendered pages, menus and the like in its own memory,
+# under the version stamps of core.cache. The stamps live in the shared
+# "versions" cache, so a bump made by any web worker or the scheduler
+# retires those entries everywhere: the database cache, whose table the core
+# migrations create, unless REDIS_URL is set. Redis is recommended wherever
+# more than one process serves the site; everything is shared there.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'djcms_cache',
+    },
+}
+
+# Use REDIS_URL environment variable if available
+if 'REDIS_URL' in os.environ:
+    for alias in CACHES:
+        CACHES[alias] = {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -152,6 +177,26 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Whitenoise for static files in production
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Compiled, fingerprinted theme stylesheets and scripts, served by Whitenoise
+THEME_ASSETS_DIR = os.path.join(STATIC_ROOT, 'theme')
+
+# Seconds anonymous pages stay in the full-page cache; saves purge them sooner
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', 600))
+
+# Search backend class; by default the one for the database (see search.backends)
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND') or None
+
+# Index file of search.engine.EngineBackend, shared by every process
+SEARCH_INDEX_PATH = os.environ.get('SEARCH_INDEX_PATH', os.path.join(BASE_DIR, 'search.idx'))
+
+# Whether run_scheduler runs alongside the site; entrypoint.sh starts it
+# unless RUN_SCHEDULER is false
+RUN_SCHEDULER = os.environ.get('RUN_SCHEDULER', 'False').lower() == 'true'
+
+# Leave search document updates to the scheduler rather than making them
+# as content is saved; only the default where a scheduler runs to drain them
+SEARCH_QUEUE_UPDATES = os.environ.get('SEARCH_QUEUE_UPDATES', str(RUN_SCHEDULER)).lower() == 'true'
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
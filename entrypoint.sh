@@ -39,10 +39,31 @@ python check_db.py || {
     exit 1
 }
 
+# Create the shared cache table, if the database cache is in use
+python manage.py createcachetable
+
+# Render content saved before rendering was added, or by an older pipeline
+echo "Re-rendering content..."
+python manage.py rerender_content
+
 # Load sample data
 echo "Loading sample data..."
 python setup.py
 
+# Publish scheduled content, send scheduled newsletters and update the
+# search index in the background, unless a separate process does it
+export RUN_SCHEDULER=${RUN_SCHEDULER:-true}
+if [ "$RUN_SCHEDULER" = "true" ]; then
+    echo "Starting scheduler..."
+    (
+        while true; do
+            python manage.py run_scheduler --loop
+            echo "Scheduler exited. Restarting in 5 seconds..."
+            sleep 5
+        done
+    ) &
+fi
+
 # Start server
 echo "Starting server..."
 exec gunicorn djCMS.wsgi:application --bind 0.0.0.0:${PORT:-8000}
\ No newline at end of file
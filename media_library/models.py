@@ -1,6 +1,7 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
+from django.core.files.images import get_image_dimensions
 from django.contrib.auth import get_user_model
 
 from core.models import TimeStampedModel
@@ -85,5 +86,9 @@ class MediaItem(TimeStampedModel):
             # Set file size
             if self.file.size:
                 self.file_size = self.file.size
+            
+            # Set image dimensions, which rendered content gives its images
+            if self.file_type == self.TYPE_IMAGE and not (self.width and self.height):
+                self.width, self.height = get_image_dimensions(self.file)
         
         super().save(*args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Responsive image renditions.
+
+Scaled-down copies of library images are generated with imagekit the
+first time they're asked for and kept in its cache directory.
+"""
+from django.conf import settings
+from imagekit import ImageSpec
+from imagekit.cachefiles import ImageCacheFile
+from imagekit.processors import ResizeToFit
+
+
+# Formats that can be resized without losing anything (SVGs don't need it,
+# animated GIFs would lose their animation)
+RESIZABLE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def get_widths():
+    """Widths, in pixels, that renditions are made at."""
+    return getattr(settings, 'IMAGE_RENDITION_WIDTHS', (480, 960, 1440))
+
+
+class Rendition(ImageSpec):
+    """``source`` scaled down to ``width`` pixels wide."""
+    options = {'quality': 85}
+
+    def __init__(self, source, width):
+        self.width = width
+        super().__init__(source=source)
+
+    @property
+    def processors(self):
+        return [ResizeToFit(width=self.width, upscale=False)]
+
+
+def get_renditions(file, width):
+    """
+    Return ``(url, width)`` for each rendition of ``file`` narrower than its
+    own ``width``, generating any that are missing. Files that can't be
+    resized, or read, have none.
+    """
+    if not file or not file.name.lower().endswith(RESIZABLE_EXTENSIONS):
+        return []
+    renditions = []
+    for rendition_width in sorted(get_widths()):
+        if rendition_width >= width:
+            break
+        cachefile = ImageCacheFile(Rendition(file, rendition_width))
+        try:
+            cachefile.generate()
+        except (OSError, ValueError):
+            return []
+        renditions.append((cachefile.url, rendition_width))
+    return renditions
\ No newline at end of file
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class NavigationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'navigation'
\ No newline at end of file
+    name = 'navigation'
+
+    def ready(self):
+        from . import signals  # noqa: F401
\ No newline at end of file
@@ -1,14 +1,26 @@
-from .models import Menu
+from django.utils.functional import SimpleLazyObject
+
+from core.cache import memoize_on_request
+from core.page_cache import record_dependency
+from .models import Menu, MenuItem
+from .tree import get_menus
 
 
 def menus(request):
-    """Context processor to add menus to all templates."""
-    header_menu = Menu.objects.filter(location=Menu.LOCATION_HEADER).first()
-    footer_menu = Menu.objects.filter(location=Menu.LOCATION_FOOTER).first()
-    sidebar_menu = Menu.objects.filter(location=Menu.LOCATION_SIDEBAR).first()
+    """
+    Context processor to add menus to all templates.
+    
+    The menus are lazy: nothing is read from the cache or the database
+    unless a template actually uses one of them.
+    """
+    def menu_at(location):
+        def load():
+            record_dependency(Menu, MenuItem)
+            return memoize_on_request(request, 'menus', get_menus).get(location)
+        return load
     
     return {
-        'header_menu': header_menu,
-        'footer_menu': footer_menu,
-        'sidebar_menu': sidebar_menu,
+        'header_menu': SimpleLazyObject(menu_at(Menu.LOCATION_HEADER)),
+        'footer_menu': SimpleLazyObject(menu_at(Menu.LOCATION_FOOTER)),
+        'sidebar_menu': SimpleLazyObject(menu_at(Menu.LOCATION_SIDEBAR)),
     }
\ No newline at end of file
@@ -28,6 +28,9 @@ class Menu(TimeStampedModel):
         verbose_name = _("Menu")
         verbose_name_plural = _("Menus")
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['location'], name='navigation_menu_location_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from pages.models import Page
+from categories.models import Category
+from .models import Menu, MenuItem
+from .tree import invalidate_menus, invalidate_for_page, invalidate_for_category
+
+
+@receiver(post_save, sender=Menu)
+@receiver(post_delete, sender=Menu)
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def menu_changed(sender, **kwargs):
+    """Rebuild the menu trees after any menu or menu item change."""
+    invalidate_menus()
+
+
+@receiver(post_save, sender=Page)
+def page_saved(sender, instance, **kwargs):
+    invalidate_for_page(instance)
+
+
+@receiver(post_delete, sender=Page)
+def page_deleted(sender, instance, **kwargs):
+    invalidate_for_page(instance, deleted=True)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, **kwargs):
+    invalidate_for_category(instance)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    invalidate_for_category(instance, deleted=True)
\ No newline at end of file
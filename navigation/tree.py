@@ -0,0 +1,191 @@
+from django.core.cache import cache
+from django.urls import reverse
+
+from core.cache import CACHE_TIMEOUT, get_version, bump_version
+from core.page_cache import model_tag, purge_tags
+from .models import Menu, MenuItem
+
+
+MENUS_VERSION = 'navigation.menus'
+MENUS_CACHE_KEY = 'navigation:menus:{version}'
+
+
+class ItemList(tuple):
+    """
+    Tuple of menu nodes.
+
+    Provides ``all()`` so templates written against the ``items``/``children``
+    related managers (``menu.items.all``, ``item.children.all``) keep working.
+    """
+
+    def all(self):
+        return self
+
+
+class _Frozen:
+    """Base class for objects that can't be modified once built."""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+
+class MenuNode(_Frozen):
+    """A menu item with its URL resolved and its parent/children linked."""
+    __slots__ = ('pk', 'title', 'url', 'target_blank', 'parent', 'children')
+
+    def __init__(self, pk, title, url, target_blank):
+        object.__setattr__(self, 'pk', pk)
+        object.__setattr__(self, 'title', title)
+        object.__setattr__(self, 'url', url)
+        object.__setattr__(self, 'target_blank', target_blank)
+        object.__setattr__(self, 'parent', None)
+        object.__setattr__(self, 'children', ItemList())
+
+    def __str__(self):
+        return self.title
+
+    @property
+    def get_url(self):
+        """Return the URL for this menu item."""
+        return self.url
+
+
+class MenuTree(_Frozen):
+    """A menu with all of its items, as a tree of ``MenuNode`` objects."""
+    __slots__ = ('pk', 'name', 'slug', 'location', 'items', 'roots')
+
+    def __init__(self, menu, items, roots):
+        object.__setattr__(self, 'pk', menu.pk)
+        object.__setattr__(self, 'name', menu.name)
+        object.__setattr__(self, 'slug', menu.slug)
+        object.__setattr__(self, 'location', menu.location)
+        object.__setattr__(self, 'items', ItemList(items))
+        object.__setattr__(self, 'roots', ItemList(roots))
+
+    def __str__(self):
+        return self.name
+
+
+class MenuSet(_Frozen):
+    """
+    The menu shown at each location, plus the page and category URLs the
+    trees were built with so saves can tell whether they made them stale.
+    """
+    __slots__ = ('menus', 'page_urls', 'category_urls')
+
+    def __init__(self, menus, page_urls, category_urls):
+        object.__setattr__(self, 'menus', menus)
+        object.__setattr__(self, 'page_urls', page_urls)
+        object.__setattr__(self, 'category_urls', category_urls)
+
+    def get(self, location):
+        return self.menus.get(location)
+
+
+def build_menus():
+    """Build a ``MenuSet`` from the database in two queries."""
+    menus = {}
+    for menu in Menu.objects.filter(location__in=[code for code, label in Menu.LOCATION_CHOICES]):
+        # Same pick as ``Menu.objects.filter(location=...).first()``
+        menus.setdefault(menu.location, menu)
+
+    items = MenuItem.objects.filter(
+        menu__in=list(menus.values())
+    ).select_related('page', 'category').order_by('order', 'pk')
+
+    page_urls = {}
+    category_urls = {}
+    nodes = {}
+    by_menu = {menu.pk: [] for menu in menus.values()}
+    for item in items:
+        url = item.get_url
+        if item.item_type == MenuItem.TYPE_PAGE and item.page:
+            page_urls[item.page_id] = url
+        elif item.item_type == MenuItem.TYPE_CATEGORY and item.category:
+            category_urls[item.category_id] = url
+        nodes[item.pk] = (item, MenuNode(item.pk, item.title, url, item.target_blank))
+        by_menu[item.menu_id].append(item.pk)
+
+    # Link parents and children once every node exists
+    children = {}
+    for item, node in nodes.values():
+        if item.parent_id in nodes:
+            object.__setattr__(node, 'parent', nodes[item.parent_id][1])
+            children.setdefault(item.parent_id, []).append(node)
+    for pk, child_nodes in children.items():
+        object.__setattr__(nodes[pk][1], 'children', ItemList(child_nodes))
+
+    trees = {}
+    for location, menu in menus.items():
+        menu_nodes = [nodes[pk][1] for pk in by_menu[menu.pk]]
+        roots = [node for node in menu_nodes if node.parent is None]
+        trees[location] = MenuTree(menu, menu_nodes, roots)
+
+    return MenuSet(trees, page_urls, category_urls)
+
+
+def get_cached_menus():
+    """Return the cached ``MenuSet`` for the current version, if any."""
+    return cache.get(MENUS_CACHE_KEY.format(version=get_version(MENUS_VERSION)))
+
+
+def get_menus():
+    """Return the ``MenuSet``, building and caching it if needed."""
+    key = MENUS_CACHE_KEY.format(version=get_version(MENUS_VERSION))
+    menus = cache.get(key)
+    if menus is None:
+        menus = build_menus()
+        cache.set(key, menus, CACHE_TIMEOUT)
+    return menus
+
+
+def invalidate_menus():
+    """
+    Force the next request to rebuild the menu trees, and purge the cached
+    pages showing them.
+    """
+    bump_version(MENUS_VERSION)
+    # The menu context processors record the menus as the pages' dependency
+    purge_tags(model_tag(Menu))
+
+
+def invalidate_for_page(page, deleted=False):
+    """Invalidate the menus if ``page`` changed a URL they were built with."""
+    menus = get_cached_menus()
+    if menus is None:
+        # Expired, but cached pages may still show the menus it held
+        invalidate_menus()
+        return
+    if page.pk in menus.page_urls:
+        if deleted or menus.page_urls[page.pk] != page.get_absolute_url():
+            invalidate_menus()
+            return
+    # A new homepage also moves the previous homepage off the home URL
+    if page.is_homepage and not deleted:
+        home_url = reverse('pages:home')
+        if any(url == home_url for pk, url in menus.page_urls.items() if pk != page.pk):
+            invalidate_menus()
+
+
+def invalidate_for_category(category, deleted=False):
+    """Invalidate the menus if ``category`` changed a URL they were built with."""
+    menus = get_cached_menus()
+    if menus is None:
+        # Expired, but cached pages may still show the menus it held
+        invalidate_menus()
+        return
+    if category.pk not in menus.category_urls:
+        return
+    if deleted or menus.category_urls[category.pk] != category.get_absolute_url():
+        invalidate_menus()
\ No newline at end of file
@@ -46,15 +46,13 @@ class NewsletterAdmin(admin.ModelAdmin):
     actions = ['send_newsletters', 'schedule_newsletters']
     
     def send_newsletters(self, request, queryset):
-        for newsletter in queryset:
-            newsletter.send()
+        queryset.send()
         self.message_user(request, _("Selected newsletters have been sent."))
     send_newsletters.short_description = _("Send selected newsletters")
     
     def schedule_newsletters(self, request, queryset):
         scheduled_time = timezone.now() + timezone.timedelta(hours=1)
-        for newsletter in queryset:
-            newsletter.schedule(scheduled_time)
+        queryset.schedule(scheduled_time)
         self.message_user(request, _("Selected newsletters have been scheduled."))
     schedule_newsletters.short_description = _("Schedule selected newsletters for 1 hour from now")
 
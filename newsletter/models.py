@@ -1,8 +1,9 @@
 from django.db import models
+from django.db.models.functions import Now
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
-from core.models import TimeStampedModel
+from core.models import TimeStampedModel, update_content
 
 
 class Subscriber(TimeStampedModel):
@@ -17,6 +18,9 @@ class Subscriber(TimeStampedModel):
         verbose_name = _("Subscriber")
         verbose_name_plural = _("Subscribers")
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['confirmation_token'], name='newsletter_sub_token_idx'),
+        ]
     
     def __str__(self):
         return self.email
@@ -29,6 +33,32 @@ class Subscriber(TimeStampedModel):
         self.save()
 
 
+class NewsletterQuerySet(models.QuerySet):
+    """
+    QuerySet for newsletters.
+    """
+    
+    def due(self):
+        """Scheduled newsletters whose sending time has come."""
+        return self.filter(status=Newsletter.STATUS_SCHEDULED, scheduled_at__lte=Now())
+    
+    def send(self):
+        """Send the newsletters not sent yet; returns their pks."""
+        return update_content(
+            self.exclude(status=Newsletter.STATUS_SENT),
+            status=Newsletter.STATUS_SENT,
+            sent_at=timezone.now(),
+        )
+    
+    def schedule(self, scheduled_time):
+        """Schedule the newsletters not sent yet; returns their pks."""
+        return update_content(
+            self.exclude(status=Newsletter.STATUS_SENT),
+            status=Newsletter.STATUS_SCHEDULED,
+            scheduled_at=scheduled_time,
+        )
+
+
 class Newsletter(TimeStampedModel):
     """Model for newsletters."""
     STATUS_DRAFT = 'draft'
@@ -53,10 +83,15 @@ class Newsletter(TimeStampedModel):
     scheduled_at = models.DateTimeField(_("Scheduled at"), null=True, blank=True)
     sent_at = models.DateTimeField(_("Sent at"), null=True, blank=True)
     
+    objects = NewsletterQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _("Newsletter")
         verbose_name_plural = _("Newsletters")
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'scheduled_at'], name='newsletter_status_sched_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -5,7 +5,7 @@ from .models import Page, PageTemplate
 
 
 class PageAdmin(admin.ModelAdmin):
-    list_display = ('title', 'slug', 'status', 'template', 'parent', 'is_homepage', 'created_at', 'published_at', 'get_tags')
+    list_display = ('title', 'slug', 'status', 'template', 'parent', 'is_homepage', 'view_count', 'created_at', 'published_at', 'get_tags')
     list_filter = ('status', 'template', 'is_homepage', 'tags')
     search_fields = ('title', 'content', 'excerpt', 'tags__name')
     
@@ -38,20 +38,17 @@ class PageAdmin(admin.ModelAdmin):
     actions = ['publish_pages', 'archive_pages', 'draft_pages']
     
     def publish_pages(self, request, queryset):
-        for page in queryset:
-            page.publish()
+        queryset.publish()
         self.message_user(request, _("Selected pages have been published."))
     publish_pages.short_description = _("Publish selected pages")
     
     def archive_pages(self, request, queryset):
-        for page in queryset:
-            page.archive()
+        queryset.archive()
         self.message_user(request, _("Selected pages have been archived."))
     archive_pages.short_description = _("Archive selected pages")
     
     def draft_pages(self, request, queryset):
-        for page in queryset:
-            page.draft()
+        queryset.draft()
         self.message_user(request, _("Selected pages have been set to draft."))
     draft_pages.short_description = _("Set selected pages to draft")
 
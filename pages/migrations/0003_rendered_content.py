@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0002_page_approved_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='render_version',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0, editable=False, verbose_name='Render version'),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='rendered_content',
+            field=models.TextField(blank=True, editable=False, verbose_name='Rendered content'),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Table of contents'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 12:19
+
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Now
+
+
+def normalize_publication_dates(apps, schema_editor):
+    # Published rows now need a date, and a future one means scheduled
+    Model = apps.get_model('pages', 'Page')
+    Model.objects.filter(status='published', published_at__isnull=True).update(published_at=F('created_at'))
+    Model.objects.filter(status='published', published_at__gt=Now()).update(status='scheduled')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('pages', '0003_rendered_content'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='page',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('scheduled', 'Scheduled'), ('published', 'Published'), ('archived', 'Archived')], default='draft', max_length=20, verbose_name='Status'),
+        ),
+        migrations.AddIndex(
+            model_name='page',
+            index=models.Index(fields=['status', 'published_at'], name='pages_page_status_pub_idx'),
+        ),
+        migrations.RunPython(normalize_publication_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='trending_score',
+            field=models.FloatField(db_index=True, default=0, editable=False, verbose_name='Trending score'),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Views'),
+        ),
+    ]
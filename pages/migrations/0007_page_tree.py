@@ -0,0 +1,69 @@
+# Generated by Django 5.2 on 2026-10-18 12:32
+
+import django.db.models.deletion
+import mptt.fields
+from django.db import migrations, models
+
+
+def build_tree(apps, schema_editor):
+    # The nested-set columns from ``parent``, siblings in order/title order
+    Model = apps.get_model('pages', 'Page')
+    children = {}
+    for pk, parent_id in Model.objects.order_by('order', 'title').values_list('pk', 'parent_id'):
+        children.setdefault(parent_id, []).append(pk)
+
+    def walk(pk, tree_id, lft, level):
+        rght = lft + 1
+        for child in children.get(pk, ()):
+            rght = walk(child, tree_id, rght, level + 1) + 1
+        Model.objects.filter(pk=pk).update(tree_id=tree_id, lft=lft, rght=rght, level=level)
+        return rght
+
+    for tree_id, pk in enumerate(children.get(None, ()), 1):
+        walk(pk, tree_id, 1, 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0002_category_tree'),
+        ('pages', '0006_view_counts'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='level',
+            field=models.PositiveIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='lft',
+            field=models.PositiveIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='rght',
+            field=models.PositiveIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='tree_id',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='page',
+            name='parent',
+            field=mptt.fields.TreeForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='pages.page'),
+        ),
+        migrations.AddIndex(
+            model_name='page',
+            index=models.Index(fields=['tree_id', 'lft'], name='pages_page_tree_idx'),
+        ),
+        migrations.RunPython(build_tree, migrations.RunPython.noop),
+    ]
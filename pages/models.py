@@ -1,14 +1,24 @@
+from django.core.cache import cache
 from django.db import models
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 from django.utils.text import slugify
 from taggit.managers import TaggableManager
 from ckeditor.fields import RichTextField
+from mptt.models import MPTTModel, TreeForeignKey
 
-from core.models import PublishableModel, SEOModel
+from core.models import PublishableModel, PublishableQuerySet, SEOModel, CommentCountModel, ViewCountModel, RenderedContentModel
+from core.cache import CACHE_TIMEOUT, get_version
+from core.page_cache import TAG_VERSION, model_tag
 from categories.models import Category
 
 
+# The pk of the homepage, under the version of the page lists: any page
+# saved, deleted or changed in bulk may change which one it is
+HOMEPAGE_CACHE_KEY = 'pages:homepage:{version}'
+
+
 class PageTemplate(models.Model):
     """Model for page templates."""
     TEMPLATE_DEFAULT = 'default'
@@ -41,8 +51,55 @@ class PageTemplate(models.Model):
         return self.name
 
 
-class Page(PublishableModel, SEOModel):
-    """Model for pages."""
+class PageQuerySet(PublishableQuerySet):
+    """
+    QuerySet for pages, with the loading plans the templates need.
+    """
+    # Everything a page card shows; lists never need the content
+    CARD_FIELDS = (
+        'title', 'slug', 'excerpt', 'featured_image', 'status', 'published_at',
+        'created_at', 'updated_at', 'is_homepage', 'approved_comment_count',
+    )
+    
+    def for_cards(self):
+        """Tags in one extra query, without the content."""
+        return self.prefetch_related('tags').only(*self.CARD_FIELDS)
+    
+    def for_detail(self):
+        """The page with its template and tags."""
+        return self.select_related('template').prefetch_related('tags')
+    
+    def homepage(self):
+        """
+        The published page marked as the homepage or, failing that, the
+        earliest published page. Raises ``Page.DoesNotExist`` if there's none.
+        
+        Which page that is gets cached, so usually only the page itself is
+        queried for.
+        """
+        published = self.published()
+        key = HOMEPAGE_CACHE_KEY.format(version=get_version(TAG_VERSION.format(tag=model_tag(self.model))))
+        pk = cache.get(key)
+        if pk is not None:
+            try:
+                return published.get(pk=pk)
+            except self.model.DoesNotExist:
+                pass
+        try:
+            page = published.get(is_homepage=True)
+        except self.model.DoesNotExist:
+            page = published.earliest('created_at')
+        cache.set(key, page.pk, CACHE_TIMEOUT)
+        return page
+
+
+class Page(MPTTModel, PublishableModel, SEOModel, CommentCountModel, ViewCountModel, RenderedContentModel):
+    """
+    Model for pages.
+    
+    Pages nest under their ``parent`` in a django-mptt tree, so breadcrumbs
+    and subpage lists are single range queries.
+    """
     title = models.CharField(_("Title"), max_length=200)
     slug = models.SlugField(_("Slug"), max_length=200, unique=True)
     content = RichTextField(_("Content"))
@@ -56,7 +113,7 @@ class Page(PublishableModel, SEOModel):
         blank=True,
         related_name='pages'
     )
-    parent = models.ForeignKey(
+    parent = TreeForeignKey(
         'self',
         on_delete=models.SET_NULL,
         null=True,
@@ -72,10 +129,25 @@ class Page(PublishableModel, SEOModel):
     order = models.IntegerField(_("Order"), default=0)
     is_homepage = models.BooleanField(_("Is Homepage"), default=False)
     
+    objects = PageQuerySet.as_manager()
+    
+    class MPTTMeta:
+        order_insertion_by = ['order', 'title']
+    
     class Meta:
         verbose_name = _("Page")
         verbose_name_plural = _("Pages")
         ordering = ['order', 'title']
+        indexes = [
+            models.Index(fields=['status', 'published_at'], name='pages_page_status_pub_idx'),
+            models.Index(fields=['is_homepage', 'status'], name='pages_page_homepage_idx'),
+            models.Index(fields=['tree_id', 'lft'], name='pages_page_tree_idx'),
+            models.Index(
+                fields=['-published_at'],
+                name='pages_page_published_idx',
+                condition=Q(status=PublishableModel.STATUS_PUBLISHED),
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -95,6 +167,14 @@ class Page(PublishableModel, SEOModel):
             return reverse('pages:home')
         return reverse('pages:page_detail', kwargs={'slug': self.slug})
     
+    def get_published_ancestors(self):
+        """The published pages above this one, root first, in one query."""
+        if self.parent_id is None:
+            return Page.objects.none()
+        return Page.objects.published().filter(
+            tree_id=self.tree_id, lft__lt=self.lft, rght__gt=self.rght
+        ).order_by('lft').only('title', 'slug', 'is_homepage')
+    
     @property
     def template_name(self):
         """Return the template file name."""
@@ -8,7 +8,7 @@ class PageSitemap(Sitemap):
     priority = 0.8
 
     def items(self):
-        return Page.objects.filter(status=Page.STATUS_PUBLISHED)
+        return Page.objects.published()
 
     def lastmod(self, obj):
         return obj.updated_at
@@ -1,5 +1,6 @@
 from django import template
 from pages.models import Page
+from core.page_cache import record_dependency
 
 register = template.Library()
 
@@ -7,14 +8,15 @@ register = template.Library()
 @register.simple_tag
 def get_recent_pages(count=5):
     """Return the most recent published pages."""
-    return Page.objects.filter(status=Page.STATUS_PUBLISHED).order_by('-published_at')[:count]
+    record_dependency(Page)
+    return Page.objects.published().for_cards().order_by('-published_at')[:count]
 
 
 @register.simple_tag
 def get_pages_by_template(template_slug, count=None):
     """Return pages with the specified template."""
-    pages = Page.objects.filter(
-        status=Page.STATUS_PUBLISHED,
+    record_dependency(Page)
+    pages = Page.objects.published().for_cards().filter(
         template__slug=template_slug
     ).order_by('-published_at')
     
@@ -38,6 +40,7 @@ def show_popular_tags(count=10):
     from django.db.models import Count
     from taggit.models import Tag
     
+    record_dependency('blog.post', Page)
     tags = Tag.objects.annotate(
         num_pages=Count('taggit_taggeditem_items')
     ).order_by('-num_pages')[:count]
@@ -4,46 +4,52 @@ from django.http import Http404
 from taggit.models import Tag
 
 from .models import Page
+from core.cache import MemoizedObjectMixin
+from core.conditional import ConditionalGetMixin
+from core.page_cache import PageCacheMixin
+from core.pagination import CursorPaginationMixin
+from core.view_counts import ViewCountMixin
 
 
-class HomePageView(DetailView):
+class HomePageView(MemoizedObjectMixin, ConditionalGetMixin, PageCacheMixin, DetailView):
     """View for the homepage."""
     model = Page
+    page_cache_models = (Page,)
     context_object_name = 'page'
     
+    def get_queryset(self):
+        return Page.objects.for_detail()
+    
     def get_object(self, queryset=None):
         """Get the homepage object."""
+        if queryset is None:
+            # Memoized; comes back here with get_queryset()
+            return super().get_object()
         try:
-            return Page.objects.get(is_homepage=True, status=Page.STATUS_PUBLISHED)
+            return queryset.homepage()
         except Page.DoesNotExist:
-            # If no homepage is set, get the first published page
-            try:
-                return Page.objects.filter(status=Page.STATUS_PUBLISHED).earliest('created_at')
-            except Page.DoesNotExist:
-                raise Http404("No published pages found")
+            raise Http404("No published pages found")
     
     def get_template_names(self):
         """Return the template name to use."""
-        page = self.get_object()
-        return [page.template_name]
+        return [self.object.template_name]
 
 
-class PageDetailView(DetailView):
+class PageDetailView(ViewCountMixin, MemoizedObjectMixin, ConditionalGetMixin, PageCacheMixin, DetailView):
     """View for page detail."""
     model = Page
     context_object_name = 'page'
     
     def get_queryset(self):
         """Return only published pages."""
-        return Page.objects.filter(status=Page.STATUS_PUBLISHED)
+        return Page.objects.published().for_detail()
     
     def get_template_names(self):
         """Return the template name to use."""
-        page = self.get_object()
-        return [page.template_name]
+        return [self.object.template_name]
 
 
-class PageListView(ListView):
+class PageListView(ConditionalGetMixin, PageCacheMixin, CursorPaginationMixin, ListView):
     """View for listing pages."""
     model = Page
     context_object_name = 'pages'
@@ -52,10 +58,10 @@ class PageListView(ListView):
     
     def get_queryset(self):
         """Return only published pages."""
-        return Page.objects.filter(status=Page.STATUS_PUBLISHED).order_by('-published_at')
+        return Page.objects.published().for_cards().order_by('-published_at')
 
 
-class TagDetailView(ListView):
+class TagDetailView(ConditionalGetMixin, PageCacheMixin, CursorPaginationMixin, ListView):
     """View for tag detail."""
     model = Page
     context_object_name = 'pages'
@@ -65,8 +71,7 @@ class TagDetailView(ListView):
     def get_queryset(self):
         """Return published pages with the given tag."""
         self.tag = get_object_or_404(Tag, slug=self.kwargs['slug'])
-        return Page.objects.filter(
-            status=Page.STATUS_PUBLISHED,
+        return Page.objects.published().for_cards().filter(
             tags__slug=self.tag.slug
         ).order_by('-published_at')
     
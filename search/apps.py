@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
 
 
 class SearchConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'search'
\ No newline at end of file
+    name = 'search'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # A backend that rebuilds its whole index on commit would do so in
+        # every save made without the queue
+        path = getattr(settings, 'SEARCH_BACKEND', None)
+        if path and not import_string(path).incremental and not getattr(settings, 'SEARCH_QUEUE_UPDATES', False):
+            raise ImproperlyConfigured(
+                f"SEARCH_BACKEND {path!r} rebuilds its index in batches; "
+                "set SEARCH_QUEUE_UPDATES and run the scheduler to use it."
+            )
\ No newline at end of file
@@ -0,0 +1,342 @@
+"""
+Full-text search backends.
+
+A backend finds and ranks ``SearchDocument`` rows, and counts and slices
+the hits in the database: a page of results, with everything it shows, is
+one query however many documents match. Documents are weighted by field: a match in the title
+counts most, then the summary (excerpts and meta fields), then the body.
+
+- ``SQLiteBackend`` keeps an FTS5 table alongside the documents, stemmed
+  by the Porter tokenizer, and ranks with BM25.
+- ``PostgresBackend`` searches a weighted, stemmed ``tsvector`` column
+  generated from the documents and indexed with GIN, ranked by ``ts_rank``.
+- ``DatabaseBackend`` is the fallback for any other database, or SQLite
+  built without FTS5: ``icontains`` over the documents.
+- ``search.engine.EngineBackend`` searches an inverted index file of its
+  own, memory-mapped, without any database full-text search.
+
+``SEARCH_BACKEND`` may name a backend class; by default the database's own
+is used.
+"""
+import functools
+import re
+from collections import namedtuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils.module_loading import import_string
+
+from .models import SearchDocument
+
+
+# The FTS5 table, and its columns' BM25 weights
+FTS_TABLE = 'search_document_fts'
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+
+# The text search configuration the tsvector column is generated with
+POSTGRES_CONFIG = 'english'
+
+# Document fields only searched, never shown, so results don't load them
+INDEXED_FIELDS = ('summary', 'body')
+
+DEFAULT_BACKENDS = {
+    'sqlite': 'search.backends.SQLiteBackend',
+    'postgresql': 'search.backends.PostgresBackend',
+}
+
+# Kinds of documents filed in categories, and their models
+CATEGORIZED_KINDS = {SearchDocument.KIND_POST: 'blog.Post', SearchDocument.KIND_PAGE: 'pages.Page'}
+
+# What to search for, and in which documents: those of ``kinds`` (any if
+# empty), only published ones if ``published``, only those filed in the
+# category with the pk ``category`` if given
+Query = namedtuple('Query', ('text', 'kinds', 'published', 'category'))
+
+_TERM_RE = re.compile(r'"([^"]*)"|(\w+)')
+
+
+def parse_query(text):
+    """The words and ``"quoted phrases"`` of ``text``, lowercased."""
+    terms = []
+    for phrase, word in _TERM_RE.findall(text.lower()):
+        term = ' '.join(re.findall(r'\w+', phrase)) if phrase else word
+        if term:
+            terms.append(term)
+    return terms
+
+
+class SearchResults:
+    """
+    The hits of a query, best first; counting and slicing query the
+    backend, so it can be handed to a ``Paginator`` as it is.
+    """
+
+    def __init__(self, backend, query):
+        self.backend = backend
+        self.query = query
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.query)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                raise ValueError("Search results can't be sliced with a step.")
+            start = key.start or 0
+            stop = self.count() if key.stop is None else key.stop
+            if start < 0 or stop < 0:
+                raise ValueError("Search results can't be negatively indexed.")
+            if stop <= start:
+                return []
+            return self.backend.fetch(self.query, start, stop - start)
+        hits = self[key:key + 1]
+        if not hits:
+            raise IndexError(key)
+        return hits[0]
+
+
+class SearchBackend:
+    """Searches ``SearchDocument`` rows; subclasses do it for a database."""
+
+    # False where commit() rebuilds the whole index, which is only done by
+    # the scheduler, with SEARCH_QUEUE_UPDATES, rather than on every save
+    incremental = True
+
+    def search(self, text, kinds=(), published=True, category=None):
+        """
+        The documents matching ``text`` as ``SearchResults``: of ``kinds``
+        only, if given, only published ones unless ``published`` is false,
+        and only those filed in the category with the pk ``category``.
+        """
+        return SearchResults(self, Query(text, tuple(kinds), published, category))
+
+    def count(self, query):
+        """The number of documents matching the ``Query``."""
+        raise NotImplementedError
+
+    def fetch(self, query, offset, limit):
+        """
+        Up to ``limit`` documents matching the ``Query``, best first,
+        skipping the ``offset`` best; each has its ``rank``, higher being
+        better.
+        """
+        raise NotImplementedError
+
+    def update(self, pks):
+        """Index the new or changed documents ``pks``."""
+
+    def remove(self, pks):
+        """Drop the documents ``pks``, about to be deleted, from the index."""
+
+    def rebuild(self):
+        """Index every document again."""
+
+    def commit(self):
+        """Finish a batch of updates and removals."""
+
+
+def categorized():
+    """``(kind, through model, content column)`` for each kind of content filed in categories."""
+    for kind, label in CATEGORIZED_KINDS.items():
+        model = apps.get_model(label)
+        yield kind, model.categories.through, f'{model._meta.model_name}_id'
+
+
+class DatabaseBackend(SearchBackend):
+    """Case-insensitive substring search, for databases without full-text search."""
+    # Points for a term found in each field
+    FIELD_WEIGHTS = (('title', 3), ('summary', 2), ('body', 1))
+
+    def get_queryset(self, query):
+        terms = parse_query(query.text)
+        if not terms:
+            return SearchDocument.objects.none()
+        queryset = SearchDocument.objects.all()
+        if query.kinds:
+            queryset = queryset.filter(kind__in=query.kinds)
+        if query.published:
+            queryset = queryset.filter(is_published=True)
+        if query.category is not None:
+            queryset = queryset.filter(functools.reduce(Q.__or__, (
+                Q(kind=kind, object_id__in=through.objects.filter(category_id=query.category).values(column))
+                for kind, through, column in categorized()
+            )))
+        rank = Value(0)
+        for term in terms:
+            queryset = queryset.filter(
+                functools.reduce(Q.__or__, (Q(**{f'{field}__icontains': term}) for field, _ in self.FIELD_WEIGHTS))
+            )
+            for field, weight in self.FIELD_WEIGHTS:
+                rank += Case(
+                    When(**{f'{field}__icontains': term}, then=Value(weight)),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+        return queryset.annotate(rank=rank)
+
+    def count(self, query):
+        return self.get_queryset(query).count()
+
+    def fetch(self, query, offset, limit):
+        queryset = self.get_queryset(query).defer(*INDEXED_FIELDS).order_by('-rank', 'pk')
+        return list(queryset[offset:offset + limit])
+
+
+def _document_columns(alias):
+    """The columns a result shows, leaving out the indexed text."""
+    quote = connection.ops.quote_name
+    return ', '.join(
+        f'{alias}.{quote(field.column)}' for field in SearchDocument._meta.concrete_fields
+        if field.name not in INDEXED_FIELDS
+    )
+
+
+def _filters(query, alias):
+    """SQL conditions on the documents, aliased ``alias``, for the ``Query``'s filters."""
+    sql, params = [], []
+    if query.kinds:
+        sql.append(f"{alias}.kind IN ({', '.join(['%s'] * len(query.kinds))})")
+        params.extend(query.kinds)
+    if query.published:
+        sql.append(f'{alias}.is_published = %s')
+        params.append(True)
+    if query.category is not None:
+        quote = connection.ops.quote_name
+        conditions = []
+        for kind, through, column in categorized():
+            conditions.append(
+                f'({alias}.kind = %s AND {alias}.object_id IN '
+                f'(SELECT {quote(column)} FROM {quote(through._meta.db_table)} WHERE category_id = %s))'
+            )
+            params.extend([kind, query.category])
+        sql.append(f"({' OR '.join(conditions)})")
+    return ''.join(f' AND {condition}' for condition in sql), params
+
+
+def _chunks(pks, size=500):
+    pks = list(pks)
+    for i in range(0, len(pks), size):
+        yield pks[i:i + size]
+
+
+class SQLiteBackend(SearchBackend):
+    """SQLite FTS5, ranked with BM25."""
+
+    def match(self, text):
+        """``text`` as an FTS5 query: every word and phrase, each quoted."""
+        return ' '.join('"{}"'.format(term.replace('"', '""')) for term in parse_query(text))
+
+    def count(self, query):
+        match = self.match(query.text)
+        if not match:
+            return 0
+        filters, params = _filters(query, 'd')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} '
+                f'INNER JOIN {SearchDocument._meta.db_table} d ON d.id = {FTS_TABLE}.rowid '
+                f'WHERE {FTS_TABLE} MATCH %s{filters}',
+                [match, *params],
+            )
+            return cursor.fetchone()[0]
+
+    def fetch(self, query, offset, limit):
+        match = self.match(query.text)
+        if not match:
+            return []
+        filters, params = _filters(query, 'd')
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        # bm25() is lower for better matches
+        return list(SearchDocument.objects.raw(
+            f'SELECT {_document_columns("d")}, -bm25({FTS_TABLE}, {weights}) AS rank '
+            f'FROM {FTS_TABLE} INNER JOIN {SearchDocument._meta.db_table} d ON d.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s{filters} '
+            f'ORDER BY rank DESC, d.id LIMIT %s OFFSET %s',
+            [match, *params, limit, offset],
+        ))
+
+    def update(self, pks):
+        table = SearchDocument._meta.db_table
+        with connection.cursor() as cursor:
+            for chunk in _chunks(pks):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', chunk)
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, title, summary, body) '
+                    f'SELECT id, title, summary, body FROM {table} WHERE id IN ({placeholders})',
+                    chunk,
+                )
+
+    def remove(self, pks):
+        with connection.cursor() as cursor:
+            for chunk in _chunks(pks):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', chunk)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, summary, body) '
+                f'SELECT id, title, summary, body FROM {SearchDocument._meta.db_table}'
+            )
+
+
+class PostgresBackend(SearchBackend):
+    """
+    PostgreSQL full-text search, ranked with ``ts_rank``.
+    
+    The ``search_vector`` column is generated by the database, so writing
+    the documents is all the indexing there is.
+    """
+
+    def count(self, query):
+        filters, params = _filters(query, 'd')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {SearchDocument._meta.db_table} d '
+                f'WHERE d.search_vector @@ websearch_to_tsquery(%s::regconfig, %s){filters}',
+                [POSTGRES_CONFIG, query.text, *params],
+            )
+            return cursor.fetchone()[0]
+
+    def fetch(self, query, offset, limit):
+        filters, params = _filters(query, 'd')
+        # Normalization 1 divides the rank by the log of the length, so long
+        # bodies don't win by mentioning the words more often
+        return list(SearchDocument.objects.raw(
+            f'SELECT {_document_columns("d")}, ts_rank(d.search_vector, query, 1) AS rank '
+            f'FROM {SearchDocument._meta.db_table} d, websearch_to_tsquery(%s::regconfig, %s) query '
+            f'WHERE d.search_vector @@ query{filters} '
+            f'ORDER BY rank DESC, d.id LIMIT %s OFFSET %s',
+            [POSTGRES_CONFIG, query.text, *params, limit, offset],
+        ))
+
+
+@functools.cache
+def load_backend(path):
+    return import_string(path)()
+
+
+@functools.cache
+def has_fts_table():
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+def get_backend(path=None):
+    """The backend ``path`` names, else ``SEARCH_BACKEND``'s or, by default, the database's."""
+    path = path or getattr(settings, 'SEARCH_BACKEND', None)
+    if not path:
+        path = DEFAULT_BACKENDS.get(connection.vendor, 'search.backends.DatabaseBackend')
+        if connection.vendor == 'sqlite' and not has_fts_table():
+            # SQLite built without FTS5
+            path = 'search.backends.DatabaseBackend'
+    return load_backend(path)
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+What gets searched, and the ``SearchDocument`` rows it's searched through.
+
+Every post, page, category and media item has one document, holding its
+text split by weight and what a result shows of it. Drafts have one too,
+marked unpublished, so publishing only flips the flag. ``update_index``
+brings the documents of some objects up to date and has the backend
+reindex them; ``search.queue`` calls it for the objects saved since its
+last run. ``rebuild_index`` rewrites the documents of whole models, in
+batches spread over several processes.
+"""
+import multiprocessing
+import time
+from html import unescape
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from core.models import PublishableModel
+from .backends import get_backend
+from .models import SearchDocument
+
+
+SEARCH_MODELS = ('blog.Post', 'pages.Page', 'categories.Category', 'media_library.MediaItem')
+
+# Kinds of documents anyone may find; media items are only listed to
+# signed-in users, like the media library itself
+PUBLIC_KINDS = (SearchDocument.KIND_POST, SearchDocument.KIND_PAGE, SearchDocument.KIND_CATEGORY)
+
+SNIPPET_WORDS = 30
+
+
+def html_text(html):
+    """The plain text of ``html``."""
+    return unescape(strip_tags(html or ''))
+
+
+def join_text(*texts):
+    return ' '.join(text for text in texts if text)
+
+
+def make_snippet(*texts):
+    """The first of ``texts`` that isn't empty, cut to ``SNIPPET_WORDS`` words."""
+    for text in texts:
+        if text and text.strip():
+            return Truncator(text.strip()).words(SNIPPET_WORDS)
+    return ''
+
+
+def is_published(obj, now=None):
+    """Whether the ``PublishableModel`` ``obj`` is on the site."""
+    return (
+        obj.status == PublishableModel.STATUS_PUBLISHED
+        and obj.published_at is not None
+        and obj.published_at <= (now or timezone.now())
+    )
+
+
+def names(related):
+    """The names of the prefetched ``related`` objects, as one string."""
+    return ' '.join(str(obj) for obj in related.all())
+
+
+def post_document(post):
+    body = html_text(post.rendered_content)
+    return {
+        'kind': SearchDocument.KIND_POST,
+        'title': post.title,
+        'summary': join_text(
+            post.excerpt, post.meta_title, post.meta_description, post.meta_keywords,
+            names(post.categories), names(post.tags),
+        ),
+        'body': body,
+        'url': post.get_absolute_url(),
+        'snippet': make_snippet(post.excerpt, body),
+        'is_published': is_published(post),
+        'published_at': post.published_at,
+    }
+
+
+def page_document(page):
+    body = html_text(page.rendered_content)
+    return {
+        'kind': SearchDocument.KIND_PAGE,
+        'title': page.title,
+        'summary': join_text(
+            page.excerpt, page.meta_title, page.meta_description, page.meta_keywords,
+            names(page.categories), names(page.tags),
+        ),
+        'body': body,
+        'url': page.get_absolute_url(),
+        'snippet': make_snippet(page.excerpt, body),
+        'is_published': is_published(page),
+        'published_at': page.published_at,
+    }
+
+
+def category_document(category):
+    body = html_text(category.description)
+    return {
+        'kind': SearchDocument.KIND_CATEGORY,
+        'title': category.name,
+        'summary': join_text(category.meta_title, category.meta_description, category.meta_keywords),
+        'body': body,
+        'url': category.get_absolute_url(),
+        'snippet': make_snippet(category.meta_description, body),
+        'is_published': True,
+        'published_at': None,
+    }
+
+
+def media_document(item):
+    return {
+        'kind': SearchDocument.KIND_MEDIA,
+        'title': item.title,
+        'summary': join_text(item.alt_text, names(item.categories)),
+        'body': item.description,
+        'url': reverse('media_library:media_detail', kwargs={'slug': item.slug}),
+        'snippet': make_snippet(item.description, item.alt_text),
+        'is_published': True,
+        'published_at': item.created_at,
+    }
+
+
+DOCUMENT_FIELDS = {
+    'blog.Post': post_document,
+    'pages.Page': page_document,
+    'categories.Category': category_document,
+    'media_library.MediaItem': media_document,
+}
+
+# What the documents of each model name, loaded with the objects
+DOCUMENT_RELATIONS = {
+    'blog.Post': ('categories', 'tags'),
+    'pages.Page': ('categories', 'tags'),
+    'media_library.MediaItem': ('categories',),
+}
+
+
+def get_objects(model):
+    """``model``'s objects, with what their documents need."""
+    return model._default_manager.prefetch_related(*DOCUMENT_RELATIONS.get(model._meta.label, ()))
+
+
+def build_documents(model, objects):
+    """Unsaved ``SearchDocument`` rows for ``objects`` of ``model``."""
+    content_type = ContentType.objects.get_for_model(model)
+    fields = DOCUMENT_FIELDS[model._meta.label]
+    return [
+        SearchDocument(content_type=content_type, object_id=obj.pk, **fields(obj))
+        for obj in objects
+    ]
+
+
+def update_index(model, pks):
+    """
+    Bring the documents of ``model``'s objects ``pks`` up to date: replace
+    those of the objects still there, drop those of the ones that are gone,
+    and have the backend reindex them. Returns the number of documents
+    written.
+    """
+    pks = set(pks)
+    if not pks or model._meta.label not in DOCUMENT_FIELDS:
+        return 0
+    content_type = ContentType.objects.get_for_model(model)
+    documents = build_documents(model, get_objects(model).filter(pk__in=pks))
+    backend = get_backend()
+
+    with transaction.atomic():
+        stale = SearchDocument.objects.filter(content_type=content_type, object_id__in=pks)
+        backend.remove(list(stale.values_list('pk', flat=True)))
+        stale.delete()
+        if documents:
+            SearchDocument.objects.bulk_create(documents)
+            backend.update(list(
+                SearchDocument.objects.filter(content_type=content_type, object_id__in=pks)
+                .values_list('pk', flat=True)
+            ))
+    return len(documents)
+
+
+def pk_ranges(model, chunk_size):
+    """
+    Split ``model``'s pks into ``(first, last)`` ranges of ``chunk_size``
+    objects, reading the pks a chunk at a time. The ranges cover every
+    possible pk, so the first starts and the last ends at ``None``.
+    """
+    ranges = []
+    first, count = None, 0
+    pks = model._default_manager.order_by('pk').values_list('pk', flat=True)
+    for pk in pks.iterator(chunk_size=chunk_size):
+        count += 1
+        if count == chunk_size:
+            ranges.append((first, pk))
+            first, count = pk + 1, 0
+    ranges.append((first, None))
+    return ranges
+
+
+def in_range(first, last, field='pk'):
+    bounds = {}
+    if first is not None:
+        bounds[f'{field}__gte'] = first
+    if last is not None:
+        bounds[f'{field}__lte'] = last
+    return bounds
+
+
+def _init_worker():
+    import django
+
+    if not apps.ready:
+        django.setup()
+
+
+def _build_range(task):
+    """Build the documents of a pk range; runs in the workers."""
+    label, first, last = task
+    model = apps.get_model(label)
+    fields = DOCUMENT_FIELDS[label]
+    objects = get_objects(model).filter(**in_range(first, last)).order_by('pk')
+    return task, [(obj.pk, fields(obj)) for obj in objects]
+
+
+def store_range(model, first, last, rows):
+    """Replace the documents of ``model``'s pk range with those built, ``rows``."""
+    content_type = ContentType.objects.get_for_model(model)
+    backend = get_backend()
+    documents = [SearchDocument(content_type=content_type, object_id=pk, **fields) for pk, fields in rows]
+    in_documents = SearchDocument.objects.filter(content_type=content_type, **in_range(first, last, 'object_id'))
+    with transaction.atomic():
+        # Deleted objects' documents go too
+        backend.remove(list(in_documents.values_list('pk', flat=True)))
+        in_documents.delete()
+        SearchDocument.objects.bulk_create(documents, batch_size=500)
+        backend.update(list(in_documents.values_list('pk', flat=True)))
+
+
+def rebuild_index(models=SEARCH_MODELS, processes=None, chunk_size=500, progress=None):
+    """
+    Rewrite the documents of every object of ``models``, and their index.
+    
+    The objects are split into pk ranges of ``chunk_size``, each read with
+    a query and turned into documents in a pool of ``processes`` worker
+    processes (one per CPU by default, none when 1); each range's
+    documents are written, and indexed, in one transaction as they come,
+    so the search keeps working throughout. ``progress`` is called with
+    the label, objects done and seconds elapsed after each range.
+    
+    Returns ``{model label: (objects indexed, seconds)}``.
+    """
+    tasks = {label: [(label, first, last) for first, last in pk_ranges(apps.get_model(label), chunk_size)]
+             for label in models}
+    if processes == 1 or sum(len(ranges) for ranges in tasks.values()) <= len(tasks):
+        pool = None
+    else:
+        # Forked workers must open their own database connections
+        connections.close_all()
+        pool = multiprocessing.Pool(processes, _init_worker)
+
+    totals = {}
+    try:
+        for label, ranges in tasks.items():
+            model = apps.get_model(label)
+            started = time.monotonic()
+            count = 0
+            results = map(_build_range, ranges) if pool is None else pool.imap_unordered(_build_range, ranges)
+            for (_, first, last), rows in results:
+                store_range(model, first, last, rows)
+                count += len(rows)
+                if progress is not None:
+                    progress(label, count, time.monotonic() - started)
+            totals[label] = (count, time.monotonic() - started)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    get_backend().commit()
+    return totals
@@ -0,0 +1,423 @@
+"""
+A compact inverted index of the published documents, searched in-process.
+
+Where the database has no full-text search (SQLite built without FTS5),
+or on read-only replicas, search can run from an index file of its own:
+set ``SEARCH_BACKEND = 'search.engine.EngineBackend'``, the only switch,
+so the index searched is the one the scheduler and ``reindex`` build.
+It needs ``SEARCH_QUEUE_UPDATES``, see ``search.apps``.
+
+``build`` writes the file at ``SEARCH_INDEX_PATH`` from the published
+``SearchDocument`` rows. Every term has a postings list: for each
+document containing it, the term's frequency, weighted by field, and its
+positions, all delta-encoded as varints into one byte string. Documents,
+terms and offsets are plain arrays. Each process maps the file read-only,
+so every worker shares the one copy in the operating system's page cache.
+
+A rebuild writes a new file beside the old and renames it over it, which
+is atomic: searches ``stat`` the path and switch to the new file as soon
+as it's there, while those under way finish with the old one. Rebuilds
+happen after a batch of document updates, i.e. from the scheduler, which
+must share the file system with the web processes.
+
+Queries are the words and ``"quoted phrases"`` of the other backends, all
+required, ranked with BM25. Words are stemmed with Harman's S-stemmer,
+which only folds plurals.
+"""
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+
+from .backends import CATEGORIZED_KINDS, INDEXED_FIELDS, SearchBackend, parse_query
+from .models import SearchDocument
+
+
+MAGIC = b'DJCMSIDX'
+VERSION = 1
+
+# Term frequencies count a word this many times per field it's found in,
+# as the FTS5 backend's BM25 weights do
+FIELD_WEIGHTS = (('title', 10), ('summary', 4), ('body', 1))
+
+# Positions skipped between fields, so phrases don't span two
+POSITION_GAP = 100
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SECTIONS = (
+    'kinds',            # the kind names, comma separated
+    'doc_pks',          # q: SearchDocument pk of each document number
+    'doc_lengths',      # f: weighted length of each document
+    'doc_kinds',        # B: index into kinds of each document
+    'term_offsets',     # Q: start of each term in terms, and the end
+    'terms',            # the terms, UTF-8, sorted
+    'posting_offsets',  # Q: start of each term's postings, and the end
+    'doc_freqs',        # I: number of documents of each term
+    'postings',         # varints
+)
+
+HEADER = struct.Struct('<8sIcxxxIId' + 'QQ' * len(SECTIONS))
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def get_index_path():
+    """Where the index file is."""
+    return getattr(settings, 'SEARCH_INDEX_PATH', os.path.join(settings.BASE_DIR, 'search.idx'))
+
+
+def stem(word):
+    """Harman's S-stemmer: fold plurals to their singular."""
+    if len(word) > 3:
+        if word.endswith('ies') and not word.endswith(('eies', 'aies')):
+            return word[:-3] + 'y'
+        if word.endswith('es') and not word.endswith(('aes', 'ees', 'oes')):
+            return word[:-1]
+        if word.endswith('s') and not word.endswith(('us', 'ss')):
+            return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """The stemmed, lowercase words of ``text``."""
+    return [stem(word) for word in _WORD_RE.findall(text.lower())]
+
+
+def category_term(pk):
+    """The term standing for the category ``pk`` (no word contains a NUL)."""
+    return f'\x00{pk}'
+
+
+def encode_varints(numbers, out):
+    for number in numbers:
+        while number >= 0x80:
+            out.append((number & 0x7F) | 0x80)
+            number >>= 7
+        out.append(number)
+
+
+def decode_varints(data):
+    number = shift = 0
+    for byte in data:
+        number |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield number
+            number = shift = 0
+
+
+def encode_postings(flat, out):
+    """
+    Encode the postings of a term, ``flat`` as built by ``build``: document
+    number, frequency, number of positions and the positions, for each
+    document in order. Returns the number of documents.
+    """
+    count = previous = i = 0
+    while i < len(flat):
+        document, frequency, npositions = flat[i], flat[i + 1], flat[i + 2]
+        positions = flat[i + 3:i + 3 + npositions]
+        encode_varints((document - previous, frequency, npositions), out)
+        encode_varints((position - last for position, last in zip(positions, [0, *positions])), out)
+        previous = document
+        count += 1
+        i += 3 + npositions
+    return count
+
+
+def get_category_links():
+    """``{(kind, object_id): [category pks]}`` for the categorized content."""
+    links = {}
+    for kind, label in CATEGORIZED_KINDS.items():
+        model = apps.get_model(label)
+        rows = model.categories.through.objects.values_list(f'{model._meta.model_name}_id', 'category_id')
+        for object_id, category_id in rows.iterator(chunk_size=5000):
+            links.setdefault((kind, object_id), []).append(category_id)
+    return links
+
+
+def build(path=None, chunk_size=1000):
+    """Write the index of the published documents to ``path``; returns the number of documents."""
+    path = path or get_index_path()
+    kinds = [kind for kind, _ in SearchDocument.KIND_CHOICES]
+    kind_codes = {kind: code for code, kind in enumerate(kinds)}
+    category_links = get_category_links()
+
+    doc_pks = array('q')
+    doc_lengths = array('f')
+    doc_kinds = bytearray()
+    postings = {}
+    rows = SearchDocument.objects.filter(is_published=True).order_by('pk').values_list(
+        'pk', 'kind', 'object_id', *(field for field, _ in FIELD_WEIGHTS),
+    )
+    for document, (pk, kind, object_id, *texts) in enumerate(rows.iterator(chunk_size=chunk_size)):
+        positions = {}
+        frequencies = Counter()
+        start = length = 0
+        for (_, weight), text in zip(FIELD_WEIGHTS, texts):
+            tokens = tokenize(text)
+            for offset, token in enumerate(tokens, start):
+                positions.setdefault(token, []).append(offset)
+                frequencies[token] += weight
+            start += len(tokens) + POSITION_GAP
+            length += weight * len(tokens)
+        for token, token_positions in positions.items():
+            flat = postings.get(token)
+            if flat is None:
+                flat = postings[token] = array('I')
+            flat.extend((document, frequencies[token], len(token_positions)))
+            flat.extend(token_positions)
+        for category in category_links.get((kind, object_id), ()):
+            postings.setdefault(category_term(category), array('I')).extend((document, 1, 0))
+        doc_pks.append(pk)
+        doc_lengths.append(length)
+        doc_kinds.append(kind_codes[kind])
+
+    terms = sorted(postings, key=lambda term: term.encode('utf-8'))
+    term_offsets = array('Q', [0])
+    term_blob = bytearray()
+    posting_offsets = array('Q', [0])
+    doc_freqs = array('I')
+    posting_blob = bytearray()
+    for term in terms:
+        term_blob += term.encode('utf-8')
+        term_offsets.append(len(term_blob))
+        doc_freqs.append(encode_postings(postings.pop(term), posting_blob))
+        posting_offsets.append(len(posting_blob))
+
+    sections = {
+        'kinds': ','.join(kinds).encode('ascii'),
+        'doc_pks': doc_pks.tobytes(),
+        'doc_lengths': doc_lengths.tobytes(),
+        'doc_kinds': bytes(doc_kinds),
+        'term_offsets': term_offsets.tobytes(),
+        'terms': bytes(term_blob),
+        'posting_offsets': posting_offsets.tobytes(),
+        'doc_freqs': doc_freqs.tobytes(),
+        'postings': bytes(posting_blob),
+    }
+    average_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0
+    write_index(path, sections, len(doc_pks), len(terms), average_length)
+    return len(doc_pks)
+
+
+def write_index(path, sections, doc_count, term_count, average_length):
+    """Write the file next to ``path``, then move it over ``path`` in one step."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.search-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            bounds = []
+            offset = HEADER.size
+            for name in SECTIONS:
+                bounds.extend((offset, len(sections[name])))
+                offset += len(sections[name])
+            byteorder = b'<' if sys.byteorder == 'little' else b'>'
+            file.write(HEADER.pack(MAGIC, VERSION, byteorder, doc_count, term_count, average_length, *bounds))
+            for name in SECTIONS:
+                file.write(sections[name])
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class IndexFile:
+    """An index file, mapped read-only."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.stat = os.fstat(file.fileno())
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, byteorder, self.doc_count, self.term_count,
+         self.average_length, *bounds) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} isn't a search index of this version.")
+        if byteorder != (b'<' if sys.byteorder == 'little' else b'>'):
+            raise ValueError(f"{path} was built on a machine of another byte order.")
+
+        view = memoryview(self._mmap)
+        section = {
+            name: view[offset:offset + length]
+            for name, offset, length in zip(SECTIONS, bounds[::2], bounds[1::2])
+        }
+        self.kinds = bytes(section['kinds']).decode('ascii').split(',')
+        self.doc_pks = section['doc_pks'].cast('q')
+        self.doc_lengths = section['doc_lengths'].cast('f')
+        self.doc_kinds = section['doc_kinds']
+        self.term_offsets = section['term_offsets'].cast('Q')
+        self.terms = section['terms']
+        self.posting_offsets = section['posting_offsets'].cast('Q')
+        self.doc_freqs = section['doc_freqs'].cast('I')
+        self.postings = section['postings']
+
+    def is_current(self, stat):
+        """Whether this is still the file ``stat`` describes."""
+        return (self.stat.st_ino, self.stat.st_mtime_ns, self.stat.st_size) == (
+            stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def find(self, term):
+        """The number of ``term`` in the index, or ``None`` if it's in no document."""
+        target = term.encode('utf-8')
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            found = self.terms[self.term_offsets[middle]:self.term_offsets[middle + 1]].tobytes()
+            if found < target:
+                low = middle + 1
+            elif found > target:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def read_postings(self, number):
+        """``{document number: (frequency, positions)}`` of the term ``number``."""
+        numbers = decode_varints(self.postings[self.posting_offsets[number]:self.posting_offsets[number + 1]])
+        postings = {}
+        document = 0
+        for delta in numbers:
+            document += delta
+            frequency, npositions = next(numbers), next(numbers)
+            positions = []
+            position = 0
+            for _ in range(npositions):
+                position += next(numbers)
+                positions.append(position)
+            postings[document] = (frequency, positions)
+        return postings
+
+    def idf(self, number):
+        frequency = self.doc_freqs[number]
+        return math.log(1 + (self.doc_count - frequency + 0.5) / (frequency + 0.5))
+
+
+def has_phrase(postings, tokens, document):
+    """Whether ``tokens`` follow one another somewhere in ``document``."""
+    following = [set(postings[token][document][1]) for token in tokens[1:]]
+    return any(
+        all(start + i in positions for i, positions in enumerate(following, 1))
+        for start in postings[tokens[0]][document][1]
+    )
+
+
+class EngineBackend(SearchBackend):
+    """
+    Searches the index file; updates only mark it for a rebuild at the next
+    ``commit``. Only published documents are in the index, whatever the
+    query's ``published``.
+    """
+    incremental = False
+
+    def __init__(self, path=None):
+        self.path = path or get_index_path()
+        self._index = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stale = False
+
+    def get_index(self):
+        """The current ``IndexFile``, or ``None`` if it hasn't been built."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        index = self._index
+        if index is None or not index.is_current(stat):
+            with self._lock:
+                index = self._index
+                if index is None or not index.is_current(stat):
+                    index = self._index = IndexFile(self.path)
+        return index
+
+    def rank(self, query):
+        """``[(SearchDocument pk, score)]`` of the documents matching the ``Query``, best first."""
+        index = self.get_index()
+        if index is None:
+            return []
+        # Counting, then fetching, the same results ranks them once
+        key = (index, query)
+        cached = getattr(self._local, 'ranked', None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        groups = [tokens for tokens in map(tokenize, parse_query(query.text)) if tokens]
+        postings = {}
+        numbers = {}
+        for token in {token for tokens in groups for token in tokens}:
+            number = index.find(token)
+            if number is None:
+                groups = []
+                break
+            numbers[token] = number
+            postings[token] = index.read_postings(number)
+
+        ranked = []
+        if groups:
+            documents = set.intersection(*(set(found) for found in postings.values()))
+            if query.kinds:
+                codes = {index.kinds.index(kind) for kind in query.kinds if kind in index.kinds}
+                documents = {document for document in documents if index.doc_kinds[document] in codes}
+            if query.category is not None:
+                number = index.find(category_term(query.category))
+                documents &= set(index.read_postings(number)) if number is not None else set()
+            for tokens in groups:
+                if len(tokens) > 1:
+                    documents = {document for document in documents if has_phrase(postings, tokens, document)}
+
+            average_length = index.average_length or 1.0
+            for document in documents:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * index.doc_lengths[document] / average_length)
+                score = 0.0
+                for token, number in numbers.items():
+                    frequency = postings[token][document][0]
+                    score += index.idf(number) * frequency * (BM25_K1 + 1) / (frequency + norm)
+                ranked.append((index.doc_pks[document], score))
+            ranked.sort(key=lambda hit: (-hit[1], hit[0]))
+
+        self._local.ranked = (key, ranked)
+        return ranked
+
+    def count(self, query):
+        return len(self.rank(query))
+
+    def fetch(self, query, offset, limit):
+        hits = self.rank(query)[offset:offset + limit]
+        documents = SearchDocument.objects.defer(*INDEXED_FIELDS).in_bulk([pk for pk, _ in hits])
+        results = []
+        for pk, score in hits:
+            # Deleted since the index was built
+            if pk in documents:
+                documents[pk].rank = score
+                results.append(documents[pk])
+        return results
+
+    def update(self, pks):
+        self._stale = True
+
+    def remove(self, pks):
+        self._stale = True
+
+    def rebuild(self):
+        build(self.path)
+        self._stale = False
+
+    def commit(self):
+        if self._stale:
+            self.rebuild()
\ No newline at end of file
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+
+from search.backends import get_backend
+from search.documents import SEARCH_MODELS, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search documents and the search backend's index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', metavar='app_label.Model',
+            help=f"Models to reindex (default: {', '.join(SEARCH_MODELS)}).",
+        )
+        parser.add_argument(
+            '--processes', type=int, default=None,
+            help="Worker processes to build documents with (default: one per CPU).",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help="Objects read, and documents written, at a time.",
+        )
+        parser.add_argument(
+            '--backend-only', action='store_true',
+            help="Only rebuild the backend's index from the stored documents.",
+        )
+
+    def progress(self, label, count, seconds):
+        if self.verbosity > 1:
+            self.stdout.write(f"  {label}: {count} object(s), {self.rate(count, seconds)}/s")
+
+    @staticmethod
+    def rate(count, seconds):
+        return f"{count / seconds:.0f}" if seconds else "-"
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        if options['backend_only']:
+            get_backend().rebuild()
+            self.stdout.write(self.style.SUCCESS("Rebuilt the search backend's index."))
+            return
+
+        totals = rebuild_index(
+            models=options['models'] or SEARCH_MODELS,
+            processes=options['processes'],
+            chunk_size=options['chunk_size'],
+            progress=self.progress,
+        )
+        for label, (count, seconds) in totals.items():
+            self.stdout.write(self.style.SUCCESS(
+                f"Indexed {count} {label} object(s) in {seconds:.1f}s ({self.rate(count, seconds)}/s)."
+            ))
\ No newline at end of file
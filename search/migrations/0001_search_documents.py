@@ -0,0 +1,107 @@
+# Generated by Django 5.2 on 2026-10-18 12:38
+
+from html import unescape
+
+import django.db.models.deletion
+from django.db import OperationalError, migrations, models
+from django.db.models.functions import Now
+from django.utils.html import strip_tags
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE search_document_fts USING fts5("
+                "title, summary, body, tokenize = 'porter unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            # Built without FTS5: search falls back to search.backends.DatabaseBackend
+            pass
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE search_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english'::regconfig, title), 'A') || "
+            "setweight(to_tsvector('english'::regconfig, summary), 'B') || "
+            "setweight(to_tsvector('english'::regconfig, body), 'C')) STORED"
+        )
+        schema_editor.execute(
+            "CREATE INDEX search_document_vector_idx ON search_searchdocument USING gin (search_vector)"
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS search_document_fts")
+
+
+def text(*values):
+    return ' '.join(unescape(strip_tags(value)) for value in values if value)
+
+
+def fill_documents(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+    Page = apps.get_model('pages', 'Page')
+    Category = apps.get_model('categories', 'Category')
+
+    page_type, _ = ContentType.objects.get_or_create(app_label='pages', model='page')
+    category_type, _ = ContentType.objects.get_or_create(app_label='categories', model='category')
+    pages = Page.objects.filter(status='published', published_at__lte=Now())
+    SearchDocument.objects.bulk_create([
+        SearchDocument(
+            content_type=page_type, object_id=page.pk, title=page.title,
+            summary=text(page.excerpt, page.meta_title, page.meta_description, page.meta_keywords),
+            body=text(page.rendered_content),
+        )
+        for page in pages.iterator()
+    ], batch_size=500)
+    SearchDocument.objects.bulk_create([
+        SearchDocument(
+            content_type=category_type, object_id=category.pk, title=category.name,
+            summary=text(category.meta_title, category.meta_description, category.meta_keywords),
+            body=text(category.description),
+        )
+        for category in Category.objects.iterator()
+    ], batch_size=500)
+
+    if schema_editor.connection.vendor == 'sqlite':
+        tables = schema_editor.connection.introspection.table_names()
+        if 'search_document_fts' in tables:
+            schema_editor.execute(
+                "INSERT INTO search_document_fts (rowid, title, summary, body) "
+                "SELECT id, title, summary, body FROM search_searchdocument"
+            )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('categories', '0003_category_counts'),
+        ('pages', '0007_page_tree'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Object ID')),
+                ('title', models.TextField(blank=True, verbose_name='Title')),
+                ('summary', models.TextField(blank=True, verbose_name='Summary')),
+                ('body', models.TextField(blank=True, verbose_name='Body')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'object_id'), name='search_document_object_uniq')],
+            },
+        ),
+        migrations.RunPython(create_index, drop_index),
+        migrations.RunPython(fill_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,128 @@
+# Generated by Django 5.2 on 2026-10-18 12:40
+
+from html import unescape
+
+from django.db import migrations, models
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+
+def text(*values):
+    return ' '.join(unescape(strip_tags(value)) for value in values if value)
+
+
+def snippet(*values):
+    for value in values:
+        if value and value.strip():
+            return Truncator(value.strip()).words(30)
+    return ''
+
+
+def fill_documents(apps, schema_editor):
+    """Write every object's document again, now with what its result shows."""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+    now = timezone.now()
+
+    def publishable(obj, kind, url):
+        body = text(obj.rendered_content)
+        return dict(
+            kind=kind, title=obj.title, url=url, body=body,
+            summary=text(obj.excerpt, obj.meta_title, obj.meta_description, obj.meta_keywords),
+            snippet=snippet(obj.excerpt, body),
+            is_published=obj.status == 'published' and obj.published_at is not None and obj.published_at <= now,
+            published_at=obj.published_at,
+        )
+
+    def post(obj):
+        return publishable(obj, 'post', reverse('blog:post_detail', kwargs={'slug': obj.slug}))
+
+    def page(obj):
+        if obj.is_homepage:
+            return publishable(obj, 'page', reverse('pages:home'))
+        return publishable(obj, 'page', reverse('pages:page_detail', kwargs={'slug': obj.slug}))
+
+    def category(obj):
+        body = text(obj.description)
+        return dict(
+            kind='category', title=obj.name, body=body,
+            summary=text(obj.meta_title, obj.meta_description, obj.meta_keywords),
+            url=reverse('categories:category_detail', kwargs={'slug': obj.slug}),
+            snippet=snippet(obj.meta_description, body), is_published=True, published_at=None,
+        )
+
+    def media(obj):
+        return dict(
+            kind='media', title=obj.title, summary=obj.alt_text, body=obj.description,
+            url=reverse('media_library:media_detail', kwargs={'slug': obj.slug}),
+            snippet=snippet(obj.description, obj.alt_text), is_published=True, published_at=obj.created_at,
+        )
+
+    SearchDocument.objects.all().delete()
+    for app_label, model_name, fields in (
+        ('blog', 'Post', post),
+        ('pages', 'Page', page),
+        ('categories', 'Category', category),
+        ('media_library', 'MediaItem', media),
+    ):
+        content_type, _ = ContentType.objects.get_or_create(app_label=app_label, model=model_name.lower())
+        model = apps.get_model(app_label, model_name)
+        SearchDocument.objects.bulk_create((
+            SearchDocument(content_type=content_type, object_id=obj.pk, **fields(obj))
+            for obj in model.objects.order_by('pk').iterator(chunk_size=500)
+        ), batch_size=500)
+
+    if schema_editor.connection.vendor == 'sqlite':
+        if 'search_document_fts' in schema_editor.connection.introspection.table_names():
+            schema_editor.execute("DELETE FROM search_document_fts")
+            schema_editor.execute(
+                "INSERT INTO search_document_fts (rowid, title, summary, body) "
+                "SELECT id, title, summary, body FROM search_searchdocument"
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('search', '0001_search_documents'),
+        ('blog', '0009_archive_months'),
+        ('media_library', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchdocument',
+            name='is_published',
+            field=models.BooleanField(default=False, verbose_name='Is published'),
+        ),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='kind',
+            field=models.CharField(choices=[('post', 'Post'), ('page', 'Page'), ('category', 'Category'), ('media', 'Media')], default='', max_length=20, verbose_name='Kind'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='published_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Published at'),
+        ),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='snippet',
+            field=models.TextField(blank=True, verbose_name='Snippet'),
+        ),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='url',
+            field=models.CharField(default='', max_length=500, verbose_name='URL'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=models.Index(fields=['is_published', 'kind'], name='search_document_kind_idx'),
+        ),
+        migrations.RunPython(fill_documents, migrations.RunPython.noop),
+    ]
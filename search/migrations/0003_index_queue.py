@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 12:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def queue_categorized(apps, schema_editor):
+    """Queue the content whose documents now name its categories and tags."""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    QueuedUpdate = apps.get_model('search', 'QueuedUpdate')
+    for app_label, model_name in (('blog', 'Post'), ('pages', 'Page'), ('media_library', 'MediaItem')):
+        content_type, _ = ContentType.objects.get_or_create(app_label=app_label, model=model_name.lower())
+        pks = apps.get_model(app_label, model_name).objects.order_by('pk').values_list('pk', flat=True)
+        QueuedUpdate.objects.bulk_create((
+            QueuedUpdate(content_type=content_type, object_id=pk) for pk in pks.iterator(chunk_size=1000)
+        ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('search', '0002_unified_documents'),
+        ('blog', '0009_archive_months'),
+        ('media_library', '0001_initial'),
+        ('pages', '0007_page_tree'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Object ID')),
+                ('queued_at', models.DateTimeField(auto_now_add=True, verbose_name='Queued at')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Queued Index Update',
+                'verbose_name_plural': 'Queued Index Updates',
+            },
+        ),
+        migrations.RunPython(queue_categorized, migrations.RunPython.noop),
+    ]
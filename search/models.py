@@ -0,0 +1,70 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SearchDocument(models.Model):
+    """
+    The searchable text of one object, split by weight: its ``title``, a
+    ``summary`` of excerpts and meta fields, and its ``body``.
+    
+    It also holds everything a search result shows, so a page of results
+    is read from this table alone: the kind of object, its URL, a snippet
+    and its publication state and date. ``search.documents`` keeps a row
+    for every object of the searched models; ``search.backends`` index the
+    rows for full-text queries.
+    """
+    KIND_POST = 'post'
+    KIND_PAGE = 'page'
+    KIND_CATEGORY = 'category'
+    KIND_MEDIA = 'media'
+    
+    KIND_CHOICES = (
+        (KIND_POST, _('Post')),
+        (KIND_PAGE, _('Page')),
+        (KIND_CATEGORY, _('Category')),
+        (KIND_MEDIA, _('Media')),
+    )
+    
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    object_id = models.PositiveBigIntegerField(_("Object ID"))
+    kind = models.CharField(_("Kind"), max_length=20, choices=KIND_CHOICES)
+    title = models.TextField(_("Title"), blank=True)
+    summary = models.TextField(_("Summary"), blank=True)
+    body = models.TextField(_("Body"), blank=True)
+    url = models.CharField(_("URL"), max_length=500)
+    snippet = models.TextField(_("Snippet"), blank=True)
+    is_published = models.BooleanField(_("Is published"), default=False)
+    published_at = models.DateTimeField(_("Published at"), null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _("Search Document")
+        verbose_name_plural = _("Search Documents")
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='search_document_object_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['is_published', 'kind'], name='search_document_kind_idx'),
+        ]
+    
+    def __str__(self):
+        return self.title
+
+class QueuedUpdate(models.Model):
+    """
+    An object whose search document is out of date.
+    
+    Saves only add a row here; ``search.queue.drain`` updates the
+    documents in batches, from the scheduler. An object saved again while
+    queued gets another row, which the next batch updates it for.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    object_id = models.PositiveBigIntegerField(_("Object ID"))
+    queued_at = models.DateTimeField(_("Queued at"), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _("Queued Index Update")
+        verbose_name_plural = _("Queued Index Updates")
+    
+    def __str__(self):
+        return f"{self.content_type_id}:{self.object_id}"
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+The queue of search documents to update.
+
+Saving a post, page, category or media item, or changing its categories
+or tags, only queues the object: a row in ``QueuedUpdate``, written in the
+same transaction. ``drain``, run by the scheduler, updates the queued
+documents a batch at a time, so editors never wait for the index.
+
+That is only done with ``SEARCH_QUEUE_UPDATES = True``, by default where
+``RUN_SCHEDULER`` says a scheduler runs; otherwise documents are updated
+as objects are saved, so nothing waits on a queue no one drains.
+"""
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from .backends import get_backend
+from .documents import update_index
+from .models import QueuedUpdate
+
+
+def queue_updates():
+    """Whether document updates are queued rather than done right away."""
+    return getattr(settings, 'SEARCH_QUEUE_UPDATES', False)
+
+
+def enqueue(model, pks):
+    """Queue the documents of ``model``'s objects ``pks`` for an update."""
+    pks = set(pks)
+    if not pks:
+        return
+    if not queue_updates():
+        update_index(model, pks)
+        get_backend().commit()
+        return
+    content_type = ContentType.objects.get_for_model(model)
+    QueuedUpdate.objects.bulk_create(
+        [QueuedUpdate(content_type=content_type, object_id=pk) for pk in pks],
+        batch_size=500,
+    )
+
+
+def drain(batch_size=500):
+    """
+    Update the queued documents, oldest first, ``batch_size`` rows at a
+    time, until the queue is empty; returns the number of documents updated.
+    """
+    updated = 0
+    while True:
+        rows = list(QueuedUpdate.objects.order_by('pk').values_list('pk', 'content_type_id', 'object_id')[:batch_size])
+        if not rows:
+            break
+        # An object queued several times is updated once
+        queued = {}
+        for _, content_type_id, object_id in rows:
+            queued.setdefault(content_type_id, set()).add(object_id)
+        with transaction.atomic():
+            for content_type_id, pks in queued.items():
+                model = ContentType.objects.get_for_id(content_type_id).model_class()
+                if model is not None:
+                    update_index(model, pks)
+                    updated += len(pks)
+            QueuedUpdate.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+    if updated:
+        get_backend().commit()
+    return updated
\ No newline at end of file
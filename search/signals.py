@@ -0,0 +1,94 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.urls import reverse
+from taggit.models import TaggedItem
+
+from blog.models import Post
+from categories.models import Category
+from core.signals import content_changed
+from media_library.models import MediaItem
+from pages.models import Page
+from .documents import SEARCH_MODELS
+from .models import SearchDocument
+from .queue import enqueue
+
+
+# Content whose documents name its categories
+CATEGORIZED_MODELS = (Post, Page)
+
+
+def object_changed(sender, instance, **kwargs):
+    enqueue(sender, [instance.pk])
+
+
+for label in SEARCH_MODELS:
+    post_save.connect(object_changed, sender=label, dispatch_uid=f'search_save_{label}')
+    post_delete.connect(object_changed, sender=label, dispatch_uid=f'search_delete_{label}')
+
+
+@receiver(post_save, sender=Page)
+def homepage_changed(sender, instance, **kwargs):
+    # The page that was the homepage until now (unset with a queryset
+    # update) has its own URL again
+    if instance.is_homepage:
+        previous = SearchDocument.objects.filter(
+            kind=SearchDocument.KIND_PAGE, url=reverse('pages:home'),
+        ).exclude(object_id=instance.pk).values_list('object_id', flat=True)
+        enqueue(sender, previous)
+
+
+def enqueue_categorized(category_pk):
+    """Queue the content filed under a category."""
+    for model in CATEGORIZED_MODELS:
+        enqueue(model, model.categories.through.objects.filter(
+            category_id=category_pk,
+        ).values_list(f'{model._meta.model_name}_id', flat=True))
+
+
+@receiver(pre_save, sender=Category)
+def category_saving(sender, instance, **kwargs):
+    instance._previous_name = None
+    if instance.pk is not None:
+        instance._previous_name = Category.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def category_renamed(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_name', None)
+    if not created and previous is not None and previous != instance.name:
+        enqueue_categorized(instance.pk)
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleting(sender, instance, **kwargs):
+    # Its links go with it, without m2m_changed, so queue the content now
+    enqueue_categorized(instance.pk)
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(m2m_changed, sender=Page.categories.through)
+@receiver(m2m_changed, sender=MediaItem.categories.through)
+def categories_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            enqueue(type(instance), [instance.pk])
+        return
+    # Objects of ``model`` added to or removed from the category ``instance``
+    if action == 'pre_clear':
+        instance._cleared_pks = list(
+            sender.objects.filter(**{f'{instance._meta.model_name}_id': instance.pk})
+            .values_list(f'{model._meta.model_name}_id', flat=True)
+        )
+    elif action.startswith('post_'):
+        enqueue(model, pk_set or getattr(instance, '_cleared_pks', ()))
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def tags_changed(sender, instance, action, **kwargs):
+    if action.startswith('post_') and isinstance(instance, CATEGORIZED_MODELS):
+        enqueue(type(instance), [instance.pk])
+
+
+@receiver(content_changed)
+def content_changed_in_bulk(sender, model, pks, **kwargs):
+    enqueue(model, pks)
\ No newline at end of file
@@ -1,54 +1,55 @@
-from django.shortcuts import render
 from django.views.generic import ListView
-from django.db.models import Q
-from django.conf import settings
 
-from pages.models import Page
-from categories.models import Category
+from categories.tree import get_category_tree
+from .backends import get_backend
+from .documents import PUBLIC_KINDS
+from .models import SearchDocument
 
 
 class SearchView(ListView):
-    """View for search results."""
+    """
+    View for search results.
+    
+    The backend ranks the matches and the paginator only fetches the page
+    shown: one query for the count and one for the page's documents, which
+    hold all a result shows, however many documents match. ``type``
+    narrows the results down to one kind of object, ``category`` to the
+    content filed in a category, by slug.
+    """
     template_name = 'search/search_results.html'
     paginate_by = 10
     context_object_name = 'results'
     
+    def get_kinds(self):
+        """The kinds of documents this user may find."""
+        if self.request.user.is_authenticated:
+            return [kind for kind, _ in SearchDocument.KIND_CHOICES]
+        return list(PUBLIC_KINDS)
+    
     def get_queryset(self):
-        """Return search results."""
-        query = self.request.GET.get('q', '')
-        
-        if not query:
+        """Return the search results, best first."""
+        self.query = self.request.GET.get('q', '').strip()
+        self.kinds = self.get_kinds()
+        self.kind = self.request.GET.get('type', '')
+        if self.kind not in self.kinds:
+            self.kind = ''
+        # The cached tree, so an unknown slug costs no query
+        self.category = get_category_tree().get_by_slug(self.request.GET.get('category', ''))
+        if not self.query:
             return []
-        
-        # Store the query for use in the template
-        self.query = query
-        
-        # Search in pages
-        page_results = Page.objects.filter(
-            Q(title__icontains=query) | 
-            Q(content__icontains=query) | 
-            Q(excerpt__icontains=query) |
-            Q(meta_title__icontains=query) |
-            Q(meta_description__icontains=query) |
-            Q(meta_keywords__icontains=query),
-            status=Page.STATUS_PUBLISHED
-        ).distinct()
-        
-        # Search in categories
-        category_results = Category.objects.filter(
-            Q(name__icontains=query) | 
-            Q(description__icontains=query) |
-            Q(meta_title__icontains=query) |
-            Q(meta_description__icontains=query) |
-            Q(meta_keywords__icontains=query)
-        ).distinct()
-        
-        # Combine results
-        results = list(page_results) + list(category_results)
-        return results
+        return get_backend().search(
+            self.query,
+            kinds=[self.kind] if self.kind else self.kinds,
+            category=self.category.pk if self.category else None,
+        )
     
     def get_context_data(self, **kwargs):
-        """Add query to context."""
+        """Add the query and the kinds of results it can be narrowed down to."""
         context = super().get_context_data(**kwargs)
-        context['query'] = self.request.GET.get('q', '')
+        context['query'] = self.query
+        context['kind'] = self.kind
+        context['category'] = self.category
+        context['kinds'] = [
+            (kind, label) for kind, label in SearchDocument.KIND_CHOICES if kind in self.kinds
+        ]
         return context
\ No newline at end of file
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class ThemingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'theming'
\ No newline at end of file
+    name = 'theming'
+
+    def ready(self):
+        from . import signals  # noqa: F401
\ No newline at end of file
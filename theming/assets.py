@@ -0,0 +1,109 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+
+THEME_ASSETS_PREFIX = 'theme/'
+STYLESHEET_TEMPLATE = 'theming/theme.css'
+
+_CSS_TOKEN_RE = re.compile(
+    r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')'''  # strings, kept verbatim
+    r'''|/\*.*?\*/''',                            # comments, dropped
+    re.S,
+)
+_CSS_WHITESPACE_RE = re.compile(r'\s+')
+_CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,])\s*')
+
+
+def get_assets_dir():
+    """Return the directory compiled theme assets are written to."""
+    return getattr(settings, 'THEME_ASSETS_DIR', os.path.join(settings.STATIC_ROOT, 'theme'))
+
+
+def get_asset_url(name):
+    """Return the public URL of a compiled theme asset."""
+    return f"{settings.STATIC_URL}{THEME_ASSETS_PREFIX}{name}"
+
+
+def _minify_css_code(code):
+    code = _CSS_WHITESPACE_RE.sub(' ', code)
+    code = _CSS_PUNCTUATION_RE.sub(r'\1', code)
+    return code.replace(';}', '}')
+
+
+def minify_css(css):
+    """
+    Strip comments and redundant whitespace from ``css``.
+
+    Quoted strings are left untouched. Whitespace is only removed next to
+    ``{ } ; ,`` so descendant selectors such as ``a :hover`` keep their meaning.
+    """
+    parts = []
+    code = []
+    pos = 0
+    for match in _CSS_TOKEN_RE.finditer(css):
+        code.append(css[pos:match.start()])
+        if match.group(1):
+            parts.append(_minify_css_code(' '.join(code)))
+            parts.append(match.group(1))
+            code = []
+        pos = match.end()
+    code.append(css[pos:])
+    parts.append(_minify_css_code(' '.join(code)))
+    return ''.join(parts).strip()
+
+
+def fingerprint(stem, content, extension):
+    """Return a file name carrying a hash of ``content``, e.g. ``theme.1a2b3c4d5e6f.css``."""
+    digest = hashlib.md5(content.encode('utf-8')).hexdigest()[:12]
+    return f"{stem}.{digest}.{extension}"
+
+
+def write_asset(name, content):
+    """Atomically write an asset, unless a file with that name already exists."""
+    directory = get_assets_dir()
+    path = os.path.join(directory, name)
+    if os.path.exists(path):
+        return path
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp:
+            tmp.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+def asset_exists(name):
+    return bool(name) and os.path.exists(os.path.join(get_assets_dir(), name))
+
+
+def compile_theme_assets(theme):
+    """
+    Render, minify and write the stylesheet and script for ``theme``.
+
+    Returns ``(css_name, js_name)``; ``js_name`` is empty when the theme has
+    no custom JavaScript. The names only change when the content does.
+    """
+    stem = f"theme-{theme.slug or 'default'}"
+
+    css = minify_css(render_to_string(STYLESHEET_TEMPLATE, {'theme': theme}))
+    css_name = fingerprint(stem, css, 'css')
+    write_asset(css_name, css)
+
+    js_name = ''
+    js = theme.custom_js.strip()
+    if js:
+        js_name = fingerprint(stem, js, 'js')
+        write_asset(js_name, js + '\n')
+
+    return css_name, js_name
\ No newline at end of file
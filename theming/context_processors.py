@@ -1,9 +1,18 @@
+from django.utils.functional import SimpleLazyObject
+
+from core.cache import memoize_on_request
 from .models import Theme
 
 
 def theme(request):
-    """Context processor to add active theme to all templates."""
-    active_theme = Theme.get_active_theme()
+    """
+    Context processor to add active theme to all templates.
+    
+    The theme is only looked up once a template dereferences it.
+    """
+    active_theme = SimpleLazyObject(
+        lambda: memoize_on_request(request, 'theme', Theme.get_active_theme)
+    )
     
     return {
         'theme': active_theme,
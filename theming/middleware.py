@@ -0,0 +1,39 @@
+import os
+
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .assets import THEME_ASSETS_PREFIX, get_assets_dir
+
+
+class ThemeAssetsMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise middleware that also serves the compiled theme assets.
+    
+    WhiteNoise indexes ``STATIC_ROOT`` once at startup, but theme assets are
+    written whenever a theme is saved. Requests for unknown files under the
+    theme prefix are looked up on disk and added to the index, and since the
+    file names carry a content hash they're served as immutable.
+    """
+    
+    @property
+    def theme_prefix(self):
+        return self.static_prefix + THEME_ASSETS_PREFIX
+    
+    def __call__(self, request):
+        path = request.path_info
+        if not self.autorefresh and path.startswith(self.theme_prefix) and path not in self.files:
+            self.add_theme_asset(path)
+        return super().__call__(request)
+    
+    def add_theme_asset(self, url):
+        name = url[len(self.theme_prefix):]
+        if not name or '/' in name or name.startswith('.'):
+            return
+        path = os.path.join(get_assets_dir(), name)
+        if os.path.isfile(path):
+            self.add_file_to_dictionary(url, path)
+    
+    def immutable_file_test(self, path, url):
+        if url.startswith(self.theme_prefix):
+            return True
+        return super().immutable_file_test(path, url)
\ No newline at end of file
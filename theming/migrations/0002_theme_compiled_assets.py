@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theming', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='theme',
+            name='css_asset',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Compiled stylesheet'),
+        ),
+        migrations.AddField(
+            model_name='theme',
+            name='js_asset',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Compiled script'),
+        ),
+    ]
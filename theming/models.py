@@ -1,9 +1,23 @@
+import threading
+
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
 from django.core.cache import cache
 
+from core.cache import CACHE_TIMEOUT, get_version, bump_version
 from core.models import TimeStampedModel
+from .assets import compile_theme_assets, asset_exists, get_asset_url
+
+
+THEME_VERSION = 'theming.theme'
+THEME_CACHE_KEY = 'theming:active_theme:{version}'
+THEME_BOOTSTRAP_LOCK_KEY = 'theming:bootstrap_lock'
+
+# Per-worker copy of the active theme as ``(version, theme)``. Replaced
+# wholesale, never mutated, so threads always see a consistent pair.
+_local_theme = (None, None)
+_bootstrap_lock = threading.Lock()
 
 
 class Theme(TimeStampedModel):
@@ -33,6 +47,10 @@ class Theme(TimeStampedModel):
     logo = models.ImageField(_("Logo"), upload_to='theme/logos/', blank=True, null=True)
     favicon = models.ImageField(_("Favicon"), upload_to='theme/favicons/', blank=True, null=True)
     
+    # Compiled, fingerprinted assets (see theming.assets)
+    css_asset = models.CharField(_("Compiled stylesheet"), max_length=255, blank=True, editable=False)
+    js_asset = models.CharField(_("Compiled script"), max_length=255, blank=True, editable=False)
+    
     class Meta:
         verbose_name = _("Theme")
         verbose_name_plural = _("Themes")
@@ -47,30 +65,96 @@ class Theme(TimeStampedModel):
         # If this theme is set as active, deactivate all other themes
         if self.is_active:
             Theme.objects.filter(is_active=True).update(is_active=False)
+        
+        self.css_asset, self.js_asset = compile_theme_assets(self)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'css_asset', 'js_asset'}
             
         super().save(*args, **kwargs)
         
-        # Clear theme cache
-        cache.delete('active_theme')
+        # Every worker drops its local copy on the next request
+        bump_version(THEME_VERSION)
+    
+    @property
+    def stylesheet_url(self):
+        """URL of the compiled theme stylesheet, or an empty string."""
+        return get_asset_url(self.css_asset) if self.css_asset else ''
+    
+    @property
+    def script_url(self):
+        """URL of the compiled custom JavaScript, or an empty string."""
+        return get_asset_url(self.js_asset) if self.js_asset else ''
+    
+    def ensure_assets(self):
+        """
+        Recompile the theme assets if their files are missing.
+        
+        Covers fresh containers and new workers whose static root doesn't
+        have the files written by whichever process saved the theme.
+        """
+        if asset_exists(self.css_asset) and (not self.custom_js.strip() or asset_exists(self.js_asset)):
+            return
+        css_asset, js_asset = compile_theme_assets(self)
+        if (css_asset, js_asset) != (self.css_asset, self.js_asset):
+            self.css_asset, self.js_asset = css_asset, js_asset
+            Theme.objects.filter(pk=self.pk).update(css_asset=css_asset, js_asset=js_asset)
     
     @classmethod
     def get_active_theme(cls):
-        """Get the active theme."""
-        active_theme = cache.get('active_theme')
+        """
+        Get the active theme.
+        
+        Looks in the worker's local copy first, then in the shared cache and
+        only then in the database. The local copy is checked against the
+        theme version stamp, so a save anywhere is picked up by every worker
+        on its next request.
+        """
+        global _local_theme
+        
+        version = get_version(THEME_VERSION)
+        local_version, active_theme = _local_theme
+        if local_version == version:
+            return active_theme
+        
+        cache_key = THEME_CACHE_KEY.format(version=version)
+        active_theme = cache.get(cache_key)
         if active_theme is None:
+            active_theme = cls.objects.filter(is_active=True).first()
+            if active_theme is None:
+                active_theme = cls._bootstrap_active_theme()
+            if active_theme.pk:
+                cache.set(cache_key, active_theme, CACHE_TIMEOUT)
+        
+        if active_theme.pk:
+            active_theme.ensure_assets()
+        
+        _local_theme = (version, active_theme)
+        return active_theme
+    
+    @classmethod
+    def _bootstrap_active_theme(cls):
+        """
+        Activate the first theme, or create a default one, when none is active.
+        
+        Only one thread per worker, and one worker per cache, does the write.
+        Everyone else gets an unsaved default theme until the write lands and
+        bumps the version.
+        """
+        with _bootstrap_lock:
+            if not cache.add(THEME_BOOTSTRAP_LOCK_KEY, True, 30):
+                return cls(name="Default Theme", slug="default-theme", is_active=True)
             try:
-                active_theme = cls.objects.get(is_active=True)
-                cache.set('active_theme', active_theme)
-            except cls.DoesNotExist:
-                # If no active theme, get the first one or create a default
-                active_theme = cls.objects.first()
-                if active_theme:
-                    active_theme.is_active = True
-                    active_theme.save()
-                else:
-                    active_theme = cls.objects.create(
-                        name="Default Theme",
-                        is_active=True
-                    )
-                cache.set('active_theme', active_theme)
-        return active_theme
\ No newline at end of file
+                active_theme = cls.objects.filter(is_active=True).first()
+                if active_theme is None:
+                    active_theme = cls.objects.first()
+                    if active_theme:
+                        active_theme.is_active = True
+                        active_theme.save()
+                    else:
+                        active_theme = cls.objects.create(
+                            name="Default Theme",
+                            is_active=True
+                        )
+                return active_theme
+            finally:
+                cache.delete(THEME_BOOTSTRAP_LOCK_KEY)
\ No newline at end of file
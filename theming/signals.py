@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from core.cache import bump_version
+from .models import Theme, THEME_VERSION
+
+
+@receiver(post_delete, sender=Theme)
+def theme_deleted(sender, **kwargs):
+    """Drop cached copies of a deleted theme."""
+    bump_version(THEME_VERSION)
\ No newline at end of file
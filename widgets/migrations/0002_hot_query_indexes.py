@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('widgets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='widget',
+            index=models.Index(fields=['area', 'is_active', 'order'], name='widgets_widget_area_idx'),
+        ),
+    ]
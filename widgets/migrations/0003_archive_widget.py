@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('widgets', '0002_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='widget',
+            name='widget_type',
+            field=models.CharField(choices=[('text', 'Text'), ('html', 'HTML'), ('recent_posts', 'Recent Posts'), ('popular_posts', 'Popular Posts'), ('categories', 'Categories'), ('tags', 'Tags'), ('newsletter', 'Newsletter'), ('social', 'Social Links'), ('image', 'Image'), ('hero', 'Hero'), ('features', 'Features'), ('featured_posts', 'Featured Posts'), ('archive', 'Archive'), ('call_to_action', 'Call to Action'), ('custom', 'Custom')], max_length=20, verbose_name='Widget Type'),
+        ),
+    ]
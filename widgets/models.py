@@ -35,6 +35,7 @@ class Widget(TimeStampedModel):
     WIDGET_HERO = 'hero'
     WIDGET_FEATURES = 'features'
     WIDGET_FEATURED_POSTS = 'featured_posts'
+    WIDGET_ARCHIVE = 'archive'
     WIDGET_CALL_TO_ACTION = 'call_to_action'
     WIDGET_CUSTOM = 'custom'
     
@@ -51,6 +52,7 @@ class Widget(TimeStampedModel):
         (WIDGET_HERO, _('Hero')),
         (WIDGET_FEATURES, _('Features')),
         (WIDGET_FEATURED_POSTS, _('Featured Posts')),
+        (WIDGET_ARCHIVE, _('Archive')),
         (WIDGET_CALL_TO_ACTION, _('Call to Action')),
         (WIDGET_CUSTOM, _('Custom')),
     )
@@ -85,6 +87,9 @@ class Widget(TimeStampedModel):
         verbose_name = _("Widget")
         verbose_name_plural = _("Widgets")
         ordering = ['area', 'order']
+        indexes = [
+            models.Index(fields=['area', 'is_active', 'order'], name='widgets_widget_area_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.get_widget_type_display()})"
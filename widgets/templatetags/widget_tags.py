@@ -3,9 +3,11 @@ from django.template.loader import render_to_string
 from django.db.models import Count
 
 from widgets.models import WidgetArea, Widget
-from blog.models import Post
+from blog.models import Post, ArchiveMonth
 from categories.models import Category
+from categories.tree import get_category_tree
 from taggit.models import Tag
+from core.page_cache import record_dependency
 
 register = template.Library()
 
@@ -13,6 +15,7 @@ register = template.Library()
 @register.simple_tag(takes_context=True)
 def render_widget_area(context, area_slug):
     """Render all widgets in a widget area."""
+    record_dependency(Widget, WidgetArea)
     try:
         area = WidgetArea.objects.get(slug=area_slug)
         widgets = area.widgets.filter(is_active=True).order_by('order')
@@ -34,40 +37,48 @@ def render_widget(context, widget):
     widget_context = {'widget': widget, 'title': widget.title}
     
     if widget.widget_type == Widget.WIDGET_RECENT_POSTS:
+        record_dependency(Post)
         count = widget.settings.get('count', 5)
-        widget_context['posts'] = Post.objects.filter(
-            status=Post.STATUS_PUBLISHED
-        ).order_by('-published_at')[:count]
+        widget_context['posts'] = Post.objects.published().for_cards().order_by('-published_at')[:count]
     
     elif widget.widget_type == Widget.WIDGET_POPULAR_POSTS:
+        record_dependency(Post)
         count = widget.settings.get('count', 5)
-        widget_context['posts'] = Post.objects.filter(
-            status=Post.STATUS_PUBLISHED
-        ).order_by('-comment_count')[:count]
+        posts = Post.objects.published().for_cards()
+        if widget.settings.get('order') == 'trending':
+            widget_context['posts'] = posts.trending()[:count]
+        else:
+            widget_context['posts'] = posts.order_by(
+                '-approved_comment_count', '-published_at'
+            )[:count]
     
     elif widget.widget_type == Widget.WIDGET_CATEGORIES:
+        record_dependency(Category, Post)
         count = widget.settings.get('count', 10)
-        widget_context['categories'] = Category.objects.annotate(
-            post_count=Count('blog_posts')
-        ).filter(post_count__gt=0).order_by('-post_count')[:count]
+        widget_context['categories'] = get_category_tree().popular(count)
+    
+    elif widget.widget_type == Widget.WIDGET_ARCHIVE:
+        # Counts come from the monthly rollup, not from grouping the posts
+        record_dependency(Post)
+        count = widget.settings.get('count', 12)
+        widget_context['months'] = ArchiveMonth.objects.all()[:count]
     
     elif widget.widget_type == Widget.WIDGET_TAGS:
+        record_dependency(Post)
         count = widget.settings.get('count', 20)
         widget_context['tags'] = Tag.objects.annotate(
             post_count=Count('taggit_taggeditem_items')
         ).filter(post_count__gt=0).order_by('-post_count')[:count]
     
-    # Add the request to the context
-    if 'request' in context:
-        widget_context['request'] = context['request']
-    
-    # Render the widget template
-    return render_to_string(template, widget_context)
+    # Render the widget template with the same request so context processors
+    # apply; their values are memoized on the request, not recomputed
+    return render_to_string(template, widget_context, request=context.get('request'))
 
 
 @register.inclusion_tag('widgets/widget_area.html', takes_context=True)
 def show_widget_area(context, area_slug, template_name=None):
     """Show all widgets in a widget area."""
+    record_dependency(Widget, WidgetArea)
     try:
         area = WidgetArea.objects.get(slug=area_slug)
         widgets = area.widgets.filter(is_active=True).order_by('order')